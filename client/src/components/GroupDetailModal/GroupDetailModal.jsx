@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import groupsService from "../../services/groupsService";
 import usersService from "../../services/usersService";
+import messagesService from "../../services/messagesService";
 import { Modal, Spinner, Alert, Badge, ListGroup, Form, Button } from "react-bootstrap";
 import { FaBook, FaClock, FaMapMarkerAlt, FaUsers, FaTag, FaUserPlus } from "react-icons/fa";
 import "./GroupDetailModal.css";
@@ -13,6 +14,9 @@ const GroupDetailModal = ({ show, onHide, groupId, currentUserId, preSelectedUse
   const [error, setError] = useState("");
   const [success, setSuccess] = useState("");
   const [selectedUsers, setSelectedUsers] = useState([]);
+  const [messages, setMessages] = useState([]);
+  const [newMessage, setNewMessage] = useState("");
+  const [posting, setPosting] = useState(false);
 
   // Fetch group details and potential invitees when modal opens
   useEffect(() => {
@@ -21,6 +25,39 @@ const GroupDetailModal = ({ show, onHide, groupId, currentUserId, preSelectedUse
     }
   }, [show, groupId]);
 
+  // Load the latest messages once, then receive new ones over the group's stream
+  useEffect(() => {
+    if (!show || !groupId) return undefined;
+
+    let cancelled = false;
+    let closeStream = null;
+
+    const addMessage = (message) => {
+      setMessages((prev) =>
+        prev.some((m) => m.id === message.id) ? prev : [message, ...prev]
+      );
+    };
+
+    messagesService
+      .getGroupMessages(groupId, { limit: 50 })
+      .then(({ messages: page }) => {
+        if (cancelled) return;
+        setMessages(page);
+        // Resume after the newest loaded message so nothing posted meanwhile is missed
+        closeStream = messagesService.streamGroupMessages(
+          groupId,
+          addMessage,
+          page.length > 0 ? page[0].id : 0
+        );
+      })
+      .catch((err) => console.error("Error loading messages:", err));
+
+    return () => {
+      cancelled = true;
+      if (closeStream) closeStream();
+    };
+  }, [show, groupId]);
+
   // Handle pre-selected user from Matches page
   useEffect(() => {
     if (preSelectedUser && matches.length > 0) {
@@ -98,8 +135,33 @@ const GroupDetailModal = ({ show, onHide, groupId, currentUserId, preSelectedUse
     }
   };
 
+  // Post a message; it arrives back through the stream, so nothing is refetched
+  const handlePostMessage = async (e) => {
+    e.preventDefault();
+    const content = newMessage.trim();
+    if (!content) return;
+
+    try {
+      setPosting(true);
+      setError("");
+      await messagesService.postMessage({
+        group_id: groupId,
+        user_id: currentUserId,
+        content,
+      });
+      setNewMessage("");
+    } catch (err) {
+      console.error("Error posting message:", err);
+      setError("Failed to send message. Please try again.");
+    } finally {
+      setPosting(false);
+    }
+  };
+
   const handleClose = () => {
     setSelectedUsers([]);
+    setMessages([]);
+    setNewMessage("");
     setError("");
     setSuccess("");
     onHide();
@@ -210,6 +272,48 @@ const GroupDetailModal = ({ show, onHide, groupId, currentUserId, preSelectedUse
               </ListGroup>
             </div>
 
+            {/* Group Chat */}
+            <div className="mb-4">
+              <h5 className="mb-3">Messages</h5>
+              <ListGroup
+                className="mb-3"
+                style={{ maxHeight: "300px", overflowY: "auto" }}
+              >
+                {messages.length === 0 ? (
+                  <ListGroup.Item className="text-muted small">
+                    No messages yet.
+                  </ListGroup.Item>
+                ) : (
+                  [...messages].reverse().map((message) => (
+                    <ListGroup.Item key={message.id} className="d-flex">
+                      <div className="member-avatar me-3">{message.user_avatar}</div>
+                      <div className="flex-grow-1">
+                        <strong>{message.user_name}</strong>
+                        <span className="text-muted small ms-2">
+                          {new Date(message.posted_at).toLocaleString()}
+                        </span>
+                        <div>{message.content}</div>
+                      </div>
+                    </ListGroup.Item>
+                  ))
+                )}
+              </ListGroup>
+
+              <Form onSubmit={handlePostMessage} className="d-flex">
+                <Form.Control
+                  type="text"
+                  placeholder="Write a message..."
+                  value={newMessage}
+                  onChange={(e) => setNewMessage(e.target.value)}
+                  disabled={posting}
+                  className="me-2"
+                />
+                <Button type="submit" variant="primary" disabled={posting || !newMessage.trim()}>
+                  Send
+                </Button>
+              </Form>
+            </div>
+
             {/* Invite Users Section */}
             {matches.length > 0 && (
               <div className="invite-section">
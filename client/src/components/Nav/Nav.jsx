@@ -21,14 +21,15 @@ export default function Navigation() {
   const [showNotifications, setShowNotifications] = useState(false);
   const [unreadCount, setUnreadCount] = useState(0);
 
-  // Fetch unread notification count periodically
+  // Keep the invitation badge current from the notification stream
   useEffect(() => {
     if (isAuthenticated && user?.id) {
       fetchUnreadCount();
 
-      // Poll for new notifications every 30 seconds
-      const interval = setInterval(fetchUnreadCount, 30000);
-      return () => clearInterval(interval);
+      return notificationsService.streamNotifications(user.id, {
+        type: "group_invitation",
+        onUnread: setUnreadCount,
+      });
     }
   }, [isAuthenticated, user?.id]);
 
@@ -36,16 +37,13 @@ export default function Navigation() {
     if (!user?.id) return;
 
     try {
-      const data = await notificationsService.getUserNotifications(user.id, {
-        unread_only: true,
-      });
-
-      // data is an array, count only group invitations
-      const invitationCount = Array.isArray(data)
-        ? data.filter((n) => n.type === "group_invitation").length
-        : 0;
+      // Count only group invitations
+      const data = await notificationsService.getUnreadCount(
+        user.id,
+        "group_invitation"
+      );
 
-      setUnreadCount(invitationCount);
+      setUnreadCount(data?.unread_count || 0);
     } catch (err) {
       console.error("Error fetching unread count:", err);
     }
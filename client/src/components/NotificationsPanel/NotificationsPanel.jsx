@@ -21,6 +21,18 @@ const NotificationsPanel = ({ show, onHide, userId }) => {
   useEffect(() => {
     if (show && userId) {
       fetchNotifications();
+
+      // Add invitations that arrive while the panel is open
+      return notificationsService.streamNotifications(userId, {
+        type: "group_invitation",
+        onNotification: (notification) => {
+          setNotifications((prev) =>
+            prev.some((n) => n.id === notification.id)
+              ? prev
+              : [notification, ...prev]
+          );
+        },
+      });
     }
   }, [show, userId]);
 
@@ -31,14 +43,10 @@ const NotificationsPanel = ({ show, onHide, userId }) => {
 
       const data = await notificationsService.getUserNotifications(userId, {
         unread_only: true,
+        type: "group_invitation",
       });
 
-      // data is already an array
-      const invitations = Array.isArray(data)
-        ? data.filter((n) => n.type === "group_invitation")
-        : [];
-
-      setNotifications(invitations);
+      setNotifications(Array.isArray(data) ? data : []);
     } catch (err) {
       console.error("Error fetching notifications:", err);
       setError("Failed to load notifications");
@@ -0,0 +1,54 @@
+import axios from "axios";
+
+export const API_BASE_URL = "http://127.0.0.1:5000";
+
+// Shared axios instance for every service
+const apiClient = axios.create({
+  baseURL: API_BASE_URL,
+  headers: {
+    "Content-Type": "application/json",
+  },
+  timeout: 10000, // 10 seconds
+});
+
+// Request interceptor: auth token and, right after a command, the read-from-primary flag
+apiClient.interceptors.request.use(
+  (config) => {
+    // Add auth token from localStorage if exists
+    const token = localStorage.getItem("authToken");
+    if (token) {
+      config.headers.Authorization = `Bearer ${token}`;
+    }
+    if (Number(localStorage.getItem("readPrimaryUntil")) > Date.now()) {
+      config.headers["X-Read-Primary"] = "1";
+    }
+    return config;
+  },
+  (error) => Promise.reject(error)
+);
+
+// Response interceptor for read-your-writes and error handling
+apiClient.interceptors.response.use(
+  (response) => {
+    // After a command, read from the primary database for the seconds the API asks
+    const seconds = Number(response.headers["x-read-primary-for"]);
+    if (seconds > 0) {
+      localStorage.setItem("readPrimaryUntil", String(Date.now() + seconds * 1000));
+    }
+    return response;
+  },
+  (error) => {
+    if (error.response) {
+      // Server responded with error status
+      console.error("API Error:", error.response.data);
+    } else if (error.request) {
+      // Request made but no response
+      console.error("Network Error:", error.message);
+    } else {
+      console.error("Error:", error.message);
+    }
+    return Promise.reject(error);
+  }
+);
+
+export default apiClient;
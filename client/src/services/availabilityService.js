@@ -1,23 +1,4 @@
-import axios from "axios";
-
-const API_BASE_URL = "http://127.0.0.1:5000";
-
-const apiClient = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    "Content-Type": "application/json",
-  },
-  timeout: 10000,
-});
-
-// Add auth token if available
-apiClient.interceptors.request.use((config) => {
-  const token = localStorage.getItem("authToken");
-  if (token) {
-    config.headers.Authorization = `Bearer ${token}`;
-  }
-  return config;
-});
+import apiClient from "./apiClient";
 
 const availabilityService = {
   // ============ COMMAND API (Write Operations) ============
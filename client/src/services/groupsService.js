@@ -1,23 +1,4 @@
-import axios from "axios";
-
-const API_BASE_URL = "http://127.0.0.1:5000";
-
-const apiClient = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    "Content-Type": "application/json",
-  },
-  timeout: 10000,
-});
-
-// Add auth token
-apiClient.interceptors.request.use((config) => {
-  const token = localStorage.getItem("authToken");
-  if (token) {
-    config.headers.Authorization = `Bearer ${token}`;
-  }
-  return config;
-});
+import apiClient from "./apiClient";
 
 const groupsService = {
   // ============ COMMAND API (Write Operations) ============
@@ -200,19 +181,26 @@ const groupsService = {
    * @param {number} groupId - Group ID
    * @param {Object} [pagination] - Pagination options
    * @param {number} [pagination.limit=50] - Number of messages to return
-   * @param {number} [pagination.offset=0] - Offset for pagination
-   * @returns {Promise<Array>} Array of message objects
+   * @param {string} [pagination.before] - Cursor for the next older page
+   * @param {string} [pagination.after] - Cursor for messages newer than a page
+   * @returns {Promise<Object>} { messages (newest first), before, after } where
+   *   before/after are the cursors for the adjacent pages (null when none)
    */
   getGroupMessages: async (groupId, pagination = {}) => {
     try {
       const params = new URLSearchParams();
       if (pagination.limit) params.append("limit", pagination.limit);
-      if (pagination.offset) params.append("offset", pagination.offset);
+      if (pagination.before) params.append("before", pagination.before);
+      if (pagination.after) params.append("after", pagination.after);
 
       const response = await apiClient.get(
         `/api/queries/groups/${groupId}/messages?${params.toString()}`
       );
-      return response.data;
+      return {
+        messages: response.data,
+        before: response.headers["x-cursor-before"] || null,
+        after: response.headers["x-cursor-after"] || null,
+      };
     } catch (error) {
       throw error.response?.data || error;
     }
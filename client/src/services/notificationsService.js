@@ -1,23 +1,4 @@
-import axios from "axios";
-
-const API_BASE_URL = "http://127.0.0.1:5000";
-
-const apiClient = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    "Content-Type": "application/json",
-  },
-  timeout: 10000,
-});
-
-// Add auth token
-apiClient.interceptors.request.use((config) => {
-  const token = localStorage.getItem("authToken");
-  if (token) {
-    config.headers.Authorization = `Bearer ${token}`;
-  }
-  return config;
-});
+import apiClient, { API_BASE_URL } from "./apiClient";
 
 const notificationsService = {
   // ============ COMMAND API (Write Operations) ============
@@ -95,16 +76,22 @@ const notificationsService = {
   // ============ QUERY API (Read Operations) ============
 
   /**
-   * Get all notifications for a user
+   * Get a page of notifications for a user, newest first
    * @param {number} userId - User ID
    * @param {Object} [options] - Query options
    * @param {boolean} [options.unread_only=false] - Return only unread notifications
+   * @param {string} [options.type] - Only notifications of this type
+   * @param {number} [options.limit=50] - Page size (max 200)
+   * @param {string} [options.before] - Cursor (X-Cursor-Before) for the next older page
    * @returns {Promise<Array>} Array of notification objects
    */
   getUserNotifications: async (userId, options = {}) => {
     try {
       const params = new URLSearchParams();
       if (options.unread_only) params.append("unread_only", "true");
+      if (options.type) params.append("type", options.type);
+      if (options.limit) params.append("limit", options.limit);
+      if (options.before) params.append("before", options.before);
 
       const response = await apiClient.get(
         `/api/queries/notifications/${userId}?${params.toString()}`
@@ -116,20 +103,51 @@ const notificationsService = {
   },
 
   /**
-   * Get count of unread notifications
+   * Get count of unread notifications. The server sends an ETag, so the
+   * browser revalidates repeat polls and gets a 304 when nothing changed.
    * @param {number} userId - User ID
+   * @param {string} [type] - Only count notifications of this type
    * @returns {Promise<Object>} Object with unread_count
    */
-  getUnreadCount: async (userId) => {
+  getUnreadCount: async (userId, type) => {
     try {
       const response = await apiClient.get(
-        `/api/queries/notifications/${userId}/count`
+        `/api/queries/notifications/${userId}/count`,
+        { params: type ? { type } : {} }
       );
       return response.data;
     } catch (error) {
       throw error.response?.data || error;
     }
   },
+
+  /**
+   * Subscribe to a user's notifications over Server-Sent Events. The browser
+   * reconnects on its own and resumes after the last received notification.
+   * @param {number} userId - User ID
+   * @param {Object} handlers - Callbacks
+   * @param {string} [handlers.type] - Only stream notifications of this type
+   * @param {Function} [handlers.onNotification] - Called with each new notification
+   * @param {Function} [handlers.onUnread] - Called with the current unread count
+   * @returns {Function} Call to close the stream
+   */
+  streamNotifications: (userId, { type, onNotification, onUnread } = {}) => {
+    const query = type ? `?type=${encodeURIComponent(type)}` : "";
+    const source = new EventSource(
+      `${API_BASE_URL}/api/queries/notifications/${userId}/stream${query}`
+    );
+    if (onNotification) {
+      source.addEventListener("notification", (event) => {
+        onNotification(JSON.parse(event.data));
+      });
+    }
+    if (onUnread) {
+      source.addEventListener("unread", (event) => {
+        onUnread(JSON.parse(event.data).unread_count);
+      });
+    }
+    return () => source.close();
+  },
 };
 
 export default notificationsService;
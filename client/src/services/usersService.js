@@ -1,45 +1,4 @@
-import axios from "axios";
-
-const API_BASE_URL = "http://127.0.0.1:5000";
-
-// Create axios instance with default config
-const apiClient = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    "Content-Type": "application/json",
-  },
-  timeout: 10000, // 10 seconds
-});
-
-// Request interceptor for adding auth tokens
-apiClient.interceptors.request.use(
-  (config) => {
-    // Add auth token from localStorage if exists
-    const token = localStorage.getItem("authToken");
-    if (token) {
-      config.headers.Authorization = `Bearer ${token}`;
-    }
-    return config;
-  },
-  (error) => Promise.reject(error)
-);
-
-// Response interceptor for error handling
-apiClient.interceptors.response.use(
-  (response) => response,
-  (error) => {
-    if (error.response) {
-      // Server responded with error status
-      console.error("API Error:", error.response.data);
-    } else if (error.request) {
-      // Request made but no response
-      console.error("Network Error:", error.message);
-    } else {
-      console.error("Error:", error.message);
-    }
-    return Promise.reject(error);
-  }
-);
+import apiClient from "./apiClient";
 
 const usersService = {
   // ============ COMMAND API (Write Operations) ============
@@ -46,6 +46,25 @@ CREATE TABLE availability_text (
   FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+-- Parsed form of availability_text: 7 x 96 15-minute cells, bit = day * 96 + cell,
+-- little-endian. Rebuilt from the user's slots by every availability command.
+CREATE TABLE availability_grid (
+  user_id BIGINT UNSIGNED PRIMARY KEY,
+  week_bits BINARY(84) NOT NULL,
+  unparsed_slots JSON NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- Inverted index over availability_grid: one row per free 15-minute cell
+CREATE TABLE availability_buckets (
+  bucket SMALLINT UNSIGNED NOT NULL,
+  user_id BIGINT UNSIGNED NOT NULL,
+  PRIMARY KEY (bucket, user_id),
+  INDEX idx_avail_bucket_user (user_id),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 CREATE TABLE `groups` (
   id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
   owner_user_id BIGINT UNSIGNED NOT NULL,
@@ -57,6 +76,7 @@ CREATE TABLE `groups` (
   max_members INT NULL,
   tags JSON NULL,
   is_archived TINYINT(1) NOT NULL DEFAULT 0,
+  active_member_count INT NOT NULL DEFAULT 0,
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
   INDEX idx_groups_owner (owner_user_id),
   INDEX idx_groups_course (course_id),
@@ -82,18 +102,119 @@ CREATE TABLE messages (
   user_id BIGINT UNSIGNED NOT NULL,
   content TEXT NOT NULL,
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_msg_group (group_id),
+  INDEX idx_msg_group_created (group_id, created_at, id),
+  INDEX idx_msg_group_id (group_id, id),
   FOREIGN KEY (group_id) REFERENCES `groups`(id) ON DELETE CASCADE,
   FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
 
+CREATE TABLE group_read_state (
+  user_id BIGINT UNSIGNED NOT NULL,
+  group_id BIGINT UNSIGNED NOT NULL,
+  last_read_message_id BIGINT UNSIGNED NOT NULL,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, group_id),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  FOREIGN KEY (group_id) REFERENCES `groups`(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 CREATE TABLE notifications (
   id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
   user_id BIGINT UNSIGNED NOT NULL,
   type VARCHAR(64) NOT NULL,
   data JSON NULL,
   is_read TINYINT(1) NOT NULL DEFAULT 0,
+  ref_type VARCHAR(32) NULL,
+  ref_id BIGINT UNSIGNED NULL,
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_notif_user (user_id, is_read),
+  INDEX idx_notif_user_unread (user_id, is_read, created_at, id),
+  INDEX idx_notif_user_ref (user_id, ref_type, ref_id),
+  INDEX idx_notif_user_created (user_id, created_at, id),
   FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 ) ENGINE=InnoDB;
+
+CREATE TABLE event_outbox (
+  id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+  event_type VARCHAR(64) NOT NULL,
+  payload JSON NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  attempts INT NOT NULL DEFAULT 0,
+  claimed_at TIMESTAMP NULL,
+  processed_at TIMESTAMP NULL,
+  last_error TEXT NULL,
+  INDEX idx_outbox_pending (processed_at, id)
+) ENGINE=InnoDB;
+
+CREATE TABLE event_log (
+  id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+  event_type VARCHAR(64) NOT NULL,
+  payload JSON NOT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+CREATE TABLE projection_checkpoints (
+  name VARCHAR(64) PRIMARY KEY,
+  status VARCHAR(16) NOT NULL,
+  last_event_id BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB;
+
+-- Projected read tables (no foreign keys: rebuilt from event_log)
+CREATE TABLE user_group_list (
+  user_id BIGINT UNSIGNED NOT NULL,
+  group_id BIGINT UNSIGNED NOT NULL,
+  role VARCHAR(16) NOT NULL,
+  joined_at TIMESTAMP NOT NULL,
+  name VARCHAR(255) NOT NULL,
+  description TEXT NULL,
+  meeting_time VARCHAR(120) NULL,
+  location VARCHAR(160) NULL,
+  max_members INT NULL,
+  tags JSON NULL,
+  course_code VARCHAR(32) NOT NULL,
+  course_name VARCHAR(255) NOT NULL,
+  owner_name VARCHAR(120) NOT NULL,
+  member_count INT NOT NULL,
+  PRIMARY KEY (user_id, group_id),
+  INDEX idx_ugl_user_joined (user_id, joined_at),
+  INDEX idx_ugl_group (group_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE course_group_list (
+  group_id BIGINT UNSIGNED PRIMARY KEY,
+  course_id VARCHAR(32) NOT NULL,
+  name VARCHAR(255) NOT NULL,
+  description TEXT NULL,
+  meeting_time VARCHAR(120) NULL,
+  location VARCHAR(160) NULL,
+  max_members INT NULL,
+  created_at TIMESTAMP NOT NULL,
+  owner_name VARCHAR(120) NOT NULL,
+  member_count INT NOT NULL,
+  INDEX idx_cgl_course_created (course_id, created_at)
+) ENGINE=InnoDB;
+
+CREATE TABLE user_matches (
+  user_id BIGINT UNSIGNED NOT NULL,
+  match_rank INT NOT NULL,
+  match_user_id BIGINT UNSIGNED NOT NULL,
+  shared_courses INT NOT NULL,
+  shared_course_codes VARCHAR(1024) NOT NULL,
+  computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, match_rank),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  FOREIGN KEY (match_user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- precompute-matches builds here, then swaps it with user_matches
+CREATE TABLE user_matches_staging (
+  user_id BIGINT UNSIGNED NOT NULL,
+  match_rank INT NOT NULL,
+  match_user_id BIGINT UNSIGNED NOT NULL,
+  shared_courses INT NOT NULL,
+  shared_course_codes VARCHAR(1024) NOT NULL,
+  computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (user_id, match_rank),
+  FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+  FOREIGN KEY (match_user_id) REFERENCES users(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
@@ -164,3 +164,15 @@ INSERT INTO group_members (group_id, user_id, role)
 SELECT g.id, u.id, 'member'
 FROM `groups` g JOIN users u ON u.email IN ('bob.johnson@university.edu','frank.miller@university.edu')
 WHERE g.name='AI & ML Study Group';
+
+-- Denormalized member counts (normally maintained by the group commands)
+UPDATE `groups` g
+SET active_member_count = (
+  SELECT COUNT(*) FROM group_members gm
+  WHERE gm.group_id = g.id AND gm.status = 'active'
+);
+
+-- Typed references for notifications written before ref_type/ref_id existed
+UPDATE notifications
+SET ref_type = 'group', ref_id = JSON_EXTRACT(data, '$.group_id')
+WHERE ref_type IS NULL AND JSON_EXTRACT(data, '$.group_id') IS NOT NULL;
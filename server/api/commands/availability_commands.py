@@ -6,6 +6,7 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
 from db import engine
+from domain.availability import sync_availability_grid
 
 bp_availability_commands = Blueprint("availability_commands", __name__)
 
@@ -40,8 +41,9 @@ def add_availability_slot(user_id: int):
                 {"uid": user_id, "slot": slot}
             )
             slot_id = result.lastrowid
+            unparsed = sync_availability_grid(conn, user_id)
 
-        return jsonify({"ok": True, "slot_id": slot_id}), 201
+        return jsonify({"ok": True, "slot_id": slot_id, "unparsed_slots": unparsed}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -64,7 +66,9 @@ def delete_availability_slot(user_id: int, slot_id: int):
             if result.rowcount == 0:
                 return jsonify({"error": "Availability slot not found"}), 404
 
-        return jsonify({"ok": True, "message": "Availability slot deleted"}), 200
+            unparsed = sync_availability_grid(conn, user_id)
+
+        return jsonify({"ok": True, "message": "Availability slot deleted", "unparsed_slots": unparsed}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -108,6 +112,8 @@ def update_all_availability(user_id: int):
                         {"uid": user_id, "slot": slot}
                     )
 
-        return jsonify({"ok": True, "message": "Availability updated"}), 200
+            unparsed = sync_availability_grid(conn, user_id)
+
+        return jsonify({"ok": True, "message": "Availability updated", "unparsed_slots": unparsed}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -6,6 +6,7 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
 from db import engine
+from domain.match_index import match_index
 
 bp_courses_commands = Blueprint("courses_commands", __name__)
 
@@ -68,7 +69,7 @@ def enroll_in_course(course_id: str):
         with engine.begin() as conn:
             # Check if course exists
             course = conn.execute(
-                text("SELECT id FROM courses WHERE id = :cid"),
+                text("SELECT id, code FROM courses WHERE id = :cid"),
                 {"cid": course_id}
             ).first()
             
@@ -102,6 +103,7 @@ def enroll_in_course(course_id: str):
                 {"uid": user_id, "cid": course_id}
             )
 
+        match_index.add_enrollment(user_id, course_id, course.code)
         return jsonify({"ok": True, "message": "Enrolled successfully"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -128,6 +130,7 @@ def unenroll_from_course(course_id: str):
             if result.rowcount == 0:
                 return jsonify({"error": "Enrollment not found"}), 404
 
+        match_index.remove_enrollment(user_id, course_id)
         return jsonify({"ok": True, "message": "Unenrolled successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
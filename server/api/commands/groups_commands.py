@@ -1,13 +1,25 @@
 """
 Groups Command API - Write operations for groups (CQRS Command Side)
-Handles: Create, Update, Delete, Join, Leave, Transfer Ownership
+Handles: Create, Update, Delete, Join, Leave, Transfer Ownership, Mark read
 """
+import json
+
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
 from db import engine
-from domain.event_bus import event_bus
-from domain.events import GroupCreated, GroupJoined
+from domain.events import (
+    GroupArchived,
+    GroupCreated,
+    GroupDeleted,
+    GroupJoined,
+    GroupLeft,
+    GroupOwnershipTransferred,
+    GroupUpdated,
+)
+from domain.notifications import notifications_changed
+from domain.read_state import mark_read
+from domain.unit_of_work import unit_of_work
 
 bp_groups_commands = Blueprint("groups_commands", __name__)
 
@@ -28,13 +40,15 @@ def create_group():
         return jsonify({"error": "owner_user_id, course_id, and name are required"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             res = conn.execute(
                 text(
                     """
                     INSERT INTO `groups`
-                    (owner_user_id, course_id, name, description, meeting_time, location, max_members)
-                    VALUES (:oid, :cid, :name, :desc, :mt, :loc, :maxm)
+                    (owner_user_id, course_id, name, description, meeting_time, location, max_members,
+                     active_member_count)
+                    VALUES (:oid, :cid, :name, :desc, :mt, :loc, :maxm, 1)
                     """
                 ),
                 {
@@ -58,8 +72,8 @@ def create_group():
                 ),
                 {"gid": group_id, "uid": owner_user_id},
             )
+            uow.add_event(GroupCreated(group_id=group_id, owner_user_id=owner_user_id))
 
-        event_bus.publish(GroupCreated(group_id=group_id, owner_user_id=owner_user_id))
         return jsonify({"ok": True, "group_id": group_id}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -84,7 +98,8 @@ def update_group(group_id: int):
         return jsonify({"error": "No valid fields to update"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             # Check group exists
             exists = conn.execute(
                 text("SELECT id FROM `groups` WHERE id = :gid"),
@@ -96,6 +111,7 @@ def update_group(group_id: int):
             
             query = f"UPDATE `groups` SET {', '.join(update_fields)} WHERE id = :gid"
             conn.execute(text(query), params)
+            uow.add_event(GroupUpdated(group_id=group_id))
 
         return jsonify({"ok": True, "message": "Group updated"}), 200
     except Exception as e:
@@ -108,7 +124,8 @@ def delete_group(group_id: int):
     hard_delete = request.args.get("hard_delete", "false").lower() == "true"
     
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             if hard_delete:
                 result = conn.execute(
                     text("DELETE FROM `groups` WHERE id = :gid"),
@@ -123,6 +140,7 @@ def delete_group(group_id: int):
             
             if result.rowcount == 0:
                 return jsonify({"error": "Group not found"}), 404
+            uow.add_event(GroupDeleted(group_id=group_id) if hard_delete else GroupArchived(group_id=group_id))
 
         return jsonify({"ok": True, "message": "Group deleted"}), 200
     except Exception as e:
@@ -139,24 +157,22 @@ def join_group(group_id: int):
     if not user_id:
         return jsonify({"error": "user_id is required"}), 400
 
+    invited = False
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             g = conn.execute(
-                text("SELECT owner_user_id, max_members, name, course_id FROM `groups` WHERE id = :gid"),
-                {"gid": group_id},
-            ).mappings().first()
-            if not g:
-                return jsonify({"error": "Group not found"}), 404
-
-            c = conn.execute(
                 text(
-                    "SELECT COUNT(*) AS cnt FROM group_members "
-                    "WHERE group_id = :gid AND status = 'active'"
+                    "SELECT owner_user_id, max_members, name, course_id, active_member_count "
+                    "FROM `groups` WHERE id = :gid"
                 ),
                 {"gid": group_id},
             ).mappings().first()
+            if not g:
+                return jsonify({"error": "Group not found"}), 404
 
-            if g["max_members"] is not None and c["cnt"] >= g["max_members"]:
+            # Unlocked fast path; the authoritative check is _claim_seat below
+            if g["max_members"] is not None and g["active_member_count"] >= g["max_members"]:
                 return jsonify({"error": "Group is full"}), 400
 
             # If inviter_id provided, create a pending invitation and notification
@@ -195,16 +211,33 @@ def join_group(group_id: int):
                 conn.execute(
                     text(
                         """
-                        INSERT INTO notifications (user_id, type, data)
-                        VALUES (:uid, 'group_invitation', :data)
+                        INSERT INTO notifications (user_id, type, data, ref_type, ref_id)
+                        VALUES (:uid, 'group_invitation', :data, 'group', :gid)
                         """
                     ),
-                    {"uid": user_id, "data": str(notification_data).replace("'", '"')}
+                    {"uid": user_id, "data": json.dumps(notification_data), "gid": group_id}
                 )
 
+                invited = True
                 return jsonify({"ok": True, "message": "Invitation sent", "status": "pending"}), 201
 
             # No inviter_id -> user is requesting to join directly (active)
+            existing = conn.execute(
+                text(
+                    "SELECT status FROM group_members WHERE group_id = :gid AND user_id = :uid"
+                ),
+                {"gid": group_id, "uid": user_id}
+            ).first()
+
+            if existing:
+                if existing.status == 'active':
+                    return jsonify({"error": "User already in group"}), 400
+                return jsonify({"error": "Invitation already pending"}), 400
+
+            # Claim the seat before inserting; the row lock lasts only until commit
+            if not _claim_seat(conn, group_id):
+                return jsonify({"error": "Group is full"}), 400
+
             conn.execute(
                 text(
                     """
@@ -214,17 +247,21 @@ def join_group(group_id: int):
                 ),
                 {"gid": group_id, "uid": user_id},
             )
-
-        event_bus.publish(
-            GroupJoined(
-                group_id=group_id,
-                user_id=user_id,
-                owner_user_id=g["owner_user_id"],
+            uow.add_event(
+                GroupJoined(
+                    group_id=group_id,
+                    user_id=user_id,
+                    owner_user_id=g["owner_user_id"],
+                )
             )
-        )
+
         return jsonify({"ok": True, "message": "Joined group"}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+    finally:
+        # Runs after the transaction has committed
+        if invited:
+            notifications_changed(user_id)
 
 
 @bp_groups_commands.post("/<int:group_id>/leave")
@@ -237,7 +274,8 @@ def leave_group(group_id: int):
         return jsonify({"error": "user_id is required"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             # Check if user is the owner
             group = conn.execute(
                 text("SELECT owner_user_id FROM `groups` WHERE id = :gid"),
@@ -250,7 +288,17 @@ def leave_group(group_id: int):
             if group.owner_user_id == user_id:
                 return jsonify({"error": "Owner cannot leave group. Transfer ownership or delete group."}), 400
 
-            result = conn.execute(
+            member = conn.execute(
+                text(
+                    "SELECT status FROM group_members WHERE group_id = :gid AND user_id = :uid"
+                ),
+                {"gid": group_id, "uid": user_id}
+            ).first()
+
+            if not member:
+                return jsonify({"error": "User is not a member of this group"}), 404
+
+            conn.execute(
                 text(
                     """
                     DELETE FROM group_members
@@ -259,9 +307,10 @@ def leave_group(group_id: int):
                 ),
                 {"gid": group_id, "uid": user_id}
             )
-            
-            if result.rowcount == 0:
-                return jsonify({"error": "User is not a member of this group"}), 404
+
+            if member.status == 'active':
+                _adjust_member_count(conn, group_id, -1)
+            uow.add_event(GroupLeft(group_id=group_id, user_id=user_id))
 
         return jsonify({"ok": True, "message": "Left group successfully"}), 200
     except Exception as e:
@@ -278,7 +327,8 @@ def transfer_group_ownership(group_id: int):
         return jsonify({"error": "new_owner_id is required"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             # Check group exists
             group = conn.execute(
                 text("SELECT owner_user_id FROM `groups` WHERE id = :gid"),
@@ -330,6 +380,13 @@ def transfer_group_ownership(group_id: int):
                 ),
                 {"gid": group_id, "old_owner": group.owner_user_id}
             )
+            uow.add_event(
+                GroupOwnershipTransferred(
+                    group_id=group_id,
+                    old_owner_user_id=group.owner_user_id,
+                    new_owner_user_id=new_owner_id,
+                )
+            )
 
         return jsonify({"ok": True, "message": "Ownership transferred"}), 200
     except Exception as e:
@@ -346,7 +403,8 @@ def accept_group_invitation(group_id: int):
         return jsonify({"error": "user_id is required"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             invitation = conn.execute(
                 text(
                     """
@@ -363,6 +421,9 @@ def accept_group_invitation(group_id: int):
             if invitation.status != 'pending':
                 return jsonify({"error": "Invitation is not pending"}), 400
 
+            if not _claim_seat(conn, group_id):
+                return jsonify({"error": "Group is full"}), 400
+
             conn.execute(
                 text(
                     """
@@ -385,20 +446,21 @@ def accept_group_invitation(group_id: int):
                     UPDATE notifications
                     SET is_read = 1
                     WHERE user_id = :uid
+                    AND ref_type = 'group' AND ref_id = :gid
                     AND type = 'group_invitation'
-                    AND JSON_EXTRACT(data, '$.group_id') = :gid
                     """
                 ),
                 {"uid": user_id, "gid": group_id}
             )
-
-        event_bus.publish(
-            GroupJoined(
-                group_id=group_id,
-                user_id=user_id,
-                owner_user_id=group.owner_user_id,
+            uow.add_event(
+                GroupJoined(
+                    group_id=group_id,
+                    user_id=user_id,
+                    owner_user_id=group.owner_user_id,
+                )
             )
-        )
+
+        notifications_changed(user_id)
 
         return jsonify({"ok": True, "message": "Invitation accepted"}), 200
     except Exception as e:
@@ -448,13 +510,85 @@ def decline_group_invitation(group_id: int):
                     UPDATE notifications
                     SET is_read = 1
                     WHERE user_id = :uid
+                    AND ref_type = 'group' AND ref_id = :gid
                     AND type = 'group_invitation'
-                    AND JSON_EXTRACT(data, '$.group_id') = :gid
                     """
                 ),
                 {"uid": user_id, "gid": group_id}
             )
 
+        notifications_changed(user_id)
         return jsonify({"ok": True, "message": "Invitation declined"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@bp_groups_commands.post("/<int:group_id>/read")
+def mark_group_read(group_id: int):
+    """Advance a member's read cursor to `message_id` (default: the latest message)"""
+    data = request.get_json(force=True)
+    user_id = data.get("user_id")
+    message_id = data.get("message_id")
+
+    if not user_id:
+        return jsonify({"error": "user_id is required"}), 400
+
+    try:
+        with engine.begin() as conn:
+            member = conn.execute(
+                text(
+                    """
+                    SELECT 1 FROM group_members
+                    WHERE group_id = :gid AND user_id = :uid AND status = 'active'
+                    """
+                ),
+                {"gid": group_id, "uid": user_id}
+            ).first()
+
+            if not member:
+                return jsonify({"error": "User is not a member of this group"}), 404
+
+            if message_id is not None:
+                in_group = conn.execute(
+                    text("SELECT 1 FROM messages WHERE id = :mid AND group_id = :gid"),
+                    {"mid": message_id, "gid": group_id}
+                ).first()
+
+                if not in_group:
+                    return jsonify({"error": "message_id is not a message in this group"}), 400
+
+            last_read = mark_read(conn, user_id, group_id, message_id)
+
+        return jsonify({"ok": True, "last_read_message_id": last_read}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _claim_seat(conn, group_id: int) -> bool:
+    """
+    Atomically take one seat in a group. The capacity check and increment are a
+    single conditional UPDATE, so concurrent joins cannot overfill the group.
+    Returns False when the group is full.
+    """
+    result = conn.execute(
+        text(
+            """
+            UPDATE `groups`
+            SET active_member_count = active_member_count + 1
+            WHERE id = :gid
+            AND (max_members IS NULL OR active_member_count < max_members)
+            """
+        ),
+        {"gid": group_id}
+    )
+    return result.rowcount == 1
+
+
+def _adjust_member_count(conn, group_id: int, delta: int):
+    """Keep `groups.active_member_count` in step with group_members in the caller's transaction"""
+    conn.execute(
+        text(
+            "UPDATE `groups` SET active_member_count = active_member_count + :delta WHERE id = :gid"
+        ),
+        {"gid": group_id, "delta": delta}
+    )
@@ -6,8 +6,9 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
 from db import engine
-from domain.event_bus import event_bus
 from domain.events import GroupMessagePosted
+from domain.read_state import mark_read
+from domain.unit_of_work import unit_of_work
 
 bp_messages_commands = Blueprint("messages_commands", __name__)
 
@@ -24,7 +25,8 @@ def post_message():
         return jsonify({"error": "group_id, user_id and content are required"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             mres = conn.execute(
                 text(
                     """
@@ -35,14 +37,16 @@ def post_message():
                 {"gid": group_id, "uid": user_id, "content": content},
             )
             message_id = mres.lastrowid
-
-        event_bus.publish(
-            GroupMessagePosted(
-                group_id=group_id,
-                user_id=user_id,
-                message_id=message_id,
+            # The poster has seen everything up to their own message
+            mark_read(conn, user_id, group_id, message_id)
+            uow.add_event(
+                GroupMessagePosted(
+                    group_id=group_id,
+                    user_id=user_id,
+                    message_id=message_id,
+                )
             )
-        )
+
         return jsonify({"ok": True, "message_id": message_id}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
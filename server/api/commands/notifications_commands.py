@@ -7,6 +7,7 @@ import json
 from sqlalchemy import text
 
 from db import engine
+from domain.notifications import notifications_changed
 
 bp_notifications_commands = Blueprint("notifications_commands", __name__)
 
@@ -17,6 +18,8 @@ def create_notification(user_id: int):
     data = request.get_json(force=True)
     notif_type = data.get("type")
     notif_data = data.get("data")
+    ref_type = data.get("ref_type")
+    ref_id = data.get("ref_id")
     # Serialize data to JSON for storage
     if notif_data is not None:
         notif_data = json.dumps(notif_data)
@@ -24,6 +27,9 @@ def create_notification(user_id: int):
     if not notif_type:
         return jsonify({"error": "type is required"}), 400
 
+    if (ref_type is None) != (ref_id is None):
+        return jsonify({"error": "ref_type and ref_id must be given together"}), 400
+
     try:
         with engine.begin() as conn:
             # Check if user exists
@@ -38,14 +44,15 @@ def create_notification(user_id: int):
             result = conn.execute(
                 text(
                     """
-                    INSERT INTO notifications (user_id, type, data)
-                    VALUES (:uid, :type, :data)
+                    INSERT INTO notifications (user_id, type, data, ref_type, ref_id)
+                    VALUES (:uid, :type, :data, :ref_type, :ref_id)
                     """
                 ),
-                {"uid": user_id, "type": notif_type, "data": notif_data}
+                {"uid": user_id, "type": notif_type, "data": notif_data, "ref_type": ref_type, "ref_id": ref_id}
             )
             notification_id = result.lastrowid
 
+        notifications_changed(user_id)
         return jsonify({"ok": True, "notification_id": notification_id}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -70,6 +77,7 @@ def mark_notification_read(user_id: int, notification_id: int):
             if result.rowcount == 0:
                 return jsonify({"error": "Notification not found"}), 404
 
+        notifications_changed(user_id)
         return jsonify({"ok": True, "message": "Notification marked as read"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -100,6 +108,7 @@ def mark_all_notifications_read(user_id: int):
                 {"uid": user_id}
             )
 
+        notifications_changed(user_id)
         return jsonify({"ok": True, "updated_count": result.rowcount}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -123,6 +132,7 @@ def delete_notification(user_id: int, notification_id: int):
             if result.rowcount == 0:
                 return jsonify({"error": "Notification not found"}), 404
 
+        notifications_changed(user_id)
         return jsonify({"ok": True, "message": "Notification deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
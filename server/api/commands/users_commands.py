@@ -7,6 +7,10 @@ from sqlalchemy import text
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from db import engine
+from domain.events import UserDeleted, UserUpdated
+from domain.match_index import match_index
+from domain.notification_counts import unread_counts
+from domain.unit_of_work import unit_of_work
 
 bp_users_commands = Blueprint("users_commands", __name__)
 
@@ -132,7 +136,8 @@ def update_user(user_id: int):
         return jsonify({"error": "No valid fields to update"}), 400
 
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
             # Check user exists
             exists = conn.execute(
                 text("SELECT id FROM users WHERE id = :uid"),
@@ -144,6 +149,7 @@ def update_user(user_id: int):
             
             query = f"UPDATE users SET {', '.join(update_fields)} WHERE id = :uid"
             conn.execute(text(query), params)
+            uow.add_event(UserUpdated(user_id=user_id))
 
         return jsonify({"ok": True, "message": "User updated"}), 200
     except Exception as e:
@@ -154,7 +160,35 @@ def update_user(user_id: int):
 def delete_user(user_id: int):
     """Delete user account"""
     try:
-        with engine.begin() as conn:
+        with unit_of_work() as uow:
+            conn = uow.conn
+            # Owned groups and memberships cascade away with the user
+            group_ids = conn.execute(
+                text(
+                    """
+                    SELECT group_id FROM group_members WHERE user_id = :uid
+                    UNION
+                    SELECT id FROM `groups` WHERE owner_user_id = :uid
+                    """
+                ),
+                {"uid": user_id}
+            ).scalars().all()
+
+            # Release the user's seats before the memberships go
+            conn.execute(
+                text(
+                    """
+                    UPDATE `groups`
+                    SET active_member_count = active_member_count - 1
+                    WHERE id IN (
+                        SELECT group_id FROM group_members
+                        WHERE user_id = :uid AND status = 'active'
+                    )
+                    """
+                ),
+                {"uid": user_id}
+            )
+
             result = conn.execute(
                 text("DELETE FROM users WHERE id = :uid"),
                 {"uid": user_id}
@@ -162,7 +196,10 @@ def delete_user(user_id: int):
             
             if result.rowcount == 0:
                 return jsonify({"error": "User not found"}), 404
+            uow.add_event(UserDeleted(user_id=user_id, group_ids=sorted(group_ids)))
 
+        match_index.remove_user(user_id)
+        unread_counts.invalidate(user_id)
         return jsonify({"ok": True, "message": "User deleted"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
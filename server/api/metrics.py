@@ -0,0 +1,76 @@
+"""
+Metrics API - Operational read-outs for in-process structures
+Handles: Match index, PubSub hub, Unread count cache, Event bus, Outbox relay,
+Projection, Read routing, Connection pool and Query stats
+"""
+from flask import Blueprint, jsonify, request
+
+from db import engine, read_engine
+from db_pool import pool_stats
+from db_profiling import query_stats
+from domain.event_bus import event_bus
+from domain.match_index import match_index
+from domain.notification_counts import unread_counts
+from domain.outbox import outbox_relay
+from domain.projections import projections
+from domain.pubsub import hub
+
+bp_metrics = Blueprint("metrics", __name__)
+
+
+@bp_metrics.get("/match-index")
+def get_match_index_stats():
+    """Size, memory footprint and last rebuild time of the classmate match index"""
+    return jsonify(match_index.stats()), 200
+
+
+@bp_metrics.get("/pubsub")
+def get_pubsub_stats():
+    """Live subscribers, deliveries and slow-consumer evictions of the pub/sub hub"""
+    return jsonify(hub.stats()), 200
+
+
+@bp_metrics.get("/notification-counts")
+def get_notification_count_stats():
+    """Size and hit rate of the unread notification count cache"""
+    return jsonify(unread_counts.stats()), 200
+
+
+@bp_metrics.get("/event-bus")
+def get_event_bus_stats():
+    """Dispatch mode, queue depth and dropped/spilled/failed event counts of the event bus"""
+    return jsonify(event_bus.stats()), 200
+
+
+@bp_metrics.get("/outbox")
+def get_outbox_stats():
+    """Relay throughput, pending outbox rows and the age of the oldest one"""
+    return jsonify(outbox_relay.stats()), 200
+
+
+@bp_metrics.get("/projections")
+def get_projection_stats():
+    """Build status and replay checkpoint of each projection against the event log head"""
+    return jsonify(projections.stats()), 200
+
+
+@bp_metrics.get("/read-routing")
+def get_read_routing_stats():
+    """Connections in use and reads served per read replica, and reads sent to the primary"""
+    return jsonify(read_engine.stats()), 200
+
+
+@bp_metrics.get("/db-pool")
+def get_db_pool_stats():
+    """Checkouts, waits, overflow and checkout latency of the primary and read replica pools"""
+    return jsonify({
+        "primary": pool_stats(engine),
+        "replicas": [pool_stats(replica) for replica in read_engine.replicas],
+    }), 200
+
+
+@bp_metrics.get("/queries")
+def get_query_stats():
+    """Query count and DB time per endpoint, possible N+1 requests and the slowest statements (`?top=20`)"""
+    top = request.args.get("top", default=20, type=int)
+    return jsonify(query_stats.summary(top=max(1, top))), 200
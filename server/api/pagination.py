@@ -0,0 +1,80 @@
+"""
+Keyset Pagination - opaque (created_at, id) cursors for newest-first feeds
+A cursor names the row a page ended on; the next page is the index range
+strictly before (or after) it, so deep pages cost the same as the first.
+"""
+import base64
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+
+CURSOR_HEADERS = ["X-Cursor-Before", "X-Cursor-After"]
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id: int) -> str:
+    raw = f"{created_at}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, _, row_id = base64.urlsafe_b64decode(padded).decode().rpartition("|")
+        if not created_at:
+            raise ValueError
+        return created_at, int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise CursorError("Invalid cursor")
+
+
+def keyset_page(conn, query: str, params: dict, limit: int,
+                before: Optional[str] = None, after: Optional[str] = None,
+                created_col: str = "created_at", id_col: str = "id",
+                created_key: str = "created_at"):
+    """
+    Run `query` (a SELECT ending in a WHERE clause) for one newest-first page.
+    `created_col`/`id_col` are the SQL columns to page on and `created_key`
+    the result key holding the timestamp.
+
+    `before` pages towards older rows, `after` towards newer ones; rows are
+    always returned newest first. Returns (rows, headers) where headers carry
+    the cursors for the adjacent pages: X-Cursor-Before only while older rows
+    may remain, X-Cursor-After whenever the page is non-empty so clients can
+    poll for newer rows.
+    """
+    if before and after:
+        raise CursorError("Use either before or after, not both")
+
+    params = dict(params, limit=limit + 1)
+    if after:
+        params["c_at"], params["c_id"] = decode_cursor(after)
+        query += (
+            f" AND ({created_col} > :c_at OR ({created_col} = :c_at AND {id_col} > :c_id))"
+            f" ORDER BY {created_col} ASC, {id_col} ASC LIMIT :limit"
+        )
+    else:
+        if before:
+            params["c_at"], params["c_id"] = decode_cursor(before)
+            query += f" AND ({created_col} < :c_at OR ({created_col} = :c_at AND {id_col} < :c_id))"
+        query += f" ORDER BY {created_col} DESC, {id_col} DESC LIMIT :limit"
+
+    rows = [dict(r) for r in conn.execute(text(query), params).mappings().all()]
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after:
+        rows.reverse()
+
+    headers = {}
+    if rows:
+        newest, oldest = rows[0], rows[-1]
+        headers["X-Cursor-After"] = encode_cursor(newest[created_key], newest["id"])
+        # Paging backwards from `after` always has older rows: the cursor row itself
+        if has_more or after:
+            headers["X-Cursor-Before"] = encode_cursor(oldest[created_key], oldest["id"])
+    elif after:
+        headers["X-Cursor-After"] = after
+    return rows, headers
@@ -1,11 +1,24 @@
 """
 Availability Query API - Read operations for availability (CQRS Query Side)
-Handles: Get user availability slots
+Handles: Get user availability slots, week grid, overlap between users,
+who in a course is free at a given time
 """
+import json
+
 from flask import Blueprint, jsonify, request
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 
-from db import engine
+from db import read_engine
+from domain.availability import (
+    SlotParseError,
+    bits_to_intervals,
+    bytes_to_bits,
+    cells,
+    format_interval,
+    intervals_to_bits,
+    overlap_minutes,
+    parse_slot,
+)
 
 bp_availability_queries = Blueprint("availability_queries", __name__)
 
@@ -14,7 +27,7 @@ bp_availability_queries = Blueprint("availability_queries", __name__)
 def get_user_availability(user_id: int):
     """Get all availability slots for a user"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             # Check if user exists
             user = conn.execute(
                 text("SELECT id FROM users WHERE id = :uid"),
@@ -39,3 +52,121 @@ def get_user_availability(user_id: int):
         return jsonify([dict(s) for s in slots]), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@bp_availability_queries.get("/<int:user_id>/grid")
+def get_user_availability_grid(user_id: int):
+    """Get a user's parsed availability as merged weekly intervals"""
+    try:
+        with read_engine.connect() as conn:
+            user = conn.execute(
+                text("SELECT id FROM users WHERE id = :uid"),
+                {"uid": user_id}
+            ).first()
+
+            if not user:
+                return jsonify({"error": "User not found"}), 404
+
+            grid = conn.execute(
+                text(
+                    """
+                    SELECT week_bits, unparsed_slots, updated_at
+                    FROM availability_grid
+                    WHERE user_id = :uid
+                    """
+                ),
+                {"uid": user_id}
+            ).mappings().first()
+
+        bits = bytes_to_bits(grid["week_bits"]) if grid else 0
+        return jsonify(
+            {
+                "intervals": [format_interval(i) for i in bits_to_intervals(bits)],
+                "free_minutes": overlap_minutes(bits, bits),
+                "unparsed_slots": json.loads(grid["unparsed_slots"] or "[]") if grid else [],
+                "updated_at": grid["updated_at"] if grid else None,
+            }
+        ), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp_availability_queries.get("/<int:user_id>/overlap/<int:other_id>")
+def get_availability_overlap(user_id: int, other_id: int):
+    """Get the weekly free time two users have in common"""
+    try:
+        with read_engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT u.id, g.week_bits
+                    FROM users u
+                    LEFT JOIN availability_grid g ON g.user_id = u.id
+                    WHERE u.id IN (:uid, :oid)
+                    """
+                ),
+                {"uid": user_id, "oid": other_id}
+            ).mappings().all()
+
+        bits = {r["id"]: bytes_to_bits(r["week_bits"]) for r in rows}
+        if user_id not in bits or other_id not in bits:
+            return jsonify({"error": "User not found"}), 404
+
+        common = bits[user_id] & bits[other_id]
+        return jsonify(
+            {
+                "overlap_minutes": overlap_minutes(bits[user_id], bits[other_id]),
+                "intervals": [format_interval(i) for i in bits_to_intervals(common)],
+            }
+        ), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@bp_availability_queries.get("/course/<course_id>/free")
+def get_course_free_students(course_id: str):
+    """
+    Get students enrolled in a course who are free for the whole of `at`,
+    a slot in the same format users type (e.g. "Monday 10am-11am")
+    """
+    at = request.args.get("at", "")
+    try:
+        window = parse_slot(at)
+    except SlotParseError as e:
+        return jsonify({"error": f"at: {e}"}), 400
+    buckets = cells(intervals_to_bits(window, partial_cells=True))
+
+    try:
+        with read_engine.connect() as conn:
+            course = conn.execute(
+                text("SELECT id FROM courses WHERE id = :cid"),
+                {"cid": course_id}
+            ).first()
+
+            if not course:
+                return jsonify({"error": "Course not found"}), 404
+
+            students = conn.execute(
+                text(
+                    """
+                    SELECT u.id, u.name, u.email, u.avatar, u.major, u.year
+                    FROM availability_buckets b
+                    JOIN enrollments e ON e.user_id = b.user_id AND e.course_id = :cid
+                    JOIN users u ON u.id = b.user_id
+                    WHERE b.bucket IN :buckets
+                    GROUP BY u.id, u.name, u.email, u.avatar, u.major, u.year
+                    HAVING COUNT(*) = :needed
+                    ORDER BY u.name
+                    """
+                ).bindparams(bindparam("buckets", expanding=True)),
+                {"cid": course_id, "buckets": buckets, "needed": len(buckets)}
+            ).mappings().all()
+
+        return jsonify(
+            {
+                "window": [format_interval(i) for i in window],
+                "students": [dict(s) for s in students],
+            }
+        ), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -5,7 +5,9 @@ Handles: List courses, Get course detail, Get students, Get groups
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
-from db import engine
+from config import PROJECTIONS_ENABLED
+from db import read_engine
+from domain.projections import projections
 
 bp_courses_queries = Blueprint("courses_queries", __name__)
 
@@ -35,7 +37,7 @@ def list_courses():
         
         query += " ORDER BY code, section"
         
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(text(query), params).mappings().all()
 
         return jsonify([dict(r) for r in rows]), 200
@@ -47,7 +49,7 @@ def list_courses():
 def get_course(course_id: str):
     """Get detailed course information"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             course = conn.execute(
                 text(
                     """
@@ -81,7 +83,7 @@ def get_course(course_id: str):
 def get_course_students(course_id: str):
     """Get list of students enrolled in a course"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             # Check if course exists
             course = conn.execute(
                 text("SELECT id FROM courses WHERE id = :cid"),
@@ -114,25 +116,28 @@ def get_course_students(course_id: str):
 def get_course_groups(course_id: str):
     """Get all study groups for a specific course"""
     try:
-        with engine.connect() as conn:
-            groups = conn.execute(
-                text(
-                    """
-                    SELECT g.id, g.name, g.description, g.meeting_time, 
-                           g.location, g.max_members, g.created_at,
-                           u.name as owner_name,
-                           COUNT(gm.user_id) as member_count
-                    FROM `groups` g
-                    JOIN users u ON g.owner_user_id = u.id
-                    LEFT JOIN group_members gm ON g.id = gm.group_id AND gm.status = 'active'
-                    WHERE g.course_id = :cid AND g.is_archived = 0
-                    GROUP BY g.id, g.name, g.description, g.meeting_time, 
-                             g.location, g.max_members, g.created_at, u.name
-                    ORDER BY g.created_at DESC
-                    """
-                ),
-                {"cid": course_id}
-            ).mappings().all()
+        if PROJECTIONS_ENABLED and projections.is_ready("course_group_list"):
+            query = """
+                SELECT group_id AS id, name, description, meeting_time,
+                       location, max_members, created_at, owner_name, member_count
+                FROM course_group_list
+                WHERE course_id = :cid
+                ORDER BY created_at DESC
+            """
+        else:
+            query = """
+                SELECT g.id, g.name, g.description, g.meeting_time,
+                       g.location, g.max_members, g.created_at,
+                       u.name as owner_name,
+                       g.active_member_count as member_count
+                FROM `groups` g
+                JOIN users u ON g.owner_user_id = u.id
+                WHERE g.course_id = :cid AND g.is_archived = 0
+                ORDER BY g.created_at DESC
+            """
+
+        with read_engine.connect() as conn:
+            groups = conn.execute(text(query), {"cid": course_id}).mappings().all()
 
         return jsonify([dict(g) for g in groups]), 200
     except Exception as e:
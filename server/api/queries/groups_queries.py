@@ -1,11 +1,13 @@
 """
 Groups Query API - Read operations for groups (CQRS Query Side)
-Handles: List, Get details, Search groups
+Handles: List, Get details, Search groups, Common free time
 """
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
-from db import engine
+from db import read_engine
+from api.pagination import CursorError, keyset_page
+from domain.availability import DAY_NAMES, bits_to_intervals, bytes_to_bits, common_free_windows, merge_windows
 
 bp_groups_queries = Blueprint("groups_queries", __name__)
 
@@ -21,11 +23,10 @@ def list_groups():
                    g.meeting_time, g.location, g.max_members,
                    c.code AS course_code, c.name AS course_name,
                    u.name AS owner_name,
-                   COUNT(gm.user_id) as member_count
+                   g.active_member_count AS member_count
             FROM `groups` g
             JOIN courses c ON g.course_id = c.id
             JOIN users u ON g.owner_user_id = u.id
-            LEFT JOIN group_members gm ON g.id = gm.group_id AND gm.status = 'active'
             WHERE g.is_archived = 0
         """
         params = {}
@@ -34,10 +35,9 @@ def list_groups():
             query += " AND g.course_id = :course_id"
             params["course_id"] = course_id
         
-        query += " GROUP BY g.id, g.name, g.description, g.meeting_time, g.location, g.max_members, c.code, c.name, u.name"
         query += " ORDER BY g.created_at DESC"
         
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(text(query), params).mappings().all()
         
         return jsonify([dict(r) for r in rows])
@@ -49,7 +49,7 @@ def list_groups():
 def get_group_detail(group_id: int):
     """Returns detailed information for a specific group including members and recent messages"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             g = conn.execute(
                 text(
                     """
@@ -109,11 +109,88 @@ def get_group_detail(group_id: int):
         return jsonify({"error": str(e)}), 500
 
 
+@bp_groups_queries.get("/<int:group_id>/free-time")
+def get_group_free_time(group_id: int):
+    """
+    Returns weekly windows when all active members are free, plus the best
+    windows where at least `min_members` (default: half the group) are free
+    """
+    min_minutes = request.args.get("min_minutes", 30, type=int)
+    min_members = request.args.get("min_members", type=int)
+    limit = request.args.get("limit", 10, type=int)
+
+    try:
+        with read_engine.connect() as conn:
+            group = conn.execute(
+                text("SELECT id FROM `groups` WHERE id = :gid"),
+                {"gid": group_id}
+            ).first()
+
+            if not group:
+                return jsonify({"error": "Group not found"}), 404
+
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT gm.user_id, ag.week_bits
+                    FROM group_members gm
+                    LEFT JOIN availability_grid ag ON ag.user_id = gm.user_id
+                    WHERE gm.group_id = :gid AND gm.status = 'active'
+                    """
+                ),
+                {"gid": group_id}
+            ).mappings().all()
+
+        member_ids = [r["user_id"] for r in rows]
+        member_count = len(member_ids)
+        if min_members is None:
+            min_members = (member_count + 1) // 2
+        min_members = max(min_members, 1)
+
+        windows = common_free_windows(
+            {r["user_id"]: bits_to_intervals(bytes_to_bits(r["week_bits"])) for r in rows}
+        )
+
+        def to_json(window):
+            day, start, end, fewest, always = window
+            return {
+                "day": DAY_NAMES[day],
+                "start": f"{start // 60:02d}:{start % 60:02d}",
+                "end": f"{end // 60:02d}:{end % 60:02d}",
+                "minutes": end - start,
+                "available_count": fewest,
+                "missing_user_ids": [uid for uid in member_ids if uid not in always],
+            }
+
+        def long_enough(merged):
+            return [w for w in merged if w[2] - w[1] >= min_minutes]
+
+        # Merge before the duration filter so k-of-n stretches are judged whole
+        everyone = sorted(
+            long_enough(merge_windows(windows, member_count)) if member_count else [],
+            key=lambda w: (w[1] - w[2], w[0], w[1]),
+        )
+        partial = sorted(
+            (w for w in long_enough(merge_windows(windows, min_members)) if w[3] < member_count),
+            key=lambda w: (-w[3], w[1] - w[2], w[0], w[1]),
+        )
+
+        return jsonify(
+            {
+                "member_count": member_count,
+                "windows": [to_json(w) for w in everyone[:limit]],
+                "partial_windows": [to_json(w) for w in partial[:limit]],
+            }
+        ), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @bp_groups_queries.get("/<int:group_id>/members")
 def get_group_members(group_id: int):
     """Get all members of a specific group"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             # Check if group exists
             group = conn.execute(
                 text("SELECT id FROM `groups` WHERE id = :gid"),
@@ -146,12 +223,13 @@ def get_group_members(group_id: int):
 
 @bp_groups_queries.get("/<int:group_id>/messages")
 def get_group_messages(group_id: int):
-    """Get all messages for a specific group"""
+    """Get a newest-first page of messages for a group (keyset cursors in X-Cursor-* headers)"""
     limit = request.args.get("limit", 50, type=int)
-    offset = request.args.get("offset", 0, type=int)
-    
+    before = request.args.get("before")
+    after = request.args.get("after")
+
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             # Check if group exists
             group = conn.execute(
                 text("SELECT id FROM `groups` WHERE id = :gid"),
@@ -161,21 +239,25 @@ def get_group_messages(group_id: int):
             if not group:
                 return jsonify({"error": "Group not found"}), 404
 
-            messages = conn.execute(
-                text(
-                    """
-                    SELECT m.id, m.content, m.created_at,
-                           u.id AS user_id, u.name AS author_name, u.avatar AS author_avatar
-                    FROM messages m
-                    JOIN users u ON m.user_id = u.id
-                    WHERE m.group_id = :gid
-                    ORDER BY m.created_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                ),
-                {"gid": group_id, "limit": limit, "offset": offset}
-            ).mappings().all()
+            messages, headers = keyset_page(
+                conn,
+                """
+                SELECT m.id, m.content, m.created_at,
+                       u.id AS user_id, u.name AS author_name, u.avatar AS author_avatar
+                FROM messages m
+                JOIN users u ON m.user_id = u.id
+                WHERE m.group_id = :gid
+                """,
+                {"gid": group_id},
+                limit,
+                before=before,
+                after=after,
+                created_col="m.created_at",
+                id_col="m.id",
+            )
 
-        return jsonify([dict(m) for m in messages]), 200
+        return jsonify(messages), 200, headers
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,23 +1,28 @@
 """
 Messages Query API - Read operations for messages (CQRS Query Side)
-Handles: Get group messages, Get message detail
+Handles: Get group messages, Get message detail, Live group message stream
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from sqlalchemy import text
 
-from db import engine
+from config import SSE_BACKFILL_BATCH, SSE_HEARTBEAT_SECONDS
+from db import read_engine
+from api.pagination import CursorError, keyset_page
+from domain.handlers import MESSAGE_STREAM_COLUMNS
+from domain.pubsub import SubscriptionClosed, group_topic, hub, sse_frame
 
 bp_messages_queries = Blueprint("messages_queries", __name__)
 
 
 @bp_messages_queries.get("/group/<int:group_id>")
 def get_group_messages(group_id: int):
-    """Get all messages for a specific group"""
+    """Get a newest-first page of messages for a group (keyset cursors in X-Cursor-* headers)"""
     limit = request.args.get("limit", 50, type=int)
-    offset = request.args.get("offset", 0, type=int)
-    
+    before = request.args.get("before")
+    after = request.args.get("after")
+
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             # Check if group exists
             group = conn.execute(
                 text("SELECT id FROM `groups` WHERE id = :gid"),
@@ -27,31 +32,104 @@ def get_group_messages(group_id: int):
             if not group:
                 return jsonify({"error": "Group not found"}), 404
 
-            messages = conn.execute(
-                text(
-                    """
-                    SELECT m.id, m.content, m.posted_at,
-                           u.id as user_id, u.name as user_name, u.avatar as user_avatar
-                    FROM messages m
-                    JOIN users u ON m.user_id = u.id
-                    WHERE m.group_id = :gid
-                    ORDER BY m.posted_at DESC
-                    LIMIT :limit OFFSET :offset
-                    """
-                ),
-                {"gid": group_id, "limit": limit, "offset": offset}
-            ).mappings().all()
+            messages, headers = keyset_page(
+                conn,
+                """
+                SELECT m.id, m.content, m.created_at AS posted_at,
+                       u.id as user_id, u.name as user_name, u.avatar as user_avatar
+                FROM messages m
+                JOIN users u ON m.user_id = u.id
+                WHERE m.group_id = :gid
+                """,
+                {"gid": group_id},
+                limit,
+                before=before,
+                after=after,
+                created_col="m.created_at",
+                id_col="m.id",
+                created_key="posted_at",
+            )
 
-        return jsonify([dict(m) for m in messages]), 200
+        return jsonify(messages), 200, headers
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@bp_messages_queries.get("/group/<int:group_id>/stream")
+def stream_group_messages(group_id: int):
+    """
+    Server-Sent Events stream of new messages in a group.
+    Reconnects send `Last-Event-ID` (or `?last_event_id=`) and receive the
+    messages posted since that id from the database before live delivery.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a message id"}), 400
+
+    with read_engine.connect() as conn:
+        group = conn.execute(
+            text("SELECT id FROM `groups` WHERE id = :gid"),
+            {"gid": group_id}
+        ).first()
+    if not group:
+        return jsonify({"error": "Group not found"}), 404
+
+    # Subscribe before the backfill so nothing posted in between is missed
+    subscription = hub.subscribe(group_topic(group_id))
+
+    def stream():
+        with subscription:
+            yield f"retry: {int(SSE_HEARTBEAT_SECONDS * 1000)}\n\n"
+
+            backfilled = set()
+            after = last_event_id
+            while after is not None:
+                # Primary: a lagging replica could miss messages published before we subscribed
+                with read_engine.primary.connect() as conn:
+                    rows = conn.execute(
+                        text(
+                            MESSAGE_STREAM_COLUMNS
+                            + " WHERE m.group_id = :gid AND m.id > :after ORDER BY m.id LIMIT :limit"
+                        ),
+                        {"gid": group_id, "after": after, "limit": SSE_BACKFILL_BATCH},
+                    ).mappings().all()
+                for row in rows:
+                    backfilled.add(row["id"])
+                    yield sse_frame(dict(row), event_id=row["id"], event="message")
+                after = rows[-1]["id"] if len(rows) == SSE_BACKFILL_BATCH else None
+
+            while True:
+                try:
+                    item = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                except SubscriptionClosed:
+                    # Evicted as a slow consumer; the client resumes via Last-Event-ID
+                    return
+                if item is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                message_id, frame = item
+                if message_id not in backfilled:
+                    yield frame
+
+    response = Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # Also release the subscription if the client leaves before the stream starts
+    response.call_on_close(subscription.close)
+    return response
+
+
 @bp_messages_queries.get("/<int:message_id>")
 def get_message(message_id: int):
     """Get a specific message detail"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             message = conn.execute(
                 text(
                     """
@@ -1,33 +1,51 @@
 """
 Notifications Query API - Read operations for notifications (CQRS Query Side)
-Handles: Get notifications, Get unread count
+Handles: Get notifications, Get unread count, Live notification stream
 """
-from flask import Blueprint, jsonify, request
+from typing import Optional
+
+from flask import Blueprint, Response, jsonify, request
 from sqlalchemy import text
 
-from db import engine
+from config import (
+    NOTIFICATION_PAGE_MAX,
+    NOTIFICATION_PAGE_SIZE,
+    NOTIFICATION_STREAM_BATCH,
+    NOTIFICATION_STREAM_QUEUE_SIZE,
+    SSE_HEARTBEAT_SECONDS,
+)
+from db import read_engine
+from api.pagination import CursorError, keyset_page
+from domain.notification_counts import unread_counts
+from domain.pubsub import SubscriptionClosed, hub, sse_frame, user_topic
 
 bp_notifications_queries = Blueprint("notifications_queries", __name__)
 
 
 @bp_notifications_queries.get("/<int:user_id>")
 def get_user_notifications(user_id: int):
-    """Get all notifications for a user"""
+    """Get a newest-first page of a user's notifications (keyset cursors in X-Cursor-* headers)"""
     unread_only = request.args.get("unread_only", "false").lower() == "true"
-    
+    notif_type = request.args.get("type") or None
+    limit = min(max(request.args.get("limit", NOTIFICATION_PAGE_SIZE, type=int), 1), NOTIFICATION_PAGE_MAX)
+    before = request.args.get("before")
+    after = request.args.get("after")
+
     try:
         query = """
-            SELECT id, type, data, is_read, created_at
+            SELECT id, type, data, is_read, ref_type, ref_id, created_at
             FROM notifications
             WHERE user_id = :uid
         """
-        
+        params = {"uid": user_id}
+
         if unread_only:
             query += " AND is_read = 0"
-        
-        query += " ORDER BY created_at DESC"
-        
-        with engine.connect() as conn:
+        if notif_type:
+            query += " AND type = :type"
+            params["type"] = notif_type
+
+        with read_engine.connect() as conn:
             # Check if user exists
             user = conn.execute(
                 text("SELECT id FROM users WHERE id = :uid"),
@@ -37,41 +55,145 @@ def get_user_notifications(user_id: int):
             if not user:
                 return jsonify({"error": "User not found"}), 404
 
-            notifications = conn.execute(
-                text(query),
-                {"uid": user_id}
-            ).mappings().all()
+            notifications, headers = keyset_page(
+                conn, query, params, limit, before=before, after=after
+            )
 
-        return jsonify([dict(n) for n in notifications]), 200
+        return jsonify(notifications), 200, headers
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _unread_count(user_id: int, notif_type: Optional[str]) -> Optional[int]:
+    """Unread count via the process-local cache; None if the user does not exist"""
+    unread_count = unread_counts.get(user_id, notif_type)
+    if unread_count is not None:
+        return unread_count
+
+    token = unread_counts.token()
+    query = "SELECT COUNT(*) FROM notifications WHERE user_id = :uid AND is_read = 0"
+    params = {"uid": user_id}
+    if notif_type:
+        query += " AND type = :type"
+        params["type"] = notif_type
+
+    # Primary: a lagging replica's count would be cached for every caller until the TTL
+    with read_engine.primary.connect() as conn:
+        # Check if user exists
+        user = conn.execute(
+            text("SELECT id FROM users WHERE id = :uid"),
+            {"uid": user_id}
+        ).first()
+
+        if not user:
+            return None
+
+        unread_count = conn.execute(text(query), params).scalar()
+    unread_counts.put(user_id, notif_type, unread_count, token)
+    return unread_count
+
+
 @bp_notifications_queries.get("/<int:user_id>/count")
 def get_unread_count(user_id: int):
-    """Get count of unread notifications for a user"""
+    """
+    Get count of unread notifications for a user (optionally of one `type`).
+    Served from the process-local count cache; responds with an ETag and
+    answers If-None-Match with 304 when the count has not changed.
+    """
+    notif_type = request.args.get("type") or None
+
     try:
-        with engine.connect() as conn:
-            # Check if user exists
-            user = conn.execute(
-                text("SELECT id FROM users WHERE id = :uid"),
-                {"uid": user_id}
-            ).first()
-            
-            if not user:
-                return jsonify({"error": "User not found"}), 404
+        unread_count = _unread_count(user_id, notif_type)
+        if unread_count is None:
+            return jsonify({"error": "User not found"}), 404
+
+        response = jsonify({"unread_count": unread_count})
+        response.set_etag(f"unread-{unread_count}")
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-            result = conn.execute(
-                text(
-                    """
-                    SELECT COUNT(*) as unread_count
-                    FROM notifications
-                    WHERE user_id = :uid AND is_read = 0
-                    """
-                ),
-                {"uid": user_id}
-            ).mappings().first()
 
-        return jsonify({"unread_count": result["unread_count"]}), 200
+@bp_notifications_queries.get("/<int:user_id>/stream")
+def stream_notifications(user_id: int):
+    """
+    Server-Sent Events stream of a user's new notifications (optionally of
+    one `type`), each followed by an `unread` event with the current count.
+    Resumes after `Last-Event-ID` (or `?last_event_id=`); otherwise starts
+    with the notifications created after connecting.
+    """
+    notif_type = request.args.get("type") or None
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Last-Event-ID must be a notification id"}), 400
+
+    # Subscribe before reading the starting cursor so nothing slips in between
+    subscription = hub.subscribe(user_topic(user_id), maxsize=NOTIFICATION_STREAM_QUEUE_SIZE, drop_when_full=True)
+    try:
+        if _unread_count(user_id, notif_type) is None:
+            subscription.close()
+            return jsonify({"error": "User not found"}), 404
+        if last_event_id is None:
+            with read_engine.connect() as conn:
+                last_event_id = conn.execute(
+                    text("SELECT COALESCE(MAX(id), 0) FROM notifications WHERE user_id = :uid"),
+                    {"uid": user_id}
+                ).scalar()
     except Exception as e:
+        subscription.close()
         return jsonify({"error": str(e)}), 500
+
+    query = """
+        SELECT id, type, data, is_read, ref_type, ref_id, created_at
+        FROM notifications
+        WHERE user_id = :uid AND id > :after
+    """
+    if notif_type:
+        query += " AND type = :type"
+    query += " ORDER BY id LIMIT :limit"
+
+    def stream():
+        cursor = last_event_id
+        with subscription:
+            yield f"retry: {int(SSE_HEARTBEAT_SECONDS * 1000)}\n\n"
+            # First pass replays anything missed since Last-Event-ID and sends the count
+            woken = True
+            while True:
+                if woken:
+                    while True:
+                        # Primary: a wake-up may arrive before a replica has the row
+                        with read_engine.primary.connect() as conn:
+                            rows = conn.execute(
+                                text(query),
+                                {"uid": user_id, "after": cursor, "type": notif_type,
+                                 "limit": NOTIFICATION_STREAM_BATCH},
+                            ).mappings().all()
+                        for row in rows:
+                            cursor = row["id"]
+                            yield sse_frame(dict(row), event_id=row["id"], event="notification")
+                        if len(rows) < NOTIFICATION_STREAM_BATCH:
+                            break
+                    count = _unread_count(user_id, notif_type)
+                    if count is None:
+                        return
+                    yield sse_frame({"unread_count": count}, event="unread")
+
+                try:
+                    woken = subscription.get(timeout=SSE_HEARTBEAT_SECONDS) is not None
+                except SubscriptionClosed:
+                    return
+                if not woken:
+                    yield ": keep-alive\n\n"
+
+    response = Response(
+        stream(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(subscription.close)
+    return response
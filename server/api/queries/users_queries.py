@@ -3,18 +3,27 @@ Users Query API - Read operations for users (CQRS Query Side)
 Handles: Get user details, overview, matches, search
 """
 from flask import Blueprint, jsonify, request
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 
-from db import engine
+from config import MATCHES_FROM_PRECOMPUTED, MATCH_SCORE_WEIGHTS, PROJECTIONS_ENABLED
+from db import read_engine
+from domain.match_index import match_index
+from domain.match_scoring import WEIGHT_KEYS, parse_weights, rank_candidates, score_candidates, weight_value
+from domain.projections import projections
 
 bp_users_queries = Blueprint("users_queries", __name__)
 
+MATCH_LIMIT = 50
+# Upper bound on candidates considered when ranking by weighted score
+MATCH_CANDIDATE_LIMIT = 5000
+SCORE_WEIGHTS = parse_weights(MATCH_SCORE_WEIGHTS)
+
 
 @bp_users_queries.get("/<int:user_id>/overview")
 def get_user_overview(user_id: int):
     """Returns a user's basic profile, their availability, and enrolled courses"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             user = conn.execute(
                 text(
                     """
@@ -69,9 +78,23 @@ def get_user_overview(user_id: int):
 
 @bp_users_queries.get("/<int:user_id>/matches")
 def get_user_matches(user_id: int):
-    """Finds other users who share enrolled courses with the given user"""
+    """
+    Finds other users who share enrolled courses with the given user.
+    With ?rank=score candidates are ranked by a weighted score over shared
+    courses, availability overlap and study preferences; w_<component> query
+    params override the configured weights.
+    """
+    rank = request.args.get("rank", "shared")
+    weights = dict(SCORE_WEIGHTS)
+    try:
+        for key in WEIGHT_KEYS:
+            if f"w_{key}" in request.args:
+                weights[key] = weight_value(request.args[f"w_{key}"])
+    except ValueError:
+        return jsonify({"error": "weights must be finite, non-negative numbers"}), 400
+
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             user_exists = conn.execute(
                 text("SELECT id FROM users WHERE id = :uid"),
                 {"uid": user_id},
@@ -79,27 +102,33 @@ def get_user_matches(user_id: int):
             if not user_exists:
                 return jsonify({"error": "User not found"}), 404
 
-            q = text(
-                """
-                WITH user_courses AS (
-                    SELECT course_id
-                    FROM enrollments
-                    WHERE user_id = :uid
-                )
-                SELECT u.id, u.name, u.email, u.avatar, u.major, u.year,
-                       COUNT(*) AS shared_courses,
-                       GROUP_CONCAT(c.code, ', ') AS shared_course_codes
-                FROM enrollments e
-                JOIN user_courses uc ON e.course_id = uc.course_id
-                JOIN users u ON e.user_id = u.id
-                JOIN courses c ON e.course_id = c.id
-                WHERE e.user_id <> :uid
-                GROUP BY u.id, u.name, u.email, u.avatar, u.major, u.year
-                ORDER BY shared_courses DESC, u.name
-                LIMIT 50
-                """
-            )
-            rows = conn.execute(q, {"uid": user_id}).mappings().all()
+            if rank == "score":
+                return jsonify({"matches": _score_matches(conn, user_id, weights)})
+
+            if MATCHES_FROM_PRECOMPUTED:
+                precomputed = conn.execute(
+                    text(
+                        """
+                        SELECT u.id, u.name, u.email, u.avatar, u.major, u.year,
+                               um.shared_courses, um.shared_course_codes
+                        FROM user_matches um
+                        JOIN users u ON um.match_user_id = u.id
+                        WHERE um.user_id = :uid
+                        ORDER BY um.match_rank
+                        LIMIT :limit
+                        """
+                    ),
+                    {"uid": user_id, "limit": MATCH_LIMIT},
+                ).mappings().all()
+                # Users without precomputed rows (e.g. enrolled since the last run) are ranked live
+                if precomputed:
+                    return jsonify({"matches": [dict(r) for r in precomputed]})
+
+            ranked = match_index.top_matches(user_id, MATCH_LIMIT)
+            if ranked is not None:
+                return jsonify({"matches": _hydrate_matches(conn, ranked)})
+
+            rows = _sql_matches(conn, user_id, MATCH_LIMIT)
 
         matches = [dict(r) for r in rows]
         return jsonify({"matches": matches})
@@ -107,11 +136,121 @@ def get_user_matches(user_id: int):
         return jsonify({"error": str(e)}), 500
 
 
+def _sql_matches(conn, user_id, limit):
+    """Rank users by shared courses directly in SQL"""
+    q = text(
+        """
+        WITH user_courses AS (
+            SELECT course_id
+            FROM enrollments
+            WHERE user_id = :uid
+        )
+        SELECT u.id, u.name, u.email, u.avatar, u.major, u.year,
+               COUNT(*) AS shared_courses,
+               GROUP_CONCAT(c.code, ', ') AS shared_course_codes
+        FROM enrollments e
+        JOIN user_courses uc ON e.course_id = uc.course_id
+        JOIN users u ON e.user_id = u.id
+        JOIN courses c ON e.course_id = c.id
+        WHERE e.user_id <> :uid
+        GROUP BY u.id, u.name, u.email, u.avatar, u.major, u.year
+        ORDER BY shared_courses DESC, u.name
+        LIMIT :limit
+        """
+    )
+    return conn.execute(q, {"uid": user_id, "limit": limit}).mappings().all()
+
+
+def _score_matches(conn, user_id, weights):
+    """Rank every classmate candidate by weighted score in one vectorized pass"""
+    candidates = match_index.top_matches(user_id, MATCH_CANDIDATE_LIMIT)
+    if candidates is None:
+        candidates = [
+            (r["id"], int(r["shared_courses"]), (r["shared_course_codes"] or "").split(", "))
+            for r in _sql_matches(conn, user_id, MATCH_CANDIDATE_LIMIT)
+        ]
+    if not candidates:
+        return []
+
+    rows = conn.execute(
+        text(
+            """
+            SELECT u.id, u.name, u.email, u.avatar, u.major, u.year,
+                   u.study_prefs, g.week_bits
+            FROM users u
+            LEFT JOIN availability_grid g ON g.user_id = u.id
+            WHERE u.id IN :ids
+            """
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": [user_id] + [c[0] for c in candidates]},
+    ).mappings().all()
+    users = {r["id"]: r for r in rows}
+    me = users[user_id]
+    candidates = [c for c in candidates if c[0] in users]
+    shared = [c[1] for c in candidates]
+
+    scores, overlap = score_candidates(
+        me["study_prefs"],
+        me["week_bits"],
+        shared,
+        [users[c[0]]["study_prefs"] for c in candidates],
+        [users[c[0]]["week_bits"] for c in candidates],
+        weights,
+    )
+
+    matches = []
+    for i in rank_candidates(scores, shared, MATCH_LIMIT):
+        other_id, shared_courses, codes = candidates[i]
+        user = users[other_id]
+        matches.append(
+            {
+                "id": other_id,
+                "name": user["name"],
+                "email": user["email"],
+                "avatar": user["avatar"],
+                "major": user["major"],
+                "year": user["year"],
+                "shared_courses": shared_courses,
+                "shared_course_codes": ", ".join(codes),
+                "availability_overlap_minutes": int(overlap[i]),
+                "score": round(float(scores[i]), 4),
+            }
+        )
+    return matches
+
+
+def _hydrate_matches(conn, ranked):
+    """Attach profile fields to (user_id, shared_courses, codes) tuples from the match index"""
+    if not ranked:
+        return []
+
+    rows = conn.execute(
+        text(
+            "SELECT id, name, email, avatar, major, year FROM users WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": [r[0] for r in ranked]},
+    ).mappings().all()
+    users = {r["id"]: r for r in rows}
+
+    matches = []
+    for other_id, shared, codes in ranked:
+        user = users.get(other_id)
+        if not user:
+            continue
+        match = dict(user)
+        match["shared_courses"] = shared
+        match["shared_course_codes"] = ", ".join(codes)
+        matches.append(match)
+
+    matches.sort(key=lambda m: (-m["shared_courses"], m["name"]))
+    return matches[:MATCH_LIMIT]
+
+
 @bp_users_queries.get("/<int:user_id>/groups")
 def get_user_groups(user_id: int):
     """Get all groups that a user is a member of"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             user_exists = conn.execute(
                 text("SELECT id FROM users WHERE id = :uid"),
                 {"uid": user_id}
@@ -120,6 +259,22 @@ def get_user_groups(user_id: int):
             if not user_exists:
                 return jsonify({"error": "User not found"}), 404
 
+            if PROJECTIONS_ENABLED and projections.is_ready("user_group_list"):
+                groups = conn.execute(
+                    text(
+                        """
+                        SELECT group_id AS id, name, description, meeting_time, location,
+                               max_members, tags, course_code, course_name, owner_name,
+                               role, joined_at, member_count
+                        FROM user_group_list
+                        WHERE user_id = :uid
+                        ORDER BY joined_at DESC
+                        """
+                    ),
+                    {"uid": user_id}
+                ).mappings().all()
+                return jsonify([dict(g) for g in groups]), 200
+
             groups = conn.execute(
                 text(
                     """
@@ -128,15 +283,12 @@ def get_user_groups(user_id: int):
                            c.code AS course_code, c.name AS course_name,
                            u.name AS owner_name,
                            gm.role, gm.joined_at,
-                           COUNT(DISTINCT gm2.user_id) as member_count
+                           g.active_member_count as member_count
                     FROM group_members gm
                     JOIN `groups` g ON gm.group_id = g.id
                     JOIN courses c ON g.course_id = c.id
                     JOIN users u ON g.owner_user_id = u.id
-                    LEFT JOIN group_members gm2 ON g.id = gm2.group_id AND gm2.status = 'active'
                     WHERE gm.user_id = :uid AND gm.status = 'active' AND g.is_archived = 0
-                    GROUP BY g.id, g.name, g.description, g.meeting_time, g.location,
-                             g.max_members, g.tags, c.code, c.name, u.name, gm.role, gm.joined_at
                     ORDER BY gm.joined_at DESC
                     """
                 ),
@@ -148,6 +300,48 @@ def get_user_groups(user_id: int):
         return jsonify({"error": str(e)}), 500
 
 
+@bp_users_queries.get("/<int:user_id>/unread")
+def get_user_unread(user_id: int):
+    """Unread message counts per active group, from group_read_state cursors"""
+    try:
+        with read_engine.connect() as conn:
+            # Without a cursor yet, messages since joining count as unread
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT g.id AS group_id, g.name AS group_name,
+                           rs.last_read_message_id,
+                           CASE
+                               WHEN rs.last_read_message_id IS NULL THEN (
+                                   SELECT COUNT(*) FROM messages m
+                                   WHERE m.group_id = gm.group_id AND m.created_at >= gm.joined_at
+                               )
+                               ELSE (
+                                   SELECT COUNT(*) FROM messages m
+                                   WHERE m.group_id = gm.group_id AND m.id > rs.last_read_message_id
+                               )
+                           END AS unread_count
+                    FROM group_members gm
+                    JOIN `groups` g ON gm.group_id = g.id
+                    LEFT JOIN group_read_state rs
+                        ON rs.user_id = gm.user_id AND rs.group_id = gm.group_id
+                    WHERE gm.user_id = :uid AND gm.status = 'active' AND g.is_archived = 0
+                    ORDER BY g.id
+                    """
+                ),
+                {"uid": user_id}
+            ).mappings().all()
+
+        groups = [dict(r) for r in rows]
+        return jsonify({
+            "user_id": user_id,
+            "total_unread": sum(g["unread_count"] for g in groups),
+            "groups": groups,
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @bp_users_queries.get("/search")
 def search_users():
     """Search users by name, email, major, or year"""
@@ -179,7 +373,7 @@ def search_users():
         query += " ORDER BY name LIMIT :limit"
         params["limit"] = limit
         
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(text(query), params).mappings().all()
 
         return jsonify([dict(r) for r in rows]), 200
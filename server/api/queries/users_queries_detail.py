@@ -5,7 +5,7 @@ Handles: Get user, List users
 from flask import Blueprint, jsonify, request
 from sqlalchemy import text
 
-from db import engine
+from db import read_engine
 
 bp_users_queries = Blueprint("users_queries_detail", __name__)
 
@@ -14,7 +14,7 @@ bp_users_queries = Blueprint("users_queries_detail", __name__)
 def get_user(user_id: int):
     """Get user profile by ID"""
     try:
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             user = conn.execute(
                 text(
                     """
@@ -53,7 +53,7 @@ def list_users():
         
         query += " ORDER BY name"
         
-        with engine.connect() as conn:
+        with read_engine.connect() as conn:
             rows = conn.execute(text(query), params).mappings().all()
 
         return jsonify([dict(r) for r in rows]), 200
@@ -1,3 +1,5 @@
+import atexit
+
 from flask import Flask, jsonify
 from flask_cors import CORS
 
@@ -18,13 +20,35 @@ from api.queries.availability_queries import bp_availability_queries
 from api.queries.notifications_queries import bp_notifications_queries
 from api.queries.messages_queries import bp_messages_queries
 
+from api.metrics import bp_metrics
+from api.pagination import CURSOR_HEADERS
+
+from jobs.cli import register_cli
+
+from config import (
+    EVENT_BUS_DRAIN_SECONDS,
+    MATCH_INDEX_ENABLED,
+    OUTBOX_ENABLED,
+    OUTBOX_RELAY_IN_PROCESS,
+    PROJECTIONS_ENABLED,
+    QUERY_STATS_ENABLED,
+    READ_YOUR_WRITES_SECONDS,
+)
+from db import engine, read_engine
+from db_profiling import query_stats
+from db_routing import PRIMARY_FOR_HEADER, register_read_routing
+
 from domain.event_bus import event_bus
 from domain.handlers import register_handlers
+from domain.match_index import match_index
+from domain.outbox import outbox_relay
+from domain.projections import projections
+from domain.read_models import register_projections
 
 
 def create_app():
     app = Flask(__name__)
-    CORS(app)
+    CORS(app, expose_headers=CURSOR_HEADERS + [PRIMARY_FOR_HEADER])
 
     # Register CQRS Command blueprints (Write operations)
     app.register_blueprint(bp_groups_commands, url_prefix="/api/commands/groups")
@@ -43,7 +67,31 @@ def create_app():
     app.register_blueprint(bp_notifications_queries, url_prefix="/api/queries/notifications")
     app.register_blueprint(bp_messages_queries, url_prefix="/api/queries/messages")
 
+    app.register_blueprint(bp_metrics, url_prefix="/api/metrics")
+
+    # Query blueprints read from replicas; keep a client on the primary right after its commands
+    register_read_routing(app, read_engine, READ_YOUR_WRITES_SECONDS)
+
+    if QUERY_STATS_ENABLED:
+        for db_engine in [engine, *read_engine.replicas]:
+            query_stats.instrument(db_engine)
+        query_stats.install(app)
+
     register_handlers(event_bus)
+    register_projections(projections)
+    if PROJECTIONS_ENABLED:
+        projections.subscribe(event_bus)
+    register_cli(app)
+
+    # Async mode: finish queued handler work before the process exits
+    atexit.register(event_bus.shutdown, EVENT_BUS_DRAIN_SECONDS)
+
+    if OUTBOX_ENABLED and OUTBOX_RELAY_IN_PROCESS:
+        outbox_relay.start()
+        atexit.register(outbox_relay.stop)
+
+    if MATCH_INDEX_ENABLED:
+        match_index.warm()
 
     @app.get("/health")
     def health_root():
@@ -0,0 +1,147 @@
+"""
+Join Contention Benchmark - many simultaneous joins against one group
+Fires `--joins` concurrent POST /api/commands/groups/<id>/join requests at a
+group with `--capacity` seats and reports throughput, latency percentiles and
+how far the group overfilled. Runs against the database configured in
+server/.env and removes its fixtures afterwards.
+
+    cd server && python -m benchmarks.join_contention --joins 500 --capacity 25
+"""
+import argparse
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import bindparam, text
+
+from app import create_app
+from db import engine
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def seed(joins: int, capacity: int):
+    """Create an owner, `joins` joiners, a course and the target group"""
+    tag = uuid.uuid4().hex[:8]
+    course_id = f"BENCH-{tag}"
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO courses (id, code, name, section, instructor, schedule, students)
+                VALUES (:cid, :cid, 'Join benchmark', '1', 'Bench', 'TBA', 0)
+                """
+            ),
+            {"cid": course_id},
+        )
+        conn.execute(
+            text("INSERT INTO users (email, password_hash, name) VALUES (:email, 'x', :name)"),
+            [{"email": f"bench-{tag}-{i}@example.com", "name": f"Bench {i}"} for i in range(joins + 1)],
+        )
+        user_ids = conn.execute(
+            text("SELECT id FROM users WHERE email LIKE :pattern ORDER BY id"),
+            {"pattern": f"bench-{tag}-%"},
+        ).scalars().all()
+
+    owner_id, joiner_ids = user_ids[0], user_ids[1:]
+    with engine.begin() as conn:
+        group_id = conn.execute(
+            text(
+                """
+                INSERT INTO `groups` (owner_user_id, course_id, name, max_members, active_member_count)
+                VALUES (:oid, :cid, 'Join benchmark', :cap, 1)
+                """
+            ),
+            {"oid": owner_id, "cid": course_id, "cap": capacity},
+        ).lastrowid
+        conn.execute(
+            text(
+                """
+                INSERT INTO group_members (group_id, user_id, role, status)
+                VALUES (:gid, :uid, 'admin', 'active')
+                """
+            ),
+            {"gid": group_id, "uid": owner_id},
+        )
+    return course_id, group_id, user_ids, joiner_ids
+
+
+def cleanup(course_id: str, user_ids):
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM users WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(user_ids)},
+        )
+        conn.execute(text("DELETE FROM courses WHERE id = :cid"), {"cid": course_id})
+
+
+def run(joins: int, capacity: int, concurrency: int) -> dict:
+    app = create_app()
+    course_id, group_id, user_ids, joiner_ids = seed(joins, capacity)
+    start_gate = threading.Barrier(min(concurrency, joins))
+    local = threading.local()
+
+    def join(user_id):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+            start_gate.wait()
+        started = time.perf_counter()
+        response = local.client.post(f"/api/commands/groups/{group_id}/join", json={"user_id": user_id})
+        return response.status_code, time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(join, joiner_ids))
+        elapsed = time.perf_counter() - started
+
+        with engine.connect() as conn:
+            active = conn.execute(
+                text("SELECT COUNT(*) FROM group_members WHERE group_id = :gid AND status = 'active'"),
+                {"gid": group_id},
+            ).scalar()
+            counter = conn.execute(
+                text("SELECT active_member_count FROM `groups` WHERE id = :gid"),
+                {"gid": group_id},
+            ).scalar()
+    finally:
+        cleanup(course_id, user_ids)
+
+    latencies_ms = [seconds * 1000 for _, seconds in results]
+    statuses = [status for status, _ in results]
+    return {
+        "joins": joins,
+        "capacity": capacity,
+        "concurrency": concurrency,
+        "joined": statuses.count(201),
+        "rejected_full": statuses.count(400),
+        "errors": sum(1 for s in statuses if s >= 500),
+        "active_members": active,
+        "active_member_count": counter,
+        "overfill": max(0, active - capacity),
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(joins / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": round(_percentile(latencies_ms, 50), 2),
+        "p99_ms": round(_percentile(latencies_ms, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--joins", type=int, default=300, help="Simultaneous join requests")
+    parser.add_argument("--capacity", type=int, default=25, help="Group max_members (owner included)")
+    parser.add_argument("--concurrency", type=int, default=100, help="Worker threads")
+    args = parser.parse_args()
+
+    for key, value in run(args.joins, args.capacity, args.concurrency).items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
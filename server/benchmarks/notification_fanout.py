@@ -0,0 +1,140 @@
+"""
+Notification Fan-out Benchmark - group message notifications per second
+Posts one message event into groups of 10, 100 and 1000 active members and
+times `handle_group_message_posted`, alongside the previous one-INSERT-per-
+member loop for comparison. Runs against the database configured in
+server/.env and removes its fixtures afterwards.
+
+    cd server && python -m benchmarks.notification_fanout --sizes 10,100,1000 --repeat 5
+"""
+import argparse
+import json
+import time
+import uuid
+
+from sqlalchemy import bindparam, text
+
+from db import engine
+from domain import handlers
+from domain.events import GroupMessagePosted
+
+
+def seed(members: int):
+    """A course, a poster and `members` other active members in one group"""
+    tag = uuid.uuid4().hex[:8]
+    course_id = f"FAN-{tag}"
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO courses (id, code, name, section, instructor, schedule, students)
+                VALUES (:cid, :cid, 'Fan-out benchmark', '1', 'Bench', 'TBA', 0)
+                """
+            ),
+            {"cid": course_id},
+        )
+        conn.execute(
+            text("INSERT INTO users (email, password_hash, name) VALUES (:email, 'x', :name)"),
+            [{"email": f"fan-{tag}-{i}@example.com", "name": f"Fan {i}"} for i in range(members + 1)],
+        )
+        user_ids = conn.execute(
+            text("SELECT id FROM users WHERE email LIKE :pattern ORDER BY id"),
+            {"pattern": f"fan-{tag}-%"},
+        ).scalars().all()
+        group_id = conn.execute(
+            text(
+                """
+                INSERT INTO `groups` (owner_user_id, course_id, name, active_member_count)
+                VALUES (:oid, :cid, 'Fan-out benchmark', :n)
+                """
+            ),
+            {"oid": user_ids[0], "cid": course_id, "n": len(user_ids)},
+        ).lastrowid
+        conn.execute(
+            text(
+                """
+                INSERT INTO group_members (group_id, user_id, role, status)
+                VALUES (:gid, :uid, 'member', 'active')
+                """
+            ),
+            [{"gid": group_id, "uid": uid} for uid in user_ids],
+        )
+    return course_id, group_id, user_ids
+
+
+def cleanup(course_id: str, user_ids):
+    with engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM users WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(user_ids)},
+        )
+        conn.execute(text("DELETE FROM courses WHERE id = :cid"), {"cid": course_id})
+
+
+def per_row_fanout(evt: GroupMessagePosted):
+    """The previous handler: one INSERT and one json.dumps per member"""
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT user_id FROM group_members "
+                "WHERE group_id = :gid AND status = 'active' AND user_id <> :uid"
+            ),
+            {"gid": evt.group_id, "uid": evt.user_id},
+        ).fetchall()
+        for row in rows:
+            data = {"group_id": evt.group_id, "message_id": evt.message_id, "message": "New message in your study group."}
+            conn.execute(
+                text("INSERT INTO notifications (user_id, type, data) VALUES (:uid, :type, :data)"),
+                {"uid": row.user_id, "type": "group_message_posted", "data": json.dumps(data)},
+            )
+
+
+def _time(fn, evt, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(evt)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(sizes, repeat: int):
+    results = []
+    for members in sizes:
+        course_id, group_id, user_ids = seed(members)
+        try:
+            evt = GroupMessagePosted(group_id=group_id, user_id=user_ids[0], message_id=0)
+            batched = _time(handlers.handle_group_message_posted, evt, repeat)
+            per_row = _time(per_row_fanout, evt, repeat)
+        finally:
+            cleanup(course_id, user_ids)
+        results.append(
+            {
+                "members": members,
+                "batched_ms": round(batched * 1000, 2),
+                "batched_rows_per_sec": round(members / batched, 1),
+                "per_row_ms": round(per_row * 1000, 2),
+                "per_row_rows_per_sec": round(members / per_row, 1),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated member counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per size; the best is reported")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"{'members':>8} {'batched ms':>11} {'rows/sec':>11} {'per-row ms':>11} {'rows/sec':>11}")
+    for r in run(sizes, args.repeat):
+        print(
+            f"{r['members']:>8} {r['batched_ms']:>11} {r['batched_rows_per_sec']:>11} "
+            f"{r['per_row_ms']:>11} {r['per_row_rows_per_sec']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
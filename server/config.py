@@ -12,3 +12,98 @@ DB_PASS = os.getenv("DB_PASS", "").strip()
 DB_HOST = os.getenv("DB_HOST", "localhost").strip()
 DB_PORT = os.getenv("DB_PORT", "3306").strip()
 DB_NAME = os.getenv("DB_NAME", "classmatch").strip()
+
+# Read replicas for the query blueprints, comma-separated "host" or "host:port" (empty: read from the primary)
+DB_READ_HOSTS = [h.strip() for h in os.getenv("DB_READ_HOSTS", "").split(",") if h.strip()]
+# After a successful command, keep that client's reads on the primary for this many seconds (0 disables)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5").strip())
+
+# Connection pool of each engine (primary and every read replica): pooled connections, extra ones under load,
+# seconds before a connection is replaced, and seconds a checkout waits for a free connection before failing
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5").strip())
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10").strip())
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600").strip())
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30").strip())
+# Liveness check on checkout: "always" (every checkout), "idle" (only connections unused for
+# DB_POOL_PING_IDLE_SECONDS or more) or "never"
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "idle").strip().lower()
+DB_POOL_PING_IDLE_SECONDS = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "30").strip())
+
+# Serve classmate matches from the in-process enrollment index (falls back to SQL while cold)
+MATCH_INDEX_ENABLED = os.getenv("MATCH_INDEX_ENABLED", "true").strip().lower() == "true"
+
+# Serve classmate matches from the nightly `user_matches` read table when it has rows for the user
+MATCHES_FROM_PRECOMPUTED = os.getenv("MATCHES_FROM_PRECOMPUTED", "false").strip().lower() == "true"
+
+# Weights for ?rank=score on the matches endpoint, e.g. "courses:0.5,availability:0.3,times:0.1,location:0.05,style:0.05"
+MATCH_SCORE_WEIGHTS = os.getenv("MATCH_SCORE_WEIGHTS", "").strip()
+
+# Live group chat (SSE): per-subscriber queue bound, keep-alive interval and resume page size
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100").strip())
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15").strip())
+SSE_BACKFILL_BATCH = int(os.getenv("SSE_BACKFILL_BATCH", "500").strip())
+
+# Rows per multi-row INSERT when fanning a group message out to member notifications
+NOTIFICATION_FANOUT_BATCH_SIZE = int(os.getenv("NOTIFICATION_FANOUT_BATCH_SIZE", "500").strip())
+
+# Also write one `notifications` row per member for every group message (unread counts come from group_read_state)
+MATERIALIZE_MESSAGE_NOTIFICATIONS = os.getenv("MATERIALIZE_MESSAGE_NOTIFICATIONS", "false").strip().lower() == "true"
+
+# Process-local unread notification count cache: seconds before a count is re-read, and max cached users
+NOTIFICATION_COUNT_CACHE_SECONDS = float(os.getenv("NOTIFICATION_COUNT_CACHE_SECONDS", "60").strip())
+NOTIFICATION_COUNT_CACHE_SIZE = int(os.getenv("NOTIFICATION_COUNT_CACHE_SIZE", "100000").strip())
+
+# Live notification streams: pending wake-ups kept per connection, and rows read per query
+NOTIFICATION_STREAM_QUEUE_SIZE = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "4").strip())
+NOTIFICATION_STREAM_BATCH = int(os.getenv("NOTIFICATION_STREAM_BATCH", "100").strip())
+
+# Notification listing page size (default and hard cap for ?limit=)
+NOTIFICATION_PAGE_SIZE = int(os.getenv("NOTIFICATION_PAGE_SIZE", "50").strip())
+NOTIFICATION_PAGE_MAX = int(os.getenv("NOTIFICATION_PAGE_MAX", "200").strip())
+
+# Notification retention rules "<type or *>:<read|unread|*>=<days>", most specific match wins; unmatched rows are kept
+NOTIFICATION_RETENTION = os.getenv("NOTIFICATION_RETENTION", "*:read=30,*:unread=180").strip()
+# `flask purge-notifications` rows per delete transaction and pause between chunks
+NOTIFICATION_PURGE_CHUNK_SIZE = int(os.getenv("NOTIFICATION_PURGE_CHUNK_SIZE", "1000").strip())
+NOTIFICATION_PURGE_SLEEP_MS = float(os.getenv("NOTIFICATION_PURGE_SLEEP_MS", "50").strip())
+
+# Domain event dispatch: "sync" runs handlers in the request, "async" hands them to a worker pool
+EVENT_BUS_MODE = os.getenv("EVENT_BUS_MODE", "sync").strip().lower()
+# Async mode: worker threads, queued events, and what to do when the queue is full ("block", "drop" or "spill")
+EVENT_BUS_WORKERS = int(os.getenv("EVENT_BUS_WORKERS", "4").strip())
+EVENT_BUS_QUEUE_SIZE = int(os.getenv("EVENT_BUS_QUEUE_SIZE", "1000").strip())
+EVENT_BUS_FULL_POLICY = os.getenv("EVENT_BUS_FULL_POLICY", "block").strip().lower()
+# Seconds a "block" publish waits for room before dropping, and seconds to drain the queue at shutdown
+EVENT_BUS_BLOCK_TIMEOUT = float(os.getenv("EVENT_BUS_BLOCK_TIMEOUT", "1").strip())
+EVENT_BUS_DRAIN_SECONDS = float(os.getenv("EVENT_BUS_DRAIN_SECONDS", "10").strip())
+
+# Transactional outbox: commands write their events to `event_outbox` in the same transaction and a relay publishes them
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "false").strip().lower() == "true"
+# Run the relay as a thread inside each app process (otherwise run `flask relay-outbox`)
+OUTBOX_RELAY_IN_PROCESS = os.getenv("OUTBOX_RELAY_IN_PROCESS", "true").strip().lower() == "true"
+# Relay rows per batch, idle poll interval, claim lease before another relay may retry, and attempts before giving up
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100").strip())
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "1").strip())
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60").strip())
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10").strip())
+# Hours relayed rows are kept before the relay deletes them
+OUTBOX_KEEP_HOURS = float(os.getenv("OUTBOX_KEEP_HOURS", "24").strip())
+
+# Maintain the projected read tables (user_group_list, course_group_list) from live events and serve list queries from them once built
+PROJECTIONS_ENABLED = os.getenv("PROJECTIONS_ENABLED", "false").strip().lower() == "true"
+# Seconds each process caches projection build statuses
+PROJECTION_STATUS_SECONDS = float(os.getenv("PROJECTION_STATUS_SECONDS", "5").strip())
+
+# Run database-writing event handlers (notifications, projections) inside the command's own transaction and commit
+HANDLERS_IN_TRANSACTION = os.getenv("HANDLERS_IN_TRANSACTION", "false").strip().lower() == "true"
+
+# Event bus per-handler latency histograms and per event type counters (/api/metrics/event-bus)
+EVENT_BUS_METRICS = os.getenv("EVENT_BUS_METRICS", "true").strip().lower() == "true"
+# Log handlers taking at least this many ms (0 disables; needs EVENT_BUS_METRICS)
+EVENT_BUS_SLOW_HANDLER_MS = float(os.getenv("EVENT_BUS_SLOW_HANDLER_MS", "250").strip())
+
+# Time every SQL statement per Flask endpoint (/api/metrics/queries); log statements slower than SLOW_QUERY_MS
+# (0 disables) and requests running more than N_PLUS_ONE_QUERY_COUNT statements (0 disables)
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").strip().lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200").strip())
+N_PLUS_ONE_QUERY_COUNT = int(os.getenv("N_PLUS_ONE_QUERY_COUNT", "30").strip())
@@ -1,17 +1,59 @@
 from sqlalchemy import create_engine
-from config import DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME
+from config import (
+    DB_USER,
+    DB_PASS,
+    DB_HOST,
+    DB_PORT,
+    DB_NAME,
+    DB_READ_HOSTS,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PING_IDLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+)
+from db_pool import engine_options, install_idle_ping
+from db_routing import ReadRouter
 from urllib.parse import quote_plus
 
 # URL-encode username/password to safely include special characters
 _DB_USER = quote_plus(DB_USER)
 _DB_PASS = quote_plus(DB_PASS)
 
-DATABASE_URL = (
-    f"mysql+pymysql://{_DB_USER}:{_DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
+def _database_url(host: str, port: str) -> str:
+    return f"mysql+pymysql://{_DB_USER}:{_DB_PASS}@{host}:{port}/{DB_NAME}"
+
+
+def _create_engine(url: str):
+    engine = create_engine(
+        url,
+        echo=False,
+        **engine_options(
+            size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            recycle=DB_POOL_RECYCLE,
+            timeout=DB_POOL_TIMEOUT,
+            pre_ping=DB_POOL_PRE_PING,
+        ),
+    )
+    if DB_POOL_PRE_PING == "idle":
+        install_idle_ping(engine, DB_POOL_PING_IDLE_SECONDS)
+    return engine
+
+
+DATABASE_URL = _database_url(DB_HOST, DB_PORT)
+
+# Primary: commands, domain handlers and jobs
+engine = _create_engine(DATABASE_URL)
+
+# Query blueprints: replicas from DB_READ_HOSTS ("host" or "host:port", same
+# credentials and database), or the primary when none are configured
+read_engine = ReadRouter(
+    engine,
+    [
+        _create_engine(_database_url(*(host.split(":", 1) if ":" in host else (host, DB_PORT))))
+        for host in DB_READ_HOSTS
+    ],
 )
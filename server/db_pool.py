@@ -0,0 +1,180 @@
+"""
+Connection Pool - configurable QueuePool with checkout metrics
+`engine_options` builds the pool arguments for `create_engine` from config;
+`InstrumentedQueuePool` records checkouts, waits for a free connection,
+overflow and checkout latency. With the "idle" ping strategy only connections
+that sat unused for a while are pinged on checkout, so busy connections skip
+the round trip that `pool_pre_ping` pays every time.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+PING_STRATEGIES = ("always", "idle", "never")
+
+# Checkout latencies kept for the percentiles
+LATENCY_SAMPLES = 1000
+
+_CHECKED_IN_AT = "checked_in_at"
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.max_overflow_seen = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self._total_ms = 0.0
+        self._max_ms = 0.0
+        self._recent = deque(maxlen=LATENCY_SAMPLES)
+
+    def checked_out(self, elapsed_ms: float, waited: bool, overflow: int):
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.max_overflow_seen = max(self.max_overflow_seen, overflow)
+            self._total_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+            self._recent.append(elapsed_ms)
+
+    def timed_out(self):
+        with self._lock:
+            self.waits += 1
+            self.timeouts += 1
+
+    def pinged(self, ok: bool):
+        with self._lock:
+            self.pings += 1
+            self.ping_failures += not ok
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "max_overflow": self.max_overflow_seen,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "checkout_ms": {
+                    "mean": round(self._total_ms / self.checkouts, 3) if self.checkouts else None,
+                    "max": round(self._max_ms, 3),
+                    "p50": _percentile(recent, 0.5),
+                    "p99": _percentile(recent, 0.99),
+                },
+            }
+
+
+def _percentile(values, q: float) -> Optional[float]:
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout. A checkout counts as a wait when
+    every pooled connection was in use and the overflow was exhausted, so it
+    had to queue for a connection to be returned (or time out).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        exhausted = self._max_overflow > -1 and self.checkedin() == 0 and self.overflow() >= self._max_overflow
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timed_out()
+            raise
+        self.metrics.checked_out((time.perf_counter() - started) * 1000, exhausted, max(0, self.overflow()))
+        return conn
+
+    def recreate(self):
+        # Invalidation swaps in a fresh pool; keep counting across it
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def engine_options(
+    size: int = 5,
+    max_overflow: int = 10,
+    recycle: int = 3600,
+    timeout: float = 30.0,
+    pre_ping: str = "always",
+) -> dict:
+    """Keyword arguments for `create_engine`; pair "idle" with `install_idle_ping`"""
+    if pre_ping not in PING_STRATEGIES:
+        raise ValueError(f"Unknown pool pre-ping strategy '{pre_ping}'")
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": size,
+        "max_overflow": max_overflow,
+        "pool_recycle": recycle,
+        "pool_timeout": timeout,
+        "pool_pre_ping": pre_ping == "always",
+    }
+
+
+def install_idle_ping(engine: Engine, idle_seconds: float):
+    """
+    Ping a connection on checkout only if it has been back in the pool for
+    `idle_seconds` or more. A dead one is discarded and the pool retries with
+    a new connection, as with `pool_pre_ping`.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _stamp_checkin(dbapi_connection, connection_record):
+        if dbapi_connection is not None:
+            connection_record.info[_CHECKED_IN_AT] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop(_CHECKED_IN_AT, None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(engine.pool, "metrics", None)
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if metrics is not None:
+            metrics.pinged(alive)
+        if not alive:
+            logger.info("Discarding pooled connection that failed its idle ping")
+            raise DisconnectionError("Connection failed idle ping")
+
+
+def pool_stats(engine: Engine) -> dict:
+    """Live pool state plus the checkout metrics of an instrumented pool"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__, "status": pool.status()}
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
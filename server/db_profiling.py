@@ -0,0 +1,192 @@
+"""
+Query Profiling - per-endpoint query counts, DB time and slow statements
+Cursor events on each engine time every statement and attribute it to the
+Flask endpoint serving the request (statements run outside a request, such
+as async handlers, jobs and open streams, go under "(background)"). Slow
+statements are logged with their parameter values redacted, and requests
+that run more than `n_plus_one_threshold` statements are logged and counted
+as possible N+1 patterns.
+"""
+import logging
+import re
+import threading
+import time
+from typing import Dict
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import N_PLUS_ONE_QUERY_COUNT, SLOW_QUERY_MS
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND = "(background)"
+UNMATCHED = "(unmatched)"
+
+# Distinct statements tracked; later new ones are folded into one entry
+MAX_STATEMENTS = 500
+OTHER_STATEMENTS = "(other statements)"
+
+_START_KEY = "query_started_at"
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str, limit: int = 300) -> str:
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + "..."
+
+
+def redact_params(parameters):
+    """Parameter names and value types only, so slow-query logs never carry user data"""
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"[{len(parameters)} parameter sets] {redact_params(parameters[0])}"
+        return [type(v).__name__ for v in parameters]
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    return type(parameters).__name__
+
+
+class QueryStats:
+    """
+    Statement timings from instrumented engines. Totals are kept per endpoint
+    and per normalized statement text, both process-local.
+    """
+
+    def __init__(self, slow_ms: float = 200, n_plus_one_threshold: int = 30):
+        self.slow_ms = slow_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._engines = set()
+        self._endpoints: Dict[str, dict] = {}
+        self._statements: Dict[str, dict] = {}
+        self._slow = 0
+
+    def instrument(self, engine: Engine):
+        """Time every statement run on `engine` (once per engine)"""
+        with self._lock:
+            if id(engine) in self._engines:
+                return
+            self._engines.add(id(engine))
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._failed_execute)
+
+    def install(self, app):
+        """Count statements per request and flag requests over the N+1 threshold"""
+
+        @app.before_request
+        def _start_query_count():
+            g.query_count = 0
+            g.query_ms = 0.0
+
+        @app.teardown_request
+        def _record_query_count(exc=None):
+            if "query_count" in g:
+                self._request_finished(request.endpoint or UNMATCHED, g.query_count, g.query_ms)
+
+    def summary(self, top: int = 20) -> dict:
+        """Per-endpoint totals, plus the `top` statements by total time"""
+        with self._lock:
+            endpoints = {name: dict(e) for name, e in self._endpoints.items()}
+            statements = sorted(
+                ({"statement": s, **dict(st)} for s, st in self._statements.items()),
+                key=lambda st: st["total_ms"],
+                reverse=True,
+            )[:top]
+            slow = self._slow
+
+        for e in endpoints.values():
+            requests = e["requests"]
+            e["queries_per_request"] = round(e["queries"] / requests, 2) if requests else None
+            e["db_ms_per_request"] = round(e["db_ms"] / requests, 3) if requests else None
+            e["db_ms"] = round(e["db_ms"], 3)
+        for st in statements:
+            st["mean_ms"] = round(st["total_ms"] / st["count"], 3)
+            st["total_ms"] = round(st["total_ms"], 3)
+            st["max_ms"] = round(st["max_ms"], 3)
+        return {
+            "slow_query_ms": self.slow_ms,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "slow_queries": slow,
+            "endpoints": dict(sorted(endpoints.items(), key=lambda kv: kv[1]["db_ms"], reverse=True)),
+            "top_statements": statements,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._statements.clear()
+            self._slow = 0
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+        in_request = has_request_context() and "query_count" in g
+        if in_request:
+            g.query_count += 1
+            g.query_ms += elapsed_ms
+            endpoint = request.endpoint or UNMATCHED
+        else:
+            endpoint = BACKGROUND
+
+        key = normalize_statement(statement)
+        slow = self.slow_ms and elapsed_ms >= self.slow_ms
+        with self._lock:
+            if not in_request:
+                e = self._endpoint(BACKGROUND)
+                e["queries"] += 1
+                e["db_ms"] += elapsed_ms
+            st = self._statements.get(key)
+            if st is None:
+                if len(self._statements) >= MAX_STATEMENTS:
+                    key = OTHER_STATEMENTS
+                st = self._statements.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            st["count"] += 1
+            st["total_ms"] += elapsed_ms
+            st["max_ms"] = max(st["max_ms"], elapsed_ms)
+            self._slow += bool(slow)
+        if slow:
+            logger.warning(
+                "Slow query (%.1f ms) in %s: %s params=%s",
+                elapsed_ms, endpoint, normalize_statement(statement), redact_params(parameters),
+            )
+
+    def _failed_execute(self, exception_context):
+        # A failed statement gets no after_cursor_execute; drop its start time
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_START_KEY):
+            conn.info[_START_KEY].pop()
+
+    def _request_finished(self, endpoint: str, queries: int, db_ms: float):
+        flagged = self.n_plus_one_threshold and queries > self.n_plus_one_threshold
+        with self._lock:
+            e = self._endpoint(endpoint)
+            e["requests"] += 1
+            e["queries"] += queries
+            e["db_ms"] += db_ms
+            e["max_queries"] = max(e["max_queries"], queries)
+            e["n_plus_one_requests"] += bool(flagged)
+        if flagged:
+            logger.warning(
+                "Possible N+1: %s ran %d queries (%.1f ms) in one request", endpoint, queries, db_ms
+            )
+
+    def _endpoint(self, name: str) -> dict:
+        # Caller holds self._lock
+        e = self._endpoints.get(name)
+        if e is None:
+            e = self._endpoints[name] = {
+                "requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0, "n_plus_one_requests": 0,
+            }
+        return e
+
+
+query_stats = QueryStats(slow_ms=SLOW_QUERY_MS, n_plus_one_threshold=N_PLUS_ONE_QUERY_COUNT)
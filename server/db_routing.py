@@ -0,0 +1,125 @@
+"""
+Read Routing - send query-side reads to read replicas
+`ReadRouter` stands in for the engine in the query blueprints: every
+`connect()` goes to the replica with the fewest connections in use, or to the
+primary when there are no replicas or the request has to read its own writes.
+A request reads from the primary when it sends `X-Read-Primary: 1`. Successful
+commands answer with `X-Read-Primary-For: <seconds>`, and the client services
+send the flag on every request for that long, so a client reads its own writes
+while the replicas catch up. Headers rather than a cookie, since the client
+calls the API cross-origin without credentials.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence
+
+from flask import g, has_request_context, request
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+PRIMARY_HEADER = "X-Read-Primary"
+PRIMARY_FOR_HEADER = "X-Read-Primary-For"
+
+# Requests that count as writes for read-your-writes
+COMMAND_PATH_PREFIX = "/api/commands/"
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class ReadRouter:
+    """
+    Least-connections balancing over read replicas.
+
+    A replica that cannot be connected to is skipped for that read, which is
+    served by the primary instead. Reads outside a request context use the
+    replicas; code that must see a just-committed row (stream wake-ups) reads
+    from `primary` directly.
+    """
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine] = ()):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._lock = threading.Lock()
+        self._in_use = [0] * len(self.replicas)
+        self._routed = [0] * len(self.replicas)
+        self._primary_reads = 0
+        self._fallbacks = 0
+
+    @contextmanager
+    def connect(self) -> Iterator[Connection]:
+        index = self._acquire(_use_primary())
+        try:
+            if index is None:
+                conn = self.primary.connect()
+            else:
+                try:
+                    conn = self.replicas[index].connect()
+                except DBAPIError:
+                    logger.warning("Read replica %d unavailable; reading from the primary", index, exc_info=True)
+                    with self._lock:
+                        self._fallbacks += 1
+                    conn = self.primary.connect()
+            with conn:
+                yield conn
+        finally:
+            if index is not None:
+                with self._lock:
+                    self._in_use[index] -= 1
+
+    def stats(self) -> dict:
+        """Connections in use and reads routed per replica, plus reads sent to the primary"""
+        with self._lock:
+            return {
+                "replicas": [
+                    {"url": _safe_url(e), "in_use": self._in_use[i], "reads": self._routed[i]}
+                    for i, e in enumerate(self.replicas)
+                ],
+                "primary_reads": self._primary_reads,
+                "fallbacks": self._fallbacks,
+            }
+
+    def _acquire(self, primary: bool) -> Optional[int]:
+        """Reserve the least-busy replica, or return None to read from the primary"""
+        with self._lock:
+            if primary or not self.replicas:
+                self._primary_reads += 1
+                return None
+            index = min(range(len(self.replicas)), key=self._in_use.__getitem__)
+            self._in_use[index] += 1
+            self._routed[index] += 1
+            return index
+
+
+def _use_primary() -> bool:
+    return has_request_context() and bool(g.get("read_primary"))
+
+
+def _safe_url(engine: Engine) -> str:
+    return engine.url.render_as_string(hide_password=True)
+
+
+def register_read_routing(app, router: ReadRouter, window_seconds: float):
+    """
+    Install the read-your-writes hooks: flag requests that must read from the
+    primary, and tell the client to keep asking for it for `window_seconds`
+    after a command succeeds. No-op without replicas.
+    """
+    if not router.replicas:
+        return
+
+    @app.before_request
+    def _route_reads():
+        g.read_primary = request.headers.get(PRIMARY_HEADER) == "1"
+
+    @app.after_request
+    def _remember_write(response):
+        if (
+            window_seconds > 0
+            and request.method in WRITE_METHODS
+            and request.path.startswith(COMMAND_PATH_PREFIX)
+            and response.status_code < 400
+        ):
+            response.headers[PRIMARY_FOR_HEADER] = f"{window_seconds:g}"
+        return response
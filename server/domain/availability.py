@@ -0,0 +1,356 @@
+"""
+Availability Grid - parse free-text availability slots into a week bitmap
+Slots such as "Monday 10am-12pm", "MWF 1-3pm" or "Weekdays 9:30-11" are parsed
+into (day, start_minute, end_minute) intervals and rasterised onto a 7 x 96
+grid of 15-minute cells, stored per user in `availability_grid`.
+"""
+import json
+import re
+from typing import Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_CELL = 15
+CELLS_PER_DAY = 24 * 60 // MINUTES_PER_CELL
+WEEK_CELLS = 7 * CELLS_PER_DAY
+GRID_BYTES = WEEK_CELLS // 8
+
+Interval = Tuple[int, int, int]  # (day 0=Monday, start minute, end minute)
+
+
+class SlotParseError(ValueError):
+    pass
+
+
+_DAY_ALIASES = {
+    "mon": 0, "monday": 0,
+    "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "weds": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+_DAY_GROUPS = {
+    "weekday": [0, 1, 2, 3, 4], "weekdays": [0, 1, 2, 3, 4],
+    "weekend": [5, 6], "weekends": [5, 6],
+    "daily": list(range(7)), "everyday": list(range(7)),
+}
+# Registrar-style compact day codes, e.g. "MWF", "TTh", "TR"
+_COMPACT_DAY = re.compile(r"th|tu|sa|su|m|t|w|r|f|s|u")
+_COMPACT_CODES = {"m": 0, "t": 1, "tu": 1, "w": 2, "r": 3, "th": 3, "f": 4, "s": 5, "sa": 5, "su": 6, "u": 6}
+
+_TIME = r"(noon|midnight|\d{1,2}(?::\d{2})?(?:\s*(?:[ap]\.?m\.?|[ap])(?![a-z]))?)"
+_TIME_RANGE = re.compile(_TIME + r"\s*(?:-|–|—|to|until|till)\s*" + _TIME, re.IGNORECASE)
+_TIME_PARTS = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap])?", re.IGNORECASE)
+
+
+def _parse_day_token(token: str) -> Optional[List[int]]:
+    token = token.strip(".").lower()
+    if not token:
+        return []
+    if token in _DAY_ALIASES:
+        return [_DAY_ALIASES[token]]
+    if token.endswith("s") and token[:-1] in _DAY_ALIASES:
+        return [_DAY_ALIASES[token[:-1]]]
+    if token in _DAY_GROUPS:
+        return list(_DAY_GROUPS[token])
+    if "-" in token:
+        first, _, last = token.partition("-")
+        start, end = _parse_day_token(first), _parse_day_token(last)
+        if start and end and len(start) == 1 and len(end) == 1:
+            span = (end[0] - start[0]) % 7
+            return [(start[0] + i) % 7 for i in range(span + 1)]
+        return None
+    codes = _COMPACT_DAY.findall(token)
+    if codes and "".join(codes) == token:
+        return [_COMPACT_CODES[c] for c in codes]
+    return None
+
+
+def _parse_days(day_text: str) -> List[int]:
+    cleaned = re.sub(r"\s*-\s*", "-", day_text.lower()).replace("every day", "everyday")
+    cleaned = re.sub(r"\b(and|every|on|from|at)\b", " ", cleaned)
+
+    days: List[int] = []
+    for token in re.split(r"[\s,/&+;]+", cleaned):
+        parsed = _parse_day_token(token)
+        if parsed is None:
+            raise SlotParseError(f"Unrecognised day '{token}'")
+        for d in parsed:
+            if d not in days:
+                days.append(d)
+    if not days:
+        raise SlotParseError("No day found")
+    return days
+
+
+def _split_time(raw: str) -> Tuple[int, int, Optional[str]]:
+    raw = raw.strip().lower()
+    if raw == "noon":
+        return 12, 0, "p"
+    if raw == "midnight":
+        return 12, 0, "a"
+    m = _TIME_PARTS.fullmatch(raw.replace(".", "").replace("m", "").strip())
+    if not m:
+        raise SlotParseError(f"Unrecognised time '{raw}'")
+    hour, minute = int(m.group(1)), int(m.group(2) or 0)
+    meridiem = m.group(3).lower() if m.group(3) else None
+    if minute > 59 or hour > 24 or (meridiem and not 1 <= hour <= 12):
+        raise SlotParseError(f"Invalid time '{raw}'")
+    return hour, minute, meridiem
+
+
+def _to_minutes(hour: int, minute: int, meridiem: Optional[str]) -> int:
+    if meridiem == "a":
+        hour = 0 if hour == 12 else hour
+    elif meridiem == "p":
+        hour = 12 if hour == 12 else hour + 12
+    return hour * 60 + minute
+
+
+def _parse_range(start_raw: str, end_raw: str) -> Tuple[int, int]:
+    sh, sm, s_mer = _split_time(start_raw)
+    eh, em, e_mer = _split_time(end_raw)
+
+    if s_mer is None and e_mer is None:
+        if sh > 12 or eh > 12 or sh == 0:
+            pass  # 24-hour clock
+        elif sh == 12 and eh < 12:
+            # "Sat 12-2", "12:30-1:30": a bare 12 before a smaller hour is noon
+            s_mer = e_mer = "p"
+        elif sh < 8:
+            # Bare small hours ("Fri 2-3") are afternoon/evening study times
+            s_mer = e_mer = "p"
+        else:
+            s_mer = "a"
+            e_mer = "a" if (eh, em) > (sh, sm) and eh != 12 else "p"
+    elif s_mer is None:
+        s_mer = e_mer
+        if _to_minutes(sh, sm, s_mer) > _to_minutes(eh, em, e_mer):
+            s_mer = "a"
+    elif e_mer is None:
+        e_mer = s_mer
+        if _to_minutes(eh, em, e_mer) <= _to_minutes(sh, sm, s_mer):
+            e_mer = "p"
+
+    start = _to_minutes(sh, sm, s_mer)
+    end = _to_minutes(eh, em, e_mer)
+    if end == 0:
+        end = 24 * 60
+    if start == end:
+        raise SlotParseError("Empty time range")
+    return start, end
+
+
+def parse_slot(slot: str) -> List[Interval]:
+    """
+    Parse one free-text slot into intervals.
+
+    Raises SlotParseError when no day or time range can be recognised. Ranges
+    crossing midnight are split onto the following day.
+    """
+    if not slot or not slot.strip():
+        raise SlotParseError("Empty slot")
+
+    matches = list(_TIME_RANGE.finditer(slot))
+    if not matches:
+        raise SlotParseError(f"No time range in '{slot}'")
+    m = matches[-1]
+    start, end = _parse_range(m.group(1), m.group(2))
+    # Days usually lead ("Mon 10-11"); trailing text is then treated as a note
+    day_text = slot[:m.start()] if slot[:m.start()].strip() else slot[m.end():]
+    days = _parse_days(day_text)
+
+    intervals: List[Interval] = []
+    for day in days:
+        if end > start:
+            intervals.append((day, start, end))
+        else:
+            intervals.append((day, start, 24 * 60))
+            intervals.append(((day + 1) % 7, 0, end))
+    return intervals
+
+
+def intervals_to_bits(intervals: Iterable[Interval], partial_cells: bool = False) -> int:
+    """
+    Rasterise intervals onto the week grid. A cell is set only if the
+    intervals cover all of it, so free time is never overstated ("10:05-11"
+    is free from 10:15); with `partial_cells` every cell an interval touches
+    is set, for query windows that must be covered in full.
+    """
+    bits = 0
+    for day, start, end in intervals:
+        if partial_cells:
+            first, last = start // MINUTES_PER_CELL, -(-end // MINUTES_PER_CELL)
+        else:
+            first, last = -(-start // MINUTES_PER_CELL), end // MINUTES_PER_CELL
+        if last > first:
+            bits |= ((1 << (last - first)) - 1) << (day * CELLS_PER_DAY + first)
+    return bits
+
+
+def bits_to_intervals(bits: int) -> List[Interval]:
+    """Merged (day, start, end) intervals covered by a week bitmap"""
+    intervals: List[Interval] = []
+    for day in range(7):
+        day_bits = (bits >> (day * CELLS_PER_DAY)) & ((1 << CELLS_PER_DAY) - 1)
+        cell = 0
+        while day_bits:
+            if day_bits & 1:
+                run = 0
+                while day_bits & 1:
+                    run += 1
+                    day_bits >>= 1
+                intervals.append((day, cell * MINUTES_PER_CELL, (cell + run) * MINUTES_PER_CELL))
+                cell += run
+            else:
+                skip = (day_bits & -day_bits).bit_length() - 1
+                day_bits >>= skip
+                cell += skip
+    return intervals
+
+
+def bits_to_bytes(bits: int) -> bytes:
+    return bits.to_bytes(GRID_BYTES, "little")
+
+
+def bytes_to_bits(data: Optional[bytes]) -> int:
+    return int.from_bytes(data, "little") if data else 0
+
+
+def bit_positions(bits: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def cells(bits: int) -> List[int]:
+    """Indices of the set cells (day * 96 + cell) in a week bitmap"""
+    return list(bit_positions(bits))
+
+
+def overlap_minutes(a: int, b: int) -> int:
+    """Minutes two week bitmaps have in common"""
+    return (a & b).bit_count() * MINUTES_PER_CELL
+
+
+def format_interval(interval: Interval) -> dict:
+    day, start, end = interval
+    return {
+        "day": DAY_NAMES[day],
+        "start": f"{start // 60:02d}:{start % 60:02d}",
+        "end": f"{end // 60:02d}:{end % 60:02d}",
+    }
+
+
+def common_free_windows(
+    member_intervals: Dict[Hashable, List[Interval]],
+) -> List[Tuple[int, int, int, FrozenSet[Hashable]]]:
+    """
+    Sweep-line over every member's intervals.
+
+    Returns (day, start, end, members free) for each maximal stretch of the
+    week during which the same set of members is free. Members' own intervals
+    must not overlap (bits_to_intervals output is already merged). Windows are
+    cut at midnight so each one belongs to a single day.
+    """
+    events: List[Tuple[int, int, Optional[Hashable]]] = [(d * 24 * 60, 0, None) for d in range(1, 7)]
+    for member, intervals in member_intervals.items():
+        for day, start, end in intervals:
+            base = day * 24 * 60
+            events.append((base + start, 1, member))
+            events.append((base + end, -1, member))
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    windows = []
+    free: set = set()
+    prev = None
+    i = 0
+    while i < len(events):
+        t = events[i][0]
+        if free and prev is not None and t > prev:
+            day = prev // (24 * 60)
+            windows.append((day, prev - day * 24 * 60, t - day * 24 * 60, frozenset(free)))
+        while i < len(events) and events[i][0] == t:
+            _, delta, member = events[i]
+            if delta > 0:
+                free.add(member)
+            elif delta < 0:
+                free.discard(member)
+            i += 1
+        prev = t
+    return windows
+
+
+def merge_windows(
+    windows: List[Tuple[int, int, int, FrozenSet[Hashable]]],
+    min_members: int,
+) -> List[Tuple[int, int, int, int, FrozenSet[Hashable]]]:
+    """
+    Join back-to-back `common_free_windows` output in which at least
+    `min_members` are free throughout, so a member coming or going inside a
+    stretch does not split it.
+
+    Returns (day, start, end, fewest members free, members free for the whole
+    window) per merged window, still cut at midnight.
+    """
+    merged = []
+    for day, start, end, free in windows:
+        if len(free) < min_members:
+            continue
+        if merged and merged[-1][0] == day and merged[-1][2] == start:
+            _, m_start, _, fewest, always = merged[-1]
+            merged[-1] = (day, m_start, end, min(fewest, len(free)), always & free)
+        else:
+            merged.append((day, start, end, len(free), free))
+    return merged
+
+
+def build_grid(slots: Iterable[str]) -> Tuple[int, List[str]]:
+    """OR every parseable slot into one bitmap; returns (bits, unparsed slots)"""
+    bits = 0
+    unparsed: List[str] = []
+    for slot in slots:
+        try:
+            bits |= intervals_to_bits(parse_slot(slot))
+        except SlotParseError:
+            unparsed.append(slot)
+    return bits, unparsed
+
+
+def sync_availability_grid(conn, user_id: int) -> List[str]:
+    """
+    Recompute a user's `availability_grid` row and `availability_buckets`
+    entries from their `availability_text` slots inside the caller's
+    transaction. Returns the slots that could not be parsed so commands can
+    report them.
+    """
+    slots = conn.execute(
+        text("SELECT slot FROM availability_text WHERE user_id = :uid ORDER BY id"),
+        {"uid": user_id},
+    ).scalars().all()
+    bits, unparsed = build_grid(slots)
+
+    conn.execute(text("DELETE FROM availability_grid WHERE user_id = :uid"), {"uid": user_id})
+    conn.execute(
+        text(
+            """
+            INSERT INTO availability_grid (user_id, week_bits, unparsed_slots)
+            VALUES (:uid, :bits, :unparsed)
+            """
+        ),
+        {"uid": user_id, "bits": bits_to_bytes(bits), "unparsed": json.dumps(unparsed)},
+    )
+
+    conn.execute(text("DELETE FROM availability_buckets WHERE user_id = :uid"), {"uid": user_id})
+    buckets = cells(bits)
+    if buckets:
+        conn.execute(
+            text("INSERT INTO availability_buckets (bucket, user_id) VALUES (:bucket, :uid)"),
+            [{"bucket": b, "uid": user_id} for b in buckets],
+        )
+    return unparsed
@@ -1,20 +1,363 @@
-from typing import Callable, Dict, List, Type
+"""
+Event Bus - in-process domain event dispatch
+In "sync" mode handlers run inline in the publishing request. In "async" mode
+events go onto a bounded queue drained by a pool of worker threads so the
+request only pays for the enqueue.
+"""
+import logging
+import queue
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from config import (
+    EVENT_BUS_BLOCK_TIMEOUT,
+    EVENT_BUS_FULL_POLICY,
+    EVENT_BUS_METRICS,
+    EVENT_BUS_MODE,
+    EVENT_BUS_QUEUE_SIZE,
+    EVENT_BUS_SLOW_HANDLER_MS,
+    EVENT_BUS_WORKERS,
+    HANDLERS_IN_TRANSACTION,
+)
+
+logger = logging.getLogger(__name__)
+
+MODES = ("sync", "async")
+FULL_POLICIES = ("block", "drop", "spill")
+
+# Upper bounds (ms) of the handler latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_STOP = object()
 
 
 class DomainEvent:
     pass
 
 
+class BusMetrics:
+    """
+    Per event type publish, in-flight and error counts, and per handler
+    latency histograms. Handlers at or over `slow_ms` are logged.
+    """
+
+    def __init__(self, slow_ms: float = 0):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._events: Dict[str, Dict[str, int]] = {}
+        self._handlers: Dict[Tuple[str, str], dict] = {}
+
+    def published(self, event_type: str):
+        with self._lock:
+            self._event(event_type)["published"] += 1
+
+    def started(self, event_type: str):
+        with self._lock:
+            self._event(event_type)["in_flight"] += 1
+
+    def finished(self, event_type: str, handler: Callable, elapsed_ms: float, failed: bool):
+        name = _handler_name(handler)
+        bucket = bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            counts = self._event(event_type)
+            counts["in_flight"] -= 1
+            counts["handled"] += 1
+            counts["errors"] += failed
+            h = self._handlers.get((event_type, name))
+            if h is None:
+                h = self._handlers[(event_type, name)] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            h["count"] += 1
+            h["errors"] += failed
+            h["total_ms"] += elapsed_ms
+            h["max_ms"] = max(h["max_ms"], elapsed_ms)
+            h["buckets"][bucket] += 1
+        if self.slow_ms and elapsed_ms >= self.slow_ms:
+            logger.warning("Slow event handler %s for %s: %.1f ms", name, event_type, elapsed_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            events = {name: dict(counts) for name, counts in self._events.items()}
+            handlers = {key: dict(h, buckets=list(h["buckets"])) for key, h in self._handlers.items()}
+
+        labels = [str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"]
+        return {
+            "slow_handler_ms": self.slow_ms,
+            "event_types": events,
+            "handlers": [
+                {
+                    "event_type": event_type,
+                    "handler": name,
+                    "count": h["count"],
+                    "errors": h["errors"],
+                    "mean_ms": round(h["total_ms"] / h["count"], 3) if h["count"] else None,
+                    "max_ms": round(h["max_ms"], 3),
+                    "p50_ms": _bucket_quantile(h["buckets"], 0.5),
+                    "p99_ms": _bucket_quantile(h["buckets"], 0.99),
+                    # Non-cumulative counts per upper bound in ms
+                    "histogram_ms": dict(zip(labels, h["buckets"])),
+                }
+                for (event_type, name), h in sorted(handlers.items())
+            ],
+        }
+
+    def _event(self, event_type: str) -> Dict[str, int]:
+        counts = self._events.get(event_type)
+        if counts is None:
+            counts = self._events[event_type] = {"published": 0, "handled": 0, "in_flight": 0, "errors": 0}
+        return counts
+
+
+def _handler_name(handler: Callable) -> str:
+    return f"{getattr(handler, '__module__', '?')}.{getattr(handler, '__qualname__', repr(handler))}"
+
+
+def _bucket_quantile(buckets: List[int], q: float) -> Optional[float]:
+    """Upper bound (ms) of the histogram bucket holding quantile q; None past the last bound"""
+    total = sum(buckets)
+    if not total:
+        return None
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= q * total:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
 class EventBus:
-    def __init__(self):
+    """
+    Publish/subscribe by event type.
+
+    Handlers subscribed with `transactional=True` accept an optional second
+    argument, the command's unit of work. When the bus is `transactional`
+    they run inside the command's own transaction (see `run_in_transaction`)
+    and are skipped by every later dispatch; otherwise they are dispatched
+    like any other handler, without a unit of work.
+
+    In async mode a full queue is handled by `full_policy`: "block" waits up to
+    `block_timeout` seconds for room and then drops, "drop" discards the event
+    at once, and "spill" runs its handlers on the publishing thread. Handler
+    errors are logged and counted in async mode; in sync mode they propagate
+    to the publisher as before.
+
+    With `metrics` every handler run is timed into a `BusMetrics`; without it
+    handlers are called directly with no bookkeeping.
+    """
+
+    def __init__(
+        self,
+        mode: str = "sync",
+        workers: int = 4,
+        queue_size: int = 1000,
+        full_policy: str = "block",
+        block_timeout: float = 1.0,
+        transactional: bool = False,
+        metrics: bool = False,
+        slow_handler_ms: float = 0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown event bus mode '{mode}'")
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown event bus full policy '{full_policy}'")
         self._handlers: Dict[Type[DomainEvent], List[Callable[[DomainEvent], None]]] = {}
+        self._transactional: Dict[Type[DomainEvent], List[Callable]] = {}
+        self.mode = mode
+        self.transactional = transactional
+        self.metrics: Optional[BusMetrics] = BusMetrics(slow_handler_ms) if metrics else None
+        self.full_policy = full_policy
+        self.block_timeout = block_timeout
+        self._workers = max(1, workers)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._published = 0
+        self._dispatched = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._errors = 0
+        self._max_depth = 0
 
-    def subscribe(self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], None]):
+    def subscribe(
+        self, event_type: Type[DomainEvent], handler: Callable[[DomainEvent], None], transactional: bool = False
+    ):
         self._handlers.setdefault(event_type, []).append(handler)
+        if transactional:
+            self._transactional.setdefault(event_type, []).append(handler)
+
+    def run_in_transaction(self, event: DomainEvent, uow):
+        """
+        Run the transactional handlers for `event` on the command's unit of
+        work, before it commits. A failing handler rolls the command back.
+        No-op unless the bus is `transactional`.
+        """
+        if not self.transactional:
+            return
+        for handler in self._transactional.get(type(event), []):
+            self._run(handler, event, uow)
 
     def publish(self, event: DomainEvent):
-        for handler in self._handlers.get(type(event), []):
-            handler(event)
+        handlers = self._handlers_for(event)
+        if self.metrics is not None:
+            self.metrics.published(type(event).__name__)
+        if not handlers:
+            return
+        with self._lock:
+            self._published += 1
+            inline = self.mode == "sync" or self._closed
+            if not inline:
+                self._start_workers()
+
+        if inline:
+            self.handle(event)
+            return
+
+        try:
+            if self.full_policy == "block":
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            if self.full_policy == "spill":
+                with self._lock:
+                    self._spilled += 1
+                self._dispatch(event)
+            else:
+                with self._lock:
+                    self._dropped += 1
+                logger.warning("Event bus queue full; dropped %s", type(event).__name__)
+            return
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self._max_depth = max(self._max_depth, depth)
+
+    def handle(self, event: DomainEvent):
+        """Run the handlers for `event` on the calling thread; errors propagate"""
+        for handler in self._handlers_for(event):
+            self._run(handler, event)
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop accepting queued events and let the workers drain what is left.
+        Later publishes run inline. Returns False if the queue did not drain
+        within `timeout` seconds.
+        """
+        with self._lock:
+            if self._closed:
+                return True
+            self._closed = True
+            threads = list(self._threads)
+            self._threads = []
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        drained = not any(t.is_alive() for t in threads)
+        if not drained:
+            logger.warning("Event bus shutdown timed out with %d events queued", self._queue.qsize())
+            return False
+
+        # Publishes that raced with shutdown may have queued behind the stop markers
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                return True
+            if event is not _STOP:
+                self._dispatch(event)
+
+    def stats(self) -> dict:
+        """Mode, queue depth and dispatch counters, plus handler metrics when enabled"""
+        with self._lock:
+            stats = {
+                "mode": self.mode,
+                "full_policy": self.full_policy,
+                "workers": len(self._threads),
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "max_queue_depth": self._max_depth,
+                "published": self._published,
+                "dispatched": self._dispatched,
+                "dropped": self._dropped,
+                "spilled": self._spilled,
+                "errors": self._errors,
+                "closed": self._closed,
+            }
+        if self.metrics is not None:
+            stats.update(self.metrics.snapshot())
+        return stats
+
+    def _start_workers(self):
+        # Caller holds self._lock; threads start on the first async publish
+        while len(self._threads) < self._workers:
+            thread = threading.Thread(
+                target=self._work, name=f"event-bus-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is _STOP:
+                    return
+                self._dispatch(event)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, handler: Callable, event: DomainEvent, *args):
+        metrics = self.metrics
+        if metrics is None:
+            handler(event, *args)
+            return
+        event_type = type(event).__name__
+        metrics.started(event_type)
+        started = time.perf_counter()
+        failed = True
+        try:
+            handler(event, *args)
+            failed = False
+        finally:
+            metrics.finished(event_type, handler, (time.perf_counter() - started) * 1000, failed)
+
+    def _handlers_for(self, event: DomainEvent) -> List[Callable[[DomainEvent], None]]:
+        handlers = self._handlers.get(type(event), [])
+        if self.transactional and type(event) in self._transactional:
+            already_run = self._transactional[type(event)]
+            return [h for h in handlers if h not in already_run]
+        return handlers
+
+    def _dispatch(self, event: DomainEvent):
+        for handler in self._handlers_for(event):
+            try:
+                self._run(handler, event)
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+                logger.exception("Event handler %s failed for %r", getattr(handler, "__name__", handler), event)
+        with self._lock:
+            self._dispatched += 1
 
 
-event_bus = EventBus()
+event_bus = EventBus(
+    mode=EVENT_BUS_MODE,
+    workers=EVENT_BUS_WORKERS,
+    queue_size=EVENT_BUS_QUEUE_SIZE,
+    full_policy=EVENT_BUS_FULL_POLICY,
+    block_timeout=EVENT_BUS_BLOCK_TIMEOUT,
+    transactional=HANDLERS_IN_TRANSACTION,
+    metrics=EVENT_BUS_METRICS,
+    slow_handler_ms=EVENT_BUS_SLOW_HANDLER_MS,
+)
@@ -0,0 +1,43 @@
+"""
+Event Log - append-only history of domain events
+Every event raised through a unit of work is appended to `event_log` in the
+command's own transaction. Projections replay it to (re)build read tables.
+"""
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import text
+
+from .event_bus import DomainEvent
+from .events import deserialize_event, serialize_event
+
+LoggedEvent = Tuple[int, DomainEvent]  # (event_log.id, event)
+
+
+def append_events(conn, events: Iterable[DomainEvent]):
+    """Append events to the log inside the caller's transaction"""
+    rows = [{"type": type(e).__name__, "payload": serialize_event(e)} for e in events]
+    if rows:
+        conn.execute(
+            text("INSERT INTO event_log (event_type, payload) VALUES (:type, :payload)"),
+            rows,
+        )
+
+
+def read_events(conn, after_id: int, limit: int) -> List[LoggedEvent]:
+    """Up to `limit` logged events with id > after_id, oldest first"""
+    rows = conn.execute(
+        text(
+            """
+            SELECT id, event_type, payload FROM event_log
+            WHERE id > :after
+            ORDER BY id
+            LIMIT :limit
+            """
+        ),
+        {"after": after_id, "limit": limit},
+    ).fetchall()
+    return [(row.id, deserialize_event(row.event_type, row.payload)) for row in rows]
+
+
+def last_event_id(conn) -> int:
+    return conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM event_log")).scalar()
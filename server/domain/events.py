@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+import json
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Type
+
 from .event_bus import DomainEvent
 
 
@@ -20,3 +23,74 @@ class GroupMessagePosted(DomainEvent):
     group_id: int
     user_id: int
     message_id: int
+
+
+@dataclass
+class GroupUpdated(DomainEvent):
+    group_id: int
+
+
+@dataclass
+class GroupOwnershipTransferred(DomainEvent):
+    group_id: int
+    old_owner_user_id: int
+    new_owner_user_id: int
+
+
+@dataclass
+class GroupLeft(DomainEvent):
+    group_id: int
+    user_id: int
+
+
+@dataclass
+class GroupArchived(DomainEvent):
+    group_id: int
+
+
+@dataclass
+class GroupDeleted(DomainEvent):
+    group_id: int
+
+
+@dataclass
+class UserUpdated(DomainEvent):
+    user_id: int
+
+
+@dataclass
+class UserDeleted(DomainEvent):
+    user_id: int
+    # Groups the user belonged to or owned; they are gone from the write tables once committed
+    group_ids: List[int]
+
+
+# Stored event names (event_outbox / event_log event_type) -> event classes
+EVENT_TYPES: Dict[str, Type[DomainEvent]] = {
+    cls.__name__: cls
+    for cls in (
+        GroupCreated,
+        GroupJoined,
+        GroupMessagePosted,
+        GroupUpdated,
+        GroupOwnershipTransferred,
+        GroupLeft,
+        GroupArchived,
+        GroupDeleted,
+        UserUpdated,
+        UserDeleted,
+    )
+}
+
+
+def serialize_event(event: DomainEvent) -> str:
+    return json.dumps(asdict(event))
+
+
+def deserialize_event(event_type: str, payload) -> DomainEvent:
+    """Rebuild an event from its stored name and JSON payload"""
+    cls = EVENT_TYPES.get(event_type)
+    if cls is None:
+        raise ValueError(f"Unknown event type '{event_type}'")
+    data = json.loads(payload) if isinstance(payload, (str, bytes)) else payload
+    return cls(**data)
@@ -1,80 +1,127 @@
 import json
+from contextlib import contextmanager
+from typing import Optional
+
 from sqlalchemy import text
 
+from config import MATERIALIZE_MESSAGE_NOTIFICATIONS, NOTIFICATION_FANOUT_BATCH_SIZE
 from db import engine
 from .events import GroupCreated, GroupJoined, GroupMessagePosted
 from .event_bus import EventBus
+from .notifications import notifications_changed, notifications_changed_many
+from .pubsub import group_topic, hub, sse_frame
 
+# Columns streamed to live chat subscribers; same names as the rows of
+# GET /api/queries/messages/group/<id>, so streamed rows merge into a loaded page
+MESSAGE_STREAM_COLUMNS = """
+    SELECT m.id, m.group_id, m.content, m.created_at AS posted_at,
+           u.id AS user_id, u.name AS user_name, u.avatar AS user_avatar
+    FROM messages m
+    JOIN users u ON m.user_id = u.id
+"""
 
-def handle_group_created(evt: GroupCreated):
-    with engine.begin() as conn:
-        data = {
-            "group_id": evt.group_id,
-            "message": "Your group was created.",
-        }
+
+def insert_notifications(conn, user_ids, notification_type: str, data: str,
+                         ref_type: Optional[str] = None, ref_id: Optional[int] = None):
+    """
+    One notification per user with a shared, pre-serialised payload. Rows go
+    out as executemany batches, which PyMySQL sends as multi-row INSERTs.
+    `ref_type`/`ref_id` name the entity the notification is about (e.g.
+    "group", 12) so it can be found by index instead of by its JSON data.
+    """
+    rows = [
+        {"uid": uid, "type": notification_type, "data": data, "ref_type": ref_type, "ref_id": ref_id}
+        for uid in user_ids
+    ]
+    for i in range(0, len(rows), NOTIFICATION_FANOUT_BATCH_SIZE):
         conn.execute(
             text(
-                "INSERT INTO notifications (user_id, type, data) "
-                "VALUES (:uid, :type, :data)"
+                "INSERT INTO notifications (user_id, type, data, ref_type, ref_id) "
+                "VALUES (:uid, :type, :data, :ref_type, :ref_id)"
             ),
-            {
-                "uid": evt.owner_user_id,
-                "type": "group_created",
-                "data": json.dumps(data),
-            },
+            rows[i:i + NOTIFICATION_FANOUT_BATCH_SIZE],
         )
 
 
-def handle_group_joined(evt: GroupJoined):
-    with engine.begin() as conn:
+@contextmanager
+def handler_transaction(uow=None):
+    """The command's connection when run inside its unit of work, else a transaction of our own"""
+    if uow is not None:
+        yield uow.conn
+    else:
+        with engine.begin() as conn:
+            yield conn
+
+
+def after_commit(uow, fn, *args):
+    """Defer `fn(*args)` until the command commits, or run it now outside a unit of work"""
+    if uow is not None:
+        uow.after_commit(fn, *args)
+    else:
+        fn(*args)
+
+
+def handle_group_created(evt: GroupCreated, uow=None):
+    with handler_transaction(uow) as conn:
+        data = {
+            "group_id": evt.group_id,
+            "message": "Your group was created.",
+        }
+        insert_notifications(conn, [evt.owner_user_id], "group_created", json.dumps(data), "group", evt.group_id)
+    after_commit(uow, notifications_changed, evt.owner_user_id)
+
+
+def handle_group_joined(evt: GroupJoined, uow=None):
+    with handler_transaction(uow) as conn:
         data = {
             "group_id": evt.group_id,
             "user_id": evt.user_id,
             "message": "A new member joined your group.",
         }
-        conn.execute(
-            text(
-                "INSERT INTO notifications (user_id, type, data) "
-                "VALUES (:uid, :type, :data)"
-            ),
-            {
-                "uid": evt.owner_user_id,
-                "type": "group_joined",
-                "data": json.dumps(data),
-            },
-        )
+        insert_notifications(conn, [evt.owner_user_id], "group_joined", json.dumps(data), "group", evt.group_id)
+    after_commit(uow, notifications_changed, evt.owner_user_id)
 
 
-def handle_group_message_posted(evt: GroupMessagePosted):
-    with engine.begin() as conn:
+def handle_group_message_posted(evt: GroupMessagePosted, uow=None):
+    data = json.dumps(
+        {
+            "group_id": evt.group_id,
+            "message_id": evt.message_id,
+            "message": "New message in your study group.",
+        }
+    )
+    with handler_transaction(uow) as conn:
         members_q = text(
             "SELECT user_id FROM group_members "
             "WHERE group_id = :gid AND status = 'active' AND user_id <> :uid"
         )
-        rows = conn.execute(
+        user_ids = conn.execute(
             members_q, {"gid": evt.group_id, "uid": evt.user_id}
-        ).fetchall()
-
-        for row in rows:
-            data = {
-                "group_id": evt.group_id,
-                "message_id": evt.message_id,
-                "message": "New message in your study group.",
-            }
-            conn.execute(
-                text(
-                    "INSERT INTO notifications (user_id, type, data) "
-                    "VALUES (:uid, :type, :data)"
-                ),
-                {
-                    "uid": row.user_id,
-                    "type": "group_message_posted",
-                    "data": json.dumps(data),
-                },
-            )
+        ).scalars().all()
+
+        insert_notifications(conn, user_ids, "group_message_posted", data, "group", evt.group_id)
+    after_commit(uow, notifications_changed_many, user_ids)
+
+
+def handle_group_message_live(evt: GroupMessagePosted):
+    topic = group_topic(evt.group_id)
+    if not hub.has_subscribers(topic):
+        return
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(MESSAGE_STREAM_COLUMNS + " WHERE m.id = :mid"),
+            {"mid": evt.message_id},
+        ).mappings().first()
+    if row:
+        # Serialised once here, shared by every subscriber's queue
+        hub.publish(topic, (row["id"], sse_frame(dict(row), event_id=row["id"], event="message")))
 
 
 def register_handlers(bus: EventBus):
-    bus.subscribe(GroupCreated, handle_group_created)
-    bus.subscribe(GroupJoined, handle_group_joined)
-    bus.subscribe(GroupMessagePosted, handle_group_message_posted)
+    bus.subscribe(GroupCreated, handle_group_created, transactional=True)
+    bus.subscribe(GroupJoined, handle_group_joined, transactional=True)
+    # Unread chat counts come from group_read_state; per-member rows are opt-in
+    if MATERIALIZE_MESSAGE_NOTIFICATIONS:
+        bus.subscribe(GroupMessagePosted, handle_group_message_posted, transactional=True)
+    # Reads the committed message, so always runs after the commit
+    bus.subscribe(GroupMessagePosted, handle_group_message_live)
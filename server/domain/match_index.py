@@ -0,0 +1,223 @@
+"""
+Match Index - process-local classmate matching index
+Holds every user's enrolled courses as a bitset over interned course ids so
+"top-N users by shared courses" can be answered without touching the database.
+"""
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from db import engine
+
+from .availability import bit_positions
+
+logger = logging.getLogger(__name__)
+
+
+class MatchIndex:
+    """
+    In-memory enrollment index.
+
+    Course ids are interned to bit positions; each user maps to an int bitset
+    of the courses they are enrolled in, and each bit position keeps the set of
+    enrolled users so candidates can be found without scanning every user.
+
+    The index is process-local: it is built from `enrollments` at startup and
+    kept current by the enroll/unenroll commands running in the same process.
+    Until the first rebuild finishes the index is "cold" and callers should
+    fall back to SQL.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._course_bits: Dict[str, int] = {}
+        self._course_codes: List[str] = []
+        self._course_users: List[Set[int]] = []
+        self._user_bits: Dict[int, int] = {}
+        self._warm = False
+        self._rebuilding = False
+        self._pending: List[Tuple[str, int, Optional[str], Optional[str]]] = []
+        self._rebuild_seconds: Optional[float] = None
+        self._built_at: Optional[float] = None
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm
+
+    def rebuild(self):
+        """Reload the whole index from `enrollments`"""
+        started = time.perf_counter()
+        with self._lock:
+            self._rebuilding = True
+            self._pending = []
+
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(
+                    text(
+                        """
+                        SELECT e.user_id, e.course_id, c.code
+                        FROM enrollments e
+                        JOIN courses c ON e.course_id = c.id
+                        """
+                    )
+                ).fetchall()
+
+            course_bits: Dict[str, int] = {}
+            course_codes: List[str] = []
+            course_users: List[Set[int]] = []
+            user_bits: Dict[int, int] = {}
+            for row in rows:
+                bit = course_bits.get(row.course_id)
+                if bit is None:
+                    bit = len(course_codes)
+                    course_bits[row.course_id] = bit
+                    course_codes.append(row.code)
+                    course_users.append(set())
+                user_bits[row.user_id] = user_bits.get(row.user_id, 0) | (1 << bit)
+                course_users[bit].add(row.user_id)
+
+            with self._lock:
+                self._course_bits = course_bits
+                self._course_codes = course_codes
+                self._course_users = course_users
+                self._user_bits = user_bits
+                # Replay enrollment changes that raced with the load
+                for op, user_id, course_id, code in self._pending:
+                    if op == "add":
+                        self._add(user_id, course_id, code)
+                    elif op == "remove":
+                        self._remove(user_id, course_id)
+                    else:
+                        self._remove_user(user_id)
+                self._pending = []
+                self._warm = True
+                self._rebuild_seconds = time.perf_counter() - started
+                self._built_at = time.time()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def warm(self):
+        """Rebuild the index, leaving it cold (SQL fallback) if the load fails"""
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Match index rebuild failed; serving matches from SQL")
+
+    def add_enrollment(self, user_id: int, course_id: str, code: str):
+        with self._lock:
+            if not (self._warm or self._rebuilding):
+                return
+            if self._rebuilding:
+                self._pending.append(("add", user_id, course_id, code))
+            self._add(user_id, course_id, code)
+
+    def remove_enrollment(self, user_id: int, course_id: str):
+        with self._lock:
+            if not (self._warm or self._rebuilding):
+                return
+            if self._rebuilding:
+                self._pending.append(("remove", user_id, course_id, None))
+            self._remove(user_id, course_id)
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            if not (self._warm or self._rebuilding):
+                return
+            if self._rebuilding:
+                self._pending.append(("remove_user", user_id, None, None))
+            self._remove_user(user_id)
+
+    def top_matches(self, user_id: int, limit: int) -> Optional[List[Tuple[int, int, List[str]]]]:
+        """
+        Rank other users by number of shared courses.
+
+        Returns (user_id, shared_courses, shared_course_codes) tuples ordered by
+        shared courses descending, or None while the index is cold. Users tied
+        with the last ranked entry are all included so the caller can apply its
+        own tie-break (e.g. by name) before trimming to `limit`.
+        """
+        with self._lock:
+            if not self._warm:
+                return None
+
+            bits = self._user_bits.get(user_id, 0)
+            if not bits:
+                return []
+
+            candidates: Set[int] = set()
+            for bit in bit_positions(bits):
+                candidates |= self._course_users[bit]
+            candidates.discard(user_id)
+
+            scored = []
+            for other_id in candidates:
+                shared = bits & self._user_bits[other_id]
+                scored.append((other_id, shared.bit_count(), shared))
+
+            scored.sort(key=lambda s: s[1], reverse=True)
+            if len(scored) > limit:
+                cutoff = scored[limit - 1][1]
+                scored = [s for s in scored if s[1] >= cutoff]
+
+            return [
+                (other_id, count, [self._course_codes[b] for b in bit_positions(shared)])
+                for other_id, count, shared in scored
+            ]
+
+    def stats(self) -> dict:
+        """Report size, memory footprint and last rebuild time"""
+        with self._lock:
+            footprint = (
+                sys.getsizeof(self._course_bits)
+                + sys.getsizeof(self._course_codes)
+                + sys.getsizeof(self._course_users)
+                + sys.getsizeof(self._user_bits)
+                + sum(sys.getsizeof(k) for k in self._course_bits)
+                + sum(sys.getsizeof(c) for c in self._course_codes)
+                + sum(sys.getsizeof(s) for s in self._course_users)
+                + sum(sys.getsizeof(u) + sys.getsizeof(b) for u, b in self._user_bits.items())
+            )
+            return {
+                "warm": self._warm,
+                "users": len(self._user_bits),
+                "courses": len(self._course_codes),
+                "enrollments": sum(len(s) for s in self._course_users),
+                "memory_bytes": footprint,
+                "rebuild_seconds": self._rebuild_seconds,
+                "built_at": self._built_at,
+            }
+
+    def _add(self, user_id: int, course_id: str, code: str):
+        bit = self._course_bits.get(course_id)
+        if bit is None:
+            bit = len(self._course_codes)
+            self._course_bits[course_id] = bit
+            self._course_codes.append(code)
+            self._course_users.append(set())
+        self._user_bits[user_id] = self._user_bits.get(user_id, 0) | (1 << bit)
+        self._course_users[bit].add(user_id)
+
+    def _remove(self, user_id: int, course_id: str):
+        bit = self._course_bits.get(course_id)
+        if bit is None or user_id not in self._user_bits:
+            return
+        remaining = self._user_bits[user_id] & ~(1 << bit)
+        if remaining:
+            self._user_bits[user_id] = remaining
+        else:
+            del self._user_bits[user_id]
+        self._course_users[bit].discard(user_id)
+
+    def _remove_user(self, user_id: int):
+        bits = self._user_bits.pop(user_id, 0)
+        for bit in bit_positions(bits):
+            self._course_users[bit].discard(user_id)
+
+
+match_index = MatchIndex()
@@ -0,0 +1,143 @@
+"""
+Match Scoring - weighted classmate ranking over a candidate set
+Combines shared courses, weekly availability overlap and `users.study_prefs`
+(times, location, style) into one score, computed with NumPy over the whole
+candidate set at once.
+"""
+import json
+import math
+import threading
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .availability import GRID_BYTES, MINUTES_PER_CELL
+
+WEIGHT_KEYS = ("courses", "availability", "times", "location", "style")
+DEFAULT_WEIGHTS = {"courses": 0.5, "availability": 0.3, "times": 0.1, "location": 0.05, "style": 0.05}
+
+_EMPTY_GRID = bytes(GRID_BYTES)
+_PREF_BITS = 64
+
+_vocab_lock = threading.Lock()
+_vocab: Dict[Tuple[str, str], int] = {}
+
+
+def parse_weights(raw: Optional[str]) -> Dict[str, float]:
+    """Parse "courses:0.5,availability:0.3,..." on top of DEFAULT_WEIGHTS"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        key, _, value = part.partition(":")
+        key = key.strip()
+        if key not in weights:
+            raise ValueError(f"Unknown match weight '{key}'")
+        weights[key] = weight_value(value)
+    return weights
+
+
+def weight_value(raw: str) -> float:
+    """One match weight; must be a finite, non-negative number"""
+    value = float(raw)
+    if not math.isfinite(value) or value < 0:
+        raise ValueError(f"Match weight must be a finite, non-negative number, got '{raw}'")
+    return value
+
+
+def _intern(category: str, value: str) -> int:
+    key = (category, value.strip().lower())
+    with _vocab_lock:
+        return _vocab.setdefault(key, len(_vocab) + 1)
+
+
+@lru_cache(maxsize=65536)
+def pref_features(raw: Optional[str]) -> Tuple[int, int, int]:
+    """
+    (times mask, location mask, style id) for a study_prefs JSON document.
+    Values are interned per process; past 64 distinct values masks share bits.
+    """
+    try:
+        prefs = json.loads(raw) if raw else {}
+    except (TypeError, ValueError):
+        prefs = {}
+    if not isinstance(prefs, dict):
+        prefs = {}
+
+    masks = []
+    for category in ("times", "location"):
+        values = prefs.get(category) or []
+        if isinstance(values, str):
+            values = [values]
+        mask = 0
+        for value in values:
+            if isinstance(value, str) and value.strip():
+                mask |= 1 << (_intern(category, value) % _PREF_BITS)
+        masks.append(mask)
+
+    style = prefs.get("style")
+    style_id = _intern("style", style) if isinstance(style, str) and style.strip() else 0
+    return masks[0], masks[1], style_id
+
+
+def _jaccard(mine: np.uint64, theirs: np.ndarray) -> np.ndarray:
+    inter = np.bitwise_count(theirs & mine).astype(np.float64)
+    union = np.bitwise_count(theirs | mine).astype(np.float64)
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def score_candidates(
+    user_prefs: Optional[str],
+    user_grid: Optional[bytes],
+    shared_courses: Sequence[int],
+    candidate_prefs: Sequence[Optional[str]],
+    candidate_grids: Sequence[Optional[bytes]],
+    weights: Dict[str, float],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every candidate against the requesting user.
+
+    Returns (scores, overlap_minutes) arrays aligned with the inputs. Each
+    component is normalised to [0, 1] before weighting: shared courses by the
+    best candidate, availability by the requester's own free time, and the
+    study preferences by Jaccard similarity (times, location) or equality
+    (style).
+    """
+    n = len(shared_courses)
+    if n == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    shared = np.asarray(shared_courses, dtype=np.float64)
+    courses = shared / max(shared.max(), 1.0)
+
+    # 84-byte grids are read as 21 uint32 words to keep the AND/popcount short
+    mine = np.frombuffer(user_grid or _EMPTY_GRID, dtype=np.uint32)
+    grids = np.frombuffer(b"".join(g or _EMPTY_GRID for g in candidate_grids), dtype=np.uint32).reshape(n, -1)
+    overlap_cells = np.bitwise_count(grids & mine).sum(axis=1, dtype=np.int64)
+    my_cells = int(np.bitwise_count(mine).sum())
+    availability = overlap_cells / my_cells if my_cells else np.zeros(n)
+
+    my_times, my_locations, my_style = (np.uint64(v) for v in pref_features(user_prefs))
+    features = np.fromiter(
+        chain.from_iterable(map(pref_features, candidate_prefs)), dtype=np.uint64, count=3 * n
+    ).reshape(n, 3)
+    times = _jaccard(my_times, features[:, 0])
+    locations = _jaccard(my_locations, features[:, 1])
+    style = ((features[:, 2] == my_style) & (my_style != 0)).astype(np.float64)
+
+    scores = (
+        weights["courses"] * courses
+        + weights["availability"] * availability
+        + weights["times"] * times
+        + weights["location"] * locations
+        + weights["style"] * style
+    )
+    return scores, overlap_cells * MINUTES_PER_CELL
+
+
+def rank_candidates(scores: np.ndarray, shared_courses: Sequence[int], limit: int) -> List[int]:
+    """Indices of the best `limit` candidates by score, then shared courses"""
+    order = np.lexsort((-np.asarray(shared_courses, dtype=np.int64), -scores))
+    return order[:limit].tolist()
@@ -0,0 +1,88 @@
+"""
+Notification Counts - process-local cache of unread notification counts
+Serves the navbar's unread-count poll without touching the database. Every
+write path that changes a user's notifications invalidates that user after
+committing; the TTL bounds staleness from writers in other processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import NOTIFICATION_COUNT_CACHE_SECONDS, NOTIFICATION_COUNT_CACHE_SIZE
+
+
+class UnreadCountCache:
+    """
+    LRU map of user_id -> {type filter: (unread count, cached at)}.
+    A type filter of None means all notification types.
+
+    Readers take a token() before counting in the database and pass it to
+    put(); a count is dropped if the user was invalidated in between, so a
+    slow read can never cache a value older than a committed write.
+    """
+
+    def __init__(self, ttl_seconds: float, max_users: int):
+        self._lock = threading.Lock()
+        self._users: "OrderedDict[int, Dict[Optional[str], Tuple[int, float]]]" = OrderedDict()
+        self._ttl = ttl_seconds
+        self._max_users = max_users
+        self._hits = 0
+        self._misses = 0
+        self._generation = 0
+        # Generation of each user's last invalidation; bounded, with a floor for forgotten users
+        self._invalidated: "OrderedDict[int, int]" = OrderedDict()
+        self._floor = 0
+
+    def token(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, user_id: int, notif_type: Optional[str] = None) -> Optional[int]:
+        with self._lock:
+            entry = self._users.get(user_id, {}).get(notif_type)
+            if entry is None or time.monotonic() - entry[1] > self._ttl:
+                self._misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, user_id: int, notif_type: Optional[str], count: int, token: int):
+        with self._lock:
+            if token < self._floor or self._invalidated.get(user_id, -1) > token:
+                return
+            self._users.setdefault(user_id, {})[notif_type] = (count, time.monotonic())
+            self._users.move_to_end(user_id)
+            while len(self._users) > self._max_users:
+                self._users.popitem(last=False)
+
+    def invalidate(self, *user_ids: int):
+        self.invalidate_many(user_ids)
+
+    def invalidate_many(self, user_ids: Iterable[int]):
+        with self._lock:
+            for user_id in user_ids:
+                self._generation += 1
+                self._users.pop(user_id, None)
+                self._invalidated[user_id] = self._generation
+                self._invalidated.move_to_end(user_id)
+            while len(self._invalidated) > self._max_users:
+                _, generation = self._invalidated.popitem(last=False)
+                self._floor = generation
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "users": len(self._users),
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+unread_counts = UnreadCountCache(NOTIFICATION_COUNT_CACHE_SECONDS, NOTIFICATION_COUNT_CACHE_SIZE)
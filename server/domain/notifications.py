@@ -0,0 +1,24 @@
+"""
+Notifications - change signal for a user's notifications
+Call after committing any insert, read-state change or delete on a user's
+`notifications` rows: drops their cached unread counts and wakes their live
+notification streams, which then read the new rows from the database.
+"""
+from typing import Iterable
+
+from .notification_counts import unread_counts
+from .pubsub import hub, user_topic
+
+# Wake-ups carry no payload; streams re-read from their own id cursor
+WAKE = object()
+
+
+def notifications_changed(*user_ids: int):
+    notifications_changed_many(user_ids)
+
+
+def notifications_changed_many(user_ids: Iterable[int]):
+    user_ids = list(user_ids)
+    unread_counts.invalidate_many(user_ids)
+    for user_id in user_ids:
+        hub.publish(user_topic(user_id), WAKE)
@@ -0,0 +1,267 @@
+"""
+Event Outbox - at-least-once delivery of domain events
+Commands write their events to `event_outbox` in the same transaction as the
+change itself; the relay claims pending rows in batches, runs the event bus
+handlers for each one and marks it relayed. An event is therefore published
+if and only if its command committed, even if the process dies in between.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, text
+
+from config import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_KEEP_HOURS,
+    OUTBOX_LEASE_SECONDS,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_SECONDS,
+)
+from db import engine
+from .event_bus import DomainEvent, EventBus, event_bus
+from .events import deserialize_event, serialize_event
+
+logger = logging.getLogger(__name__)
+
+# Seconds between deletes of relayed rows older than OUTBOX_KEEP_HOURS
+PURGE_INTERVAL_SECONDS = 60
+
+_CLAIM_QUERY = """
+    SELECT id, event_type, payload, attempts
+    FROM event_outbox
+    WHERE processed_at IS NULL
+    AND (claimed_at IS NULL OR claimed_at < :stale)
+    ORDER BY id
+    LIMIT :limit
+"""
+
+
+def record_events(conn, events: Iterable[DomainEvent]):
+    """Append events to the outbox inside the caller's transaction"""
+    rows = [{"type": type(e).__name__, "payload": serialize_event(e)} for e in events]
+    if rows:
+        conn.execute(
+            text("INSERT INTO event_outbox (event_type, payload) VALUES (:type, :payload)"),
+            rows,
+        )
+
+
+def _as_datetime(value) -> datetime:
+    # MySQL returns datetimes; SQLite returns "YYYY-MM-DD HH:MM:SS" strings
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+class OutboxRelay:
+    """
+    Polls `event_outbox` and publishes pending rows through the event bus.
+
+    A batch is claimed in its own short transaction (`FOR UPDATE SKIP LOCKED`
+    on MySQL, so concurrent relays take disjoint rows) by stamping
+    `claimed_at`; handlers then run outside any lock and the rows are marked
+    relayed. A relay that dies mid-batch leaves its claim to expire after
+    `lease_seconds`, when another relay retries it. Delivery is therefore
+    at-least-once: a failing event re-runs every handler for it, up to
+    `max_attempts`, after which it is parked with its `last_error`.
+    """
+
+    def __init__(
+        self,
+        bus: EventBus,
+        batch_size: int = 100,
+        poll_seconds: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 10,
+        keep_hours: float = 24.0,
+    ):
+        self.bus = bus
+        self.batch_size = max(1, batch_size)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.keep_hours = keep_hours
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_purge = 0.0
+        self._batches = 0
+        self._relayed = 0
+        self._failed = 0
+        self._dead = 0
+        self._relay_seconds = 0.0
+        self._last_batch_size = 0
+        self._last_batch_seconds: Optional[float] = None
+
+    def relay_batch(self) -> int:
+        """Claim and publish up to `batch_size` pending events; returns rows claimed"""
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            now = _as_datetime(conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()).replace(microsecond=0)
+            claim = _CLAIM_QUERY + (" FOR UPDATE SKIP LOCKED" if conn.dialect.name == "mysql" else "")
+            rows = conn.execute(
+                text(claim),
+                {"stale": now - timedelta(seconds=self.lease_seconds), "limit": self.batch_size},
+            ).fetchall()
+            if not rows:
+                return 0
+            conn.execute(
+                text(
+                    "UPDATE event_outbox SET claimed_at = :now, attempts = attempts + 1 WHERE id IN :ids"
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"now": now, "ids": [r.id for r in rows]},
+            )
+
+        relayed, retry, dead = [], [], []
+        for row in rows:
+            try:
+                self.bus.handle(deserialize_event(row.event_type, row.payload))
+                relayed.append(row.id)
+            except Exception as e:
+                logger.exception("Outbox event %s (%s) failed", row.id, row.event_type)
+                failure = {"id": row.id, "error": repr(e)[:1000]}
+                (dead if row.attempts + 1 >= self.max_attempts else retry).append(failure)
+
+        with engine.begin() as conn:
+            if relayed:
+                conn.execute(
+                    text(
+                        # Clear errors from earlier attempts: only parked rows keep last_error
+                        "UPDATE event_outbox SET processed_at = CURRENT_TIMESTAMP, last_error = NULL WHERE id IN :ids"
+                    ).bindparams(bindparam("ids", expanding=True)),
+                    {"ids": relayed},
+                )
+            if retry:
+                conn.execute(
+                    text("UPDATE event_outbox SET claimed_at = NULL, last_error = :error WHERE id = :id"),
+                    retry,
+                )
+            if dead:
+                conn.execute(
+                    text(
+                        "UPDATE event_outbox SET processed_at = CURRENT_TIMESTAMP, last_error = :error "
+                        "WHERE id = :id"
+                    ),
+                    dead,
+                )
+        for failure in dead:
+            logger.error("Outbox event %s gave up after %d attempts", failure["id"], self.max_attempts)
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._batches += 1
+            self._relayed += len(relayed)
+            self._failed += len(retry) + len(dead)
+            self._dead += len(dead)
+            self._relay_seconds += elapsed
+            self._last_batch_size = len(rows)
+            self._last_batch_seconds = elapsed
+        return len(rows)
+
+    def purge_relayed(self) -> int:
+        """Delete relayed rows older than `keep_hours`; parked failures are kept"""
+        with engine.begin() as conn:
+            now = _as_datetime(conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()).replace(microsecond=0)
+            ids = conn.execute(
+                text(
+                    """
+                    SELECT id FROM event_outbox
+                    WHERE processed_at < :cutoff AND last_error IS NULL
+                    ORDER BY id
+                    LIMIT :limit
+                    """
+                ),
+                {"cutoff": now - timedelta(hours=self.keep_hours), "limit": self.batch_size * 10},
+            ).scalars().all()
+            if ids:
+                conn.execute(
+                    text("DELETE FROM event_outbox WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                    {"ids": ids},
+                )
+        return len(ids)
+
+    def run(self, once: bool = False):
+        """Relay until stopped (or, with `once`, until the outbox is empty)"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                claimed = self.relay_batch()
+            except Exception:
+                logger.exception("Outbox relay batch failed")
+                claimed = 0
+            if claimed >= self.batch_size:
+                continue
+            if once:
+                return
+            if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.monotonic()
+                try:
+                    self.purge_relayed()
+                except Exception:
+                    logger.exception("Outbox purge failed")
+            self._wake.wait(self.poll_seconds)
+
+    def wake(self):
+        """Skip the rest of the poll interval, e.g. right after a command commits"""
+        self._wake.set()
+
+    def start(self):
+        """Run the relay on a daemon thread in this process"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="outbox-relay", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def backlog(self) -> dict:
+        """Pending rows and the age of the oldest one (outbox lag)"""
+        with engine.connect() as conn:
+            row = conn.execute(
+                text(
+                    """
+                    SELECT COUNT(*) AS pending, MIN(created_at) AS oldest, CURRENT_TIMESTAMP AS now
+                    FROM event_outbox
+                    WHERE processed_at IS NULL
+                    """
+                )
+            ).first()
+        lag = 0.0
+        if row.oldest is not None:
+            lag = max(0.0, (_as_datetime(row.now) - _as_datetime(row.oldest)).total_seconds())
+        return {"pending": row.pending, "lag_seconds": lag}
+
+    def stats(self) -> dict:
+        """Relay throughput counters plus the current backlog"""
+        with self._lock:
+            stats = {
+                "running": bool(self._thread and self._thread.is_alive()),
+                "batches": self._batches,
+                "relayed": self._relayed,
+                "failed": self._failed,
+                "dead": self._dead,
+                "last_batch_size": self._last_batch_size,
+                "last_batch_seconds": self._last_batch_seconds,
+                "events_per_sec": round(self._relayed / self._relay_seconds, 1) if self._relay_seconds else None,
+            }
+        stats.update(self.backlog())
+        return stats
+
+
+outbox_relay = OutboxRelay(
+    event_bus,
+    batch_size=OUTBOX_BATCH_SIZE,
+    poll_seconds=OUTBOX_POLL_SECONDS,
+    lease_seconds=OUTBOX_LEASE_SECONDS,
+    max_attempts=OUTBOX_MAX_ATTEMPTS,
+    keep_hours=OUTBOX_KEEP_HOURS,
+)
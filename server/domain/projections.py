@@ -0,0 +1,252 @@
+"""
+Projections - read tables maintained from domain events
+A projection turns events into rows of its own read tables. Live events are
+applied as they are published; `rebuild` replays `event_log` from the start
+in batches, recording its position in `projection_checkpoints`, so a new read
+model can be built (and an existing one repaired) while the app keeps serving.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import text
+
+from config import PROJECTION_STATUS_SECONDS
+from db import engine
+from .event_bus import DomainEvent, EventBus
+from .event_log import last_event_id, read_events
+
+logger = logging.getLogger(__name__)
+
+BUILDING = "building"
+READY = "ready"
+
+
+class Projection(ABC):
+    """
+    Base class for a read model.
+
+    Subclasses list the event types they `handle`, and implement `affected`
+    (the keys an event touches) and `refresh` (recompute the rows for those
+    keys from the write tables). Refreshing from current state makes applying
+    an event idempotent and order-independent, so replays, retries and
+    concurrent live updates all converge; `prune` removes rows whose keys no
+    longer exist after a full replay.
+    """
+
+    name = ""
+    handles: Tuple[Type[DomainEvent], ...] = ()
+
+    @abstractmethod
+    def affected(self, conn, event: DomainEvent) -> Iterable:
+        ...
+
+    @abstractmethod
+    def refresh(self, conn, keys: Sequence):
+        ...
+
+    def prune(self, conn):
+        pass
+
+    def apply(self, conn, events: Iterable[DomainEvent]) -> int:
+        """Refresh every key the events touch, each once; returns keys refreshed"""
+        keys = set()
+        for event in events:
+            if isinstance(event, self.handles):
+                keys.update(self.affected(conn, event))
+        if keys:
+            self.refresh(conn, sorted(keys))
+        return len(keys)
+
+
+class ProjectionRunner:
+    """
+    Registry of projections plus their checkpoints.
+
+    A projection with no checkpoint row has never been built and is neither
+    updated nor served; while its first rebuild runs it is "building" (updated
+    but not served) and afterwards "ready". Checkpoint statuses are cached for
+    `status_ttl` seconds per process.
+    """
+
+    def __init__(self, status_ttl: float = 5.0):
+        self._projections: Dict[str, Projection] = {}
+        self._lock = threading.Lock()
+        self._status_ttl = status_ttl
+        self._statuses: Dict[str, str] = {}
+        self._statuses_at = 0.0
+
+    def register(self, projection: Projection):
+        self._projections[projection.name] = projection
+
+    def get(self, name: str) -> Projection:
+        if name not in self._projections:
+            raise KeyError(f"Unknown projection '{name}'")
+        return self._projections[name]
+
+    @property
+    def names(self) -> List[str]:
+        return sorted(self._projections)
+
+    def subscribe(self, bus: EventBus):
+        """Apply live events from `bus` to every projection that handles them"""
+        event_types = []
+        for projection in self._projections.values():
+            event_types.extend(t for t in projection.handles if t not in event_types)
+        for event_type in event_types:
+            bus.subscribe(event_type, self.handle, transactional=True)
+
+    def is_ready(self, name: str) -> bool:
+        return self._cached_statuses().get(name) == READY
+
+    def handle(self, event: DomainEvent, uow=None):
+        """
+        Event bus handler: apply a live event to every built projection, on
+        the command's connection when given its unit of work
+        """
+        # Inside a unit of work read statuses on its connection: a second
+        # checkout while the command holds one could starve a small pool
+        statuses = self._cached_statuses(uow.conn if uow is not None else None)
+        live = [
+            p for name, p in self._projections.items()
+            if name in statuses and isinstance(event, p.handles)
+        ]
+        if not live:
+            return
+        if uow is not None:
+            for projection in live:
+                projection.apply(uow.conn, [event])
+            return
+        with engine.begin() as conn:
+            for projection in live:
+                projection.apply(conn, [event])
+
+    def rebuild(self, name: str, batch_size: int = 1000) -> dict:
+        """
+        Replay the whole event log into a projection, one transaction per
+        batch. Existing rows keep being served while an already-ready
+        projection is rebuilt; rows for keys that no longer exist are pruned
+        at the end.
+
+        On a first build every process only starts applying live events once
+        its status cache sees the "building" checkpoint, so the events logged
+        since the replay started are replayed again after that delay.
+        """
+        projection = self.get(name)
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            status = self._status(conn, name) or BUILDING
+            self._set_checkpoint(conn, name, status, 0)
+            start_head = last_event_id(conn)
+        self.invalidate()
+
+        passes = [self._replay(projection, status, 0, batch_size)]
+        if status == BUILDING:
+            time.sleep(self._status_ttl)
+            passes.append(self._replay(projection, status, start_head, batch_size))
+        last_id = max(p[0] for p in passes)
+        events, refreshed, batches = (sum(p[k] for p in passes) for k in (1, 2, 3))
+
+        with engine.begin() as conn:
+            projection.prune(conn)
+            self._set_checkpoint(conn, name, READY, last_id)
+        self.invalidate()
+
+        return {
+            "projection": name,
+            "events": events,
+            "batches": batches,
+            "refreshed": refreshed,
+            "last_event_id": last_id,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def stats(self) -> dict:
+        """Status, replay checkpoint and event log head per projection"""
+        with engine.connect() as conn:
+            head = last_event_id(conn)
+            rows = {
+                row.name: row
+                for row in conn.execute(
+                    text("SELECT name, status, last_event_id, updated_at FROM projection_checkpoints")
+                ).fetchall()
+            }
+        result = {"last_event_id": head, "projections": {}}
+        for name in self.names:
+            row = rows.get(name)
+            result["projections"][name] = {
+                "status": row.status if row else None,
+                "checkpoint": row.last_event_id if row else None,
+                "updated_at": str(row.updated_at) if row else None,
+            }
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._statuses_at = 0.0
+
+    def _cached_statuses(self, conn=None) -> Dict[str, str]:
+        with self._lock:
+            if time.monotonic() - self._statuses_at < self._status_ttl:
+                return self._statuses
+        if conn is not None:
+            statuses = self._read_statuses(conn)
+        else:
+            with engine.connect() as conn:
+                statuses = self._read_statuses(conn)
+        with self._lock:
+            self._statuses = statuses
+            self._statuses_at = time.monotonic()
+        return statuses
+
+    def _replay(self, projection: Projection, status: str, after_id: int, batch_size: int):
+        """Apply logged events after `after_id`; returns (last id, events, keys refreshed, batches)"""
+        last_id, events, refreshed, batches = after_id, 0, 0, 0
+        while True:
+            with engine.begin() as conn:
+                batch = read_events(conn, last_id, batch_size)
+                if not batch:
+                    return last_id, events, refreshed, batches
+                refreshed += projection.apply(conn, [event for _, event in batch])
+                last_id = batch[-1][0]
+                self._set_checkpoint(conn, projection.name, status, last_id)
+            events += len(batch)
+            batches += 1
+            logger.info("projection %s: replayed through event %d", projection.name, last_id)
+
+    @staticmethod
+    def _read_statuses(conn) -> Dict[str, str]:
+        return dict(conn.execute(text("SELECT name, status FROM projection_checkpoints")).fetchall())
+
+    @staticmethod
+    def _status(conn, name: str) -> Optional[str]:
+        return conn.execute(
+            text("SELECT status FROM projection_checkpoints WHERE name = :name"), {"name": name}
+        ).scalar()
+
+    @staticmethod
+    def _set_checkpoint(conn, name: str, status: str, event_id: int):
+        params = {"name": name, "status": status, "last": event_id}
+        updated = conn.execute(
+            text(
+                """
+                UPDATE projection_checkpoints
+                SET status = :status, last_event_id = :last, updated_at = CURRENT_TIMESTAMP
+                WHERE name = :name
+                """
+            ),
+            params,
+        ).rowcount
+        if not updated:
+            conn.execute(
+                text(
+                    "INSERT INTO projection_checkpoints (name, status, last_event_id) "
+                    "VALUES (:name, :status, :last)"
+                ),
+                params,
+            )
+
+
+projections = ProjectionRunner(status_ttl=PROJECTION_STATUS_SECONDS)
@@ -0,0 +1,149 @@
+"""
+PubSub Hub - in-process fan-out to live subscribers (SSE streams)
+Each subscriber gets its own bounded queue. Publishing never blocks: a
+subscriber whose queue is full is evicted and its stream ends, so the client
+reconnects and resumes from the database instead of slowing everyone else.
+Wake-up style subscribers (drop_when_full) simply skip items while they
+already have some pending.
+"""
+import json
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Set
+
+from werkzeug.http import http_date
+
+from config import SSE_QUEUE_SIZE
+
+
+class SubscriptionClosed(Exception):
+    pass
+
+
+class Subscription:
+    def __init__(self, hub: "PubSubHub", topic: Hashable, maxsize: int, drop_when_full: bool = False):
+        self.topic = topic
+        self.drop_when_full = drop_when_full
+        self._hub = hub
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self.closed = False
+        self.evicted = False
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Next published item, or None if nothing arrived within `timeout`.
+        Raises SubscriptionClosed once the subscription is closed or evicted.
+        """
+        if self.closed:
+            raise SubscriptionClosed(self.topic)
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            if self.closed:
+                raise SubscriptionClosed(self.topic)
+            return None
+
+    def close(self):
+        self._hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PubSubHub:
+    def __init__(self, queue_size: int = 100):
+        self._lock = threading.Lock()
+        self._topics: Dict[Hashable, Set[Subscription]] = {}
+        self._queue_size = queue_size
+        self._published = 0
+        self._delivered = 0
+        self._evicted = 0
+
+    def subscribe(self, topic: Hashable, maxsize: Optional[int] = None, drop_when_full: bool = False) -> Subscription:
+        sub = Subscription(self, topic, maxsize or self._queue_size, drop_when_full)
+        with self._lock:
+            self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._discard(sub)
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        return bool(self._topics.get(topic))
+
+    def publish(self, topic: Hashable, item: Any) -> int:
+        """Offer `item` to every subscriber of `topic`; returns how many received it"""
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+            self._published += 1
+
+        delivered = 0
+        for sub in subscribers:
+            try:
+                sub._queue.put_nowait(item)
+                delivered += 1
+            except queue.Full:
+                if sub.drop_when_full:
+                    continue
+                with self._lock:
+                    if not sub.closed:
+                        sub.evicted = True
+                        self._evicted += 1
+                    self._discard(sub)
+
+        with self._lock:
+            self._delivered += delivered
+        return delivered
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscribers": sum(len(s) for s in self._topics.values()),
+                "queue_size": self._queue_size,
+                "published": self._published,
+                "delivered": self._delivered,
+                "evicted": self._evicted,
+            }
+
+    def _discard(self, sub: Subscription):
+        sub.closed = True
+        subs = self._topics.get(sub.topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._topics[sub.topic]
+
+
+def _json_default(value):
+    # Same datetime rendering as flask.jsonify so streamed rows match REST responses
+    if isinstance(value, datetime):
+        return http_date(value)
+    return str(value)
+
+
+def sse_frame(data: Any, event_id: Optional[Any] = None, event: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events frame"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=_json_default)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def group_topic(group_id: int) -> tuple:
+    return ("group", int(group_id))
+
+
+def user_topic(user_id: int) -> tuple:
+    return ("user", int(user_id))
+
+
+hub = PubSubHub(queue_size=SSE_QUEUE_SIZE)
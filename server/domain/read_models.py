@@ -0,0 +1,135 @@
+"""
+Read Models - denormalised group listings for the query side
+`user_group_list` holds one row per active membership and `course_group_list`
+one row per open group, each with the group, course and owner columns the
+list endpoints return, so those endpoints read a single table by index
+instead of joining four.
+"""
+from typing import Iterable, Sequence, Set
+
+from sqlalchemy import bindparam, text
+
+from .event_bus import DomainEvent
+from .events import (
+    GroupArchived,
+    GroupCreated,
+    GroupDeleted,
+    GroupJoined,
+    GroupLeft,
+    GroupOwnershipTransferred,
+    GroupUpdated,
+    UserDeleted,
+    UserUpdated,
+)
+from .projections import Projection, ProjectionRunner
+
+# Events that change which groups are listed or what a listing row shows
+GROUP_LISTING_EVENTS = (
+    GroupCreated,
+    GroupJoined,
+    GroupUpdated,
+    GroupOwnershipTransferred,
+    GroupLeft,
+    GroupArchived,
+    GroupDeleted,
+    UserUpdated,
+    UserDeleted,
+)
+
+
+def affected_groups(conn, event: DomainEvent) -> Set[int]:
+    """Group ids whose listing rows may change because of `event`"""
+    if isinstance(event, UserDeleted):
+        return set(event.group_ids)
+    if isinstance(event, UserUpdated):
+        # Owner names are copied into the listings
+        return set(
+            conn.execute(
+                text("SELECT id FROM `groups` WHERE owner_user_id = :uid"), {"uid": event.user_id}
+            ).scalars().all()
+        )
+    group_id = getattr(event, "group_id", None)
+    return {group_id} if group_id is not None else set()
+
+
+def _in_groups(query: str):
+    return text(query).bindparams(bindparam("ids", expanding=True))
+
+
+class UserGroupList(Projection):
+    name = "user_group_list"
+    handles = GROUP_LISTING_EVENTS
+
+    def affected(self, conn, event: DomainEvent) -> Iterable[int]:
+        return affected_groups(conn, event)
+
+    def refresh(self, conn, keys: Sequence[int]):
+        conn.execute(_in_groups("DELETE FROM user_group_list WHERE group_id IN :ids"), {"ids": list(keys)})
+        conn.execute(
+            _in_groups(
+                """
+                INSERT INTO user_group_list
+                (user_id, group_id, role, joined_at, name, description, meeting_time, location,
+                 max_members, tags, course_code, course_name, owner_name, member_count)
+                SELECT gm.user_id, g.id, gm.role, gm.joined_at, g.name, g.description, g.meeting_time,
+                       g.location, g.max_members, g.tags, c.code, c.name, u.name, g.active_member_count
+                FROM group_members gm
+                JOIN `groups` g ON gm.group_id = g.id
+                JOIN courses c ON g.course_id = c.id
+                JOIN users u ON g.owner_user_id = u.id
+                WHERE gm.group_id IN :ids AND gm.status = 'active' AND g.is_archived = 0
+                """
+            ),
+            {"ids": list(keys)},
+        )
+
+    def prune(self, conn):
+        conn.execute(
+            text(
+                """
+                DELETE FROM user_group_list
+                WHERE group_id NOT IN (SELECT id FROM `groups` WHERE is_archived = 0)
+                """
+            )
+        )
+
+
+class CourseGroupList(Projection):
+    name = "course_group_list"
+    handles = GROUP_LISTING_EVENTS
+
+    def affected(self, conn, event: DomainEvent) -> Iterable[int]:
+        return affected_groups(conn, event)
+
+    def refresh(self, conn, keys: Sequence[int]):
+        conn.execute(_in_groups("DELETE FROM course_group_list WHERE group_id IN :ids"), {"ids": list(keys)})
+        conn.execute(
+            _in_groups(
+                """
+                INSERT INTO course_group_list
+                (course_id, group_id, name, description, meeting_time, location, max_members,
+                 created_at, owner_name, member_count)
+                SELECT g.course_id, g.id, g.name, g.description, g.meeting_time, g.location,
+                       g.max_members, g.created_at, u.name, g.active_member_count
+                FROM `groups` g
+                JOIN users u ON g.owner_user_id = u.id
+                WHERE g.id IN :ids AND g.is_archived = 0
+                """
+            ),
+            {"ids": list(keys)},
+        )
+
+    def prune(self, conn):
+        conn.execute(
+            text(
+                """
+                DELETE FROM course_group_list
+                WHERE group_id NOT IN (SELECT id FROM `groups` WHERE is_archived = 0)
+                """
+            )
+        )
+
+
+def register_projections(runner: ProjectionRunner):
+    runner.register(UserGroupList())
+    runner.register(CourseGroupList())
@@ -0,0 +1,60 @@
+"""
+Read State - per-user, per-group chat read cursors
+`group_read_state.last_read_message_id` replaces one notification row per
+member per message: unread counts are derived from the messages index as
+"messages in the group with a higher id than the cursor".
+"""
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+
+def mark_read(conn, user_id: int, group_id: int, message_id: Optional[int] = None) -> Optional[int]:
+    """
+    Move a user's read cursor forward to `message_id` (default: the group's
+    latest message) inside the caller's transaction. Cursors never move
+    backwards. Returns the resulting cursor, or None if the group has no
+    messages yet.
+    """
+    if message_id is None:
+        message_id = conn.execute(
+            text("SELECT MAX(id) FROM messages WHERE group_id = :gid"),
+            {"gid": group_id},
+        ).scalar()
+        if message_id is None:
+            return None
+
+    params = {"uid": user_id, "gid": group_id, "mid": message_id}
+    advance = text(
+        """
+        UPDATE group_read_state
+        SET last_read_message_id = :mid
+        WHERE user_id = :uid AND group_id = :gid AND last_read_message_id < :mid
+        """
+    )
+    if conn.execute(advance, params).rowcount == 0:
+        exists = conn.execute(
+            text("SELECT 1 FROM group_read_state WHERE user_id = :uid AND group_id = :gid"),
+            params,
+        ).first()
+        if not exists:
+            try:
+                with conn.begin_nested():
+                    conn.execute(
+                        text(
+                            """
+                            INSERT INTO group_read_state (user_id, group_id, last_read_message_id)
+                            VALUES (:uid, :gid, :mid)
+                            """
+                        ),
+                        params,
+                    )
+            except IntegrityError:
+                # A concurrent request created the row first; advance it instead
+                conn.execute(advance, params)
+
+    return conn.execute(
+        text("SELECT last_read_message_id FROM group_read_state WHERE user_id = :uid AND group_id = :gid"),
+        params,
+    ).scalar()
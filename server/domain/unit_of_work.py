@@ -0,0 +1,56 @@
+"""
+Unit of Work - one command transaction plus the domain events it raises
+Events added during the transaction are appended to `event_log` with it and
+published only once it commits: straight to the event bus, or with
+OUTBOX_ENABLED through `event_outbox` rows written in the same transaction
+and delivered by the outbox relay. With HANDLERS_IN_TRANSACTION the
+database-writing handlers run on `uow.conn` before the commit instead.
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+
+from config import OUTBOX_ENABLED
+from db import engine
+from .event_bus import DomainEvent, event_bus
+from .event_log import append_events
+from .outbox import outbox_relay, record_events
+
+
+class UnitOfWork:
+    def __init__(self, conn):
+        self.conn = conn
+        self.events: List[DomainEvent] = []
+        self._after_commit: List[Callable[[], None]] = []
+
+    def add_event(self, event: DomainEvent):
+        self.events.append(event)
+
+    def after_commit(self, fn: Callable, *args):
+        """Run `fn(*args)` once the transaction has committed (cache invalidation, stream wake-ups)"""
+        self._after_commit.append(lambda: fn(*args))
+
+
+@contextmanager
+def unit_of_work() -> Iterator[UnitOfWork]:
+    """
+    `with unit_of_work() as uow:` begins a transaction on `uow.conn`. Leaving
+    the block normally (including by `return`) commits and then publishes
+    `uow.events`; an exception rolls back and discards them.
+    """
+    with engine.begin() as conn:
+        uow = UnitOfWork(conn)
+        yield uow
+        for event in uow.events:
+            event_bus.run_in_transaction(event, uow)
+        append_events(conn, uow.events)
+        if OUTBOX_ENABLED:
+            record_events(conn, uow.events)
+
+    for callback in uow._after_commit:
+        callback()
+    if OUTBOX_ENABLED:
+        if uow.events:
+            outbox_relay.wake()
+        return
+    for event in uow.events:
+        event_bus.publish(event)
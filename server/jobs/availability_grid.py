@@ -0,0 +1,20 @@
+"""
+Availability Grid Job - backfill `availability_grid` from `availability_text`
+"""
+from sqlalchemy import text
+
+from db import engine
+from domain.availability import sync_availability_grid
+
+
+def rebuild_availability_grids() -> dict:
+    """Re-parse every user's slots; returns counts of users and unparsed slots"""
+    with engine.connect() as conn:
+        user_ids = conn.execute(text("SELECT id FROM users ORDER BY id")).scalars().all()
+
+    unparsed = 0
+    for user_id in user_ids:
+        with engine.begin() as conn:
+            unparsed += len(sync_availability_grid(conn, user_id))
+
+    return {"users": len(user_ids), "unparsed_slots": unparsed}
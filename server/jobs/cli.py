@@ -0,0 +1,106 @@
+"""
+Job CLI - `flask <command>` entry points for batch jobs
+"""
+import click
+
+
+def register_cli(app):
+    @app.cli.command("precompute-matches")
+    @click.option("--top-k", default=50, show_default=True, help="Matches kept per user.")
+    @click.option("--block-size", default=2000, show_default=True, help="Users per sparse product block.")
+    def precompute_matches_command(top_k, block_size):
+        """Rebuild the user_matches read table from enrollments"""
+        from jobs.precompute_matches import precompute_matches
+
+        stats = precompute_matches(top_k=top_k, block_size=block_size)
+        click.echo(
+            f"user_matches: {stats['rows_written']} rows for {stats['users']} users "
+            f"in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec, {stats['blocks']} blocks)"
+        )
+
+    @app.cli.command("rebuild-availability-grid")
+    def rebuild_availability_grid_command():
+        """Re-parse all availability slots into availability_grid"""
+        from jobs.availability_grid import rebuild_availability_grids
+
+        stats = rebuild_availability_grids()
+        click.echo(f"availability_grid: {stats['users']} users, {stats['unparsed_slots']} unparsed slots")
+
+    @app.cli.command("reconcile-member-counts")
+    def reconcile_member_counts_command():
+        """Recount groups.active_member_count from group_members"""
+        from jobs.reconcile_member_counts import reconcile_member_counts
+
+        stats = reconcile_member_counts()
+        click.echo(f"active_member_count: {stats['corrected']} of {stats['groups']} groups corrected")
+
+    @app.cli.command("purge-notifications")
+    @click.option("--dry-run", is_flag=True, help="Report what would be deleted without deleting.")
+    @click.option("--retention", default=None, help="Override NOTIFICATION_RETENTION, e.g. '*:read=30,*:unread=180'.")
+    @click.option("--chunk-size", default=None, type=int, help="Rows per delete transaction.")
+    @click.option("--sleep-ms", default=None, type=float, help="Pause between chunks.")
+    def purge_notifications_command(dry_run, retention, chunk_size, sleep_ms):
+        """Delete notifications older than their retention TTL"""
+        from config import NOTIFICATION_PURGE_CHUNK_SIZE, NOTIFICATION_PURGE_SLEEP_MS
+        from jobs.purge_notifications import parse_retention, purge_notifications
+
+        stats = purge_notifications(
+            rules=parse_retention(retention) if retention is not None else None,
+            dry_run=dry_run,
+            chunk_size=chunk_size or NOTIFICATION_PURGE_CHUNK_SIZE,
+            sleep_ms=NOTIFICATION_PURGE_SLEEP_MS if sleep_ms is None else sleep_ms,
+        )
+        verb = "would purge" if dry_run else "purged"
+        click.echo(
+            f"notifications: {verb} {stats['purged']} of {stats['scanned']} scanned rows "
+            f"in {stats['chunks']} chunks, {stats['seconds']}s"
+        )
+        for rule, count in sorted(stats["by_rule"].items()):
+            click.echo(f"  {rule} (keep {stats['rules'][rule]:g} days): {count}")
+
+    @app.cli.command("relay-outbox")
+    @click.option("--once", is_flag=True, help="Relay until the outbox is empty, then exit.")
+    @click.option("--batch-size", default=None, type=int, help="Rows claimed per batch.")
+    def relay_outbox_command(once, batch_size):
+        """Publish pending event_outbox rows through the event bus"""
+        from domain.outbox import outbox_relay
+
+        if batch_size:
+            outbox_relay.batch_size = batch_size
+        try:
+            outbox_relay.run(once=once)
+        except KeyboardInterrupt:
+            pass
+        stats = outbox_relay.stats()
+        click.echo(
+            f"event_outbox: {stats['relayed']} relayed, {stats['failed']} failed "
+            f"in {stats['batches']} batches; {stats['pending']} pending"
+        )
+
+    @app.cli.command("seed-event-log")
+    @click.option("--chunk-size", default=1000, show_default=True, help="Groups per transaction.")
+    def seed_event_log_command(chunk_size):
+        """Log a GroupUpdated event for every open group (run once before the first rebuild)"""
+        from jobs.seed_event_log import seed_event_log
+
+        stats = seed_event_log(chunk_size=chunk_size)
+        click.echo(f"event_log: {stats['events']} events appended")
+
+    @app.cli.command("rebuild-projection")
+    @click.argument("name")
+    @click.option("--batch-size", default=1000, show_default=True, help="Events replayed per transaction.")
+    def rebuild_projection_command(name, batch_size):
+        """Replay event_log into a projection (NAME, or 'all')"""
+        from domain.projections import projections
+
+        names = projections.names if name == "all" else [name]
+        for projection_name in names:
+            try:
+                stats = projections.rebuild(projection_name, batch_size=batch_size)
+            except KeyError as e:
+                raise click.BadParameter(f"{e.args[0]}; choose from {', '.join(projections.names)} or 'all'")
+            click.echo(
+                f"{projection_name}: {stats['events']} events in {stats['batches']} batches, "
+                f"{stats['refreshed']} keys refreshed, through event {stats['last_event_id']} "
+                f"in {stats['seconds']}s"
+            )
@@ -0,0 +1,164 @@
+"""
+Precompute Matches Job - nightly all-pairs classmate matching
+Loads `enrollments` into a sparse user x course matrix, computes shared-course
+counts block by block as a sparse matrix product, and writes the top-K matches
+per user into `user_matches_staging`, which is then swapped with the
+`user_matches` read table so readers never see a partial rebuild.
+"""
+import logging
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import text
+
+from db import engine
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK_SIZE = 5000
+
+
+def load_enrollment_matrix(conn):
+    """Return (user_ids, course_codes, csr) where csr[i, j] = 1 if user_ids[i] takes course j"""
+    rows = conn.execute(text("SELECT user_id, course_id FROM enrollments")).fetchall()
+    codes = dict(conn.execute(text("SELECT id, code FROM courses")).fetchall())
+
+    if not rows:
+        return np.array([], dtype=np.int64), np.array([], dtype=object), sp.csr_matrix((0, 0), dtype=np.int32)
+
+    user_col = np.fromiter((r.user_id for r in rows), dtype=np.int64, count=len(rows))
+    course_col = np.array([r.course_id for r in rows], dtype=object)
+
+    user_ids, user_idx = np.unique(user_col, return_inverse=True)
+    course_ids, course_idx = np.unique(course_col, return_inverse=True)
+    course_codes = np.array([codes.get(cid, cid) for cid in course_ids], dtype=object)
+
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (user_idx, course_idx)),
+        shape=(len(user_ids), len(course_ids)),
+    )
+    # Duplicate (user, course) rows would otherwise be summed into 2s
+    matrix.data[:] = 1
+    return user_ids, course_codes, matrix
+
+
+def load_name_order(conn, user_ids):
+    """Position of each of `user_ids` when sorted by name (then id), the live paths' tie-break"""
+    names = dict(conn.execute(text("SELECT id, name FROM users")).fetchall())
+    by_name = sorted(range(len(user_ids)), key=lambda i: (names.get(int(user_ids[i]), ""), int(user_ids[i])))
+    order = np.empty(len(user_ids), dtype=np.int64)
+    order[by_name] = np.arange(len(user_ids))
+    return order
+
+
+def top_k_block(matrix, matrix_t, start: int, stop: int, top_k: int, tie_order=None):
+    """
+    Top-K matches for users [start, stop).
+
+    Returns parallel arrays (row, col, shared, rank) of matrix row indices,
+    ranked best-first within each row; ties are broken by `tie_order[col]`
+    (see `load_name_order`), or by user id without it.
+    """
+    product = (matrix[start:stop] @ matrix_t).tocsr()
+    rows = np.repeat(np.arange(start, stop), np.diff(product.indptr))
+    cols = product.indices
+    shared = product.data
+
+    not_self = cols != rows
+    rows, cols, shared = rows[not_self], cols[not_self], shared[not_self]
+
+    order = np.lexsort((cols if tie_order is None else tie_order[cols], -shared, rows))
+    rows, cols, shared = rows[order], cols[order], shared[order]
+
+    # Position of every entry within its row, used to keep the first K per row
+    row_starts = np.searchsorted(rows, np.arange(start, stop))
+    rank = np.arange(len(rows)) - row_starts[rows - start]
+    keep = rank < top_k
+    return rows[keep], cols[keep], shared[keep], rank[keep]
+
+
+def swap_staging(conn):
+    """Exchange `user_matches_staging` and `user_matches` in one step"""
+    if conn.dialect.name == "mysql":
+        # Atomic: readers see either the old or the new table, never neither
+        conn.execute(
+            text(
+                "RENAME TABLE user_matches TO user_matches_old, "
+                "user_matches_staging TO user_matches, "
+                "user_matches_old TO user_matches_staging"
+            )
+        )
+        return
+    # SQLite: DDL is transactional, so the caller's transaction makes this atomic
+    conn.execute(text("ALTER TABLE user_matches RENAME TO user_matches_old"))
+    conn.execute(text("ALTER TABLE user_matches_staging RENAME TO user_matches"))
+    conn.execute(text("ALTER TABLE user_matches_old RENAME TO user_matches_staging"))
+
+
+def precompute_matches(top_k: int = 50, block_size: int = 2000) -> dict:
+    """Rebuild `user_matches` and return throughput stats"""
+    started = time.perf_counter()
+
+    with engine.connect() as conn:
+        user_ids, course_codes, matrix = load_enrollment_matrix(conn)
+        tie_order = load_name_order(conn, user_ids)
+
+    matrix_t = matrix.T.tocsr()
+    n_users = len(user_ids)
+    rows_written = 0
+    blocks = 0
+
+    # Leftovers of an interrupted run
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM user_matches_staging"))
+
+    for start in range(0, n_users, block_size):
+        stop = min(start + block_size, n_users)
+        rows, cols, shared, rank = top_k_block(matrix, matrix_t, start, stop, top_k, tie_order)
+
+        # Shared course columns per kept pair via an element-wise product of the two rows
+        overlap = matrix[rows].multiply(matrix[cols]).tocsr()
+        records = [
+            {
+                "uid": int(user_ids[r]),
+                "rank": int(k) + 1,
+                "mid": int(user_ids[c]),
+                "shared": int(s),
+                "codes": ", ".join(sorted(course_codes[overlap.indices[overlap.indptr[i]:overlap.indptr[i + 1]]])),
+            }
+            for i, (r, c, s, k) in enumerate(zip(rows, cols, shared, rank))
+        ]
+
+        with engine.begin() as conn:
+            for i in range(0, len(records), INSERT_CHUNK_SIZE):
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO user_matches_staging
+                        (user_id, match_rank, match_user_id, shared_courses, shared_course_codes)
+                        VALUES (:uid, :rank, :mid, :shared, :codes)
+                        """
+                    ),
+                    records[i:i + INSERT_CHUNK_SIZE],
+                )
+
+        rows_written += len(records)
+        blocks += 1
+        logger.info("user_matches block %d: users %d-%d, %d rows", blocks, start, stop, len(records))
+
+    with engine.begin() as conn:
+        swap_staging(conn)
+    # The previous generation is now the staging table
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM user_matches_staging"))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": n_users,
+        "courses": matrix.shape[1],
+        "blocks": blocks,
+        "rows_written": rows_written,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows_written / elapsed, 1) if elapsed > 0 else None,
+    }
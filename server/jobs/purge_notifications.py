@@ -0,0 +1,141 @@
+"""
+Purge Notifications Job - delete notifications past their retention TTL
+Walks `notifications` in primary-key order, one small window per
+transaction, and deletes rows whose age exceeds the TTL for their type and
+read state. Sleeping between chunks keeps lock time and replication lag low.
+
+The job runs in its own process (cron), so it cannot clear the web workers'
+unread-count caches; counts that drop because unread rows expired catch up
+within NOTIFICATION_COUNT_CACHE_SECONDS. Its metrics (rows purged, chunks,
+duration) go to the job's output and a log line, not to /api/metrics.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+
+from config import NOTIFICATION_PURGE_CHUNK_SIZE, NOTIFICATION_PURGE_SLEEP_MS, NOTIFICATION_RETENTION
+from db import engine
+
+logger = logging.getLogger(__name__)
+
+READ_STATES = ("read", "unread", "*")
+
+RetentionRules = Dict[Tuple[str, str], float]  # (type or "*", read state) -> days
+
+
+def parse_retention(raw: Optional[str]) -> RetentionRules:
+    """
+    Parse "group_invitation:unread=14,*:read=30,*:unread=180" into rules.
+    Keys are `<type or *>:<read|unread|*>`; values are days to keep.
+    """
+    rules: RetentionRules = {}
+    for part in (raw or "").split(","):
+        if not part.strip():
+            continue
+        key, _, days = part.partition("=")
+        notif_type, _, state = key.strip().partition(":")
+        state = state or "*"
+        if not notif_type or state not in READ_STATES:
+            raise ValueError(f"Bad retention rule '{part.strip()}'")
+        rules[(notif_type, state)] = float(days)
+    return rules
+
+
+def ttl_for(rules: RetentionRules, notif_type: str, is_read: bool) -> Optional[Tuple[Tuple[str, str], float]]:
+    """Most specific matching rule: exact type beats *, exact read state beats *"""
+    state = "read" if is_read else "unread"
+    for key in ((notif_type, state), (notif_type, "*"), ("*", state), ("*", "*")):
+        if key in rules:
+            return key, rules[key]
+    return None
+
+
+def _as_datetime(value) -> datetime:
+    # MySQL returns datetimes; SQLite returns "YYYY-MM-DD HH:MM:SS" strings
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+def purge_notifications(
+    rules: Optional[RetentionRules] = None,
+    dry_run: bool = False,
+    chunk_size: int = NOTIFICATION_PURGE_CHUNK_SIZE,
+    sleep_ms: float = NOTIFICATION_PURGE_SLEEP_MS,
+) -> dict:
+    """Delete (or with dry_run, count) expired notifications; returns per-rule stats"""
+    rules = parse_retention(NOTIFICATION_RETENTION) if rules is None else rules
+    started = time.perf_counter()
+    stats = {
+        "dry_run": dry_run,
+        "rules": {f"{t}:{s}": days for (t, s), days in rules.items()},
+        "scanned": 0,
+        "purged": 0,
+        "chunks": 0,
+        "by_rule": {},
+    }
+    if not rules:
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        return stats
+
+    with engine.connect() as conn:
+        now = _as_datetime(conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar())
+    cutoffs = {key: now - timedelta(days=days) for key, days in rules.items()}
+    # Ids grow with created_at, so once a window is newer than every cutoff nothing later can expire
+    newest_cutoff = max(cutoffs.values())
+
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    """
+                    SELECT id, type, is_read, created_at
+                    FROM notifications
+                    WHERE id > :last
+                    ORDER BY id
+                    LIMIT :limit
+                    """
+                ),
+                {"last": last_id, "limit": chunk_size},
+            ).fetchall()
+            if not rows:
+                break
+
+            expired: List[int] = []
+            oldest = None
+            for row in rows:
+                created = _as_datetime(row.created_at)
+                oldest = created if oldest is None else min(oldest, created)
+                match = ttl_for(rules, row.type, bool(row.is_read))
+                if match and created < cutoffs[match[0]]:
+                    expired.append(row.id)
+                    label = f"{match[0][0]}:{match[0][1]}"
+                    stats["by_rule"][label] = stats["by_rule"].get(label, 0) + 1
+
+            if expired and not dry_run:
+                conn.execute(
+                    text("DELETE FROM notifications WHERE id IN :ids").bindparams(
+                        bindparam("ids", expanding=True)
+                    ),
+                    {"ids": expired},
+                )
+
+        stats["scanned"] += len(rows)
+        stats["purged"] += len(expired)
+        stats["chunks"] += 1
+        last_id = rows[-1].id
+
+        if len(rows) < chunk_size or oldest >= newest_cutoff:
+            break
+        if sleep_ms:
+            time.sleep(sleep_ms / 1000)
+
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        "notification purge%s: %d of %d scanned rows in %d chunks, %.3fs, by rule %s",
+        " (dry run)" if dry_run else "", stats["purged"], stats["scanned"], stats["chunks"],
+        stats["seconds"], stats["by_rule"],
+    )
+    return stats
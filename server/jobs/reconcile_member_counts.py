@@ -0,0 +1,36 @@
+"""
+Reconcile Member Counts Job - repair drift in `groups.active_member_count`
+The counter is maintained by the group commands; this recounts active
+`group_members` rows and fixes any group whose stored value disagrees,
+raising `GroupUpdated` for each so projections copying the count follow.
+"""
+from sqlalchemy import bindparam, text
+
+from domain.events import GroupUpdated
+from domain.unit_of_work import unit_of_work
+
+_ACTIVE_COUNT = """
+    SELECT COUNT(*) FROM group_members gm
+    WHERE gm.group_id = `groups`.id AND gm.status = 'active'
+"""
+
+
+def reconcile_member_counts() -> dict:
+    """Recount active members for every group; returns how many groups were corrected"""
+    with unit_of_work() as uow:
+        conn = uow.conn
+        total = conn.execute(text("SELECT COUNT(*) FROM `groups`")).scalar()
+        drifted = conn.execute(
+            text(f"SELECT id FROM `groups` WHERE active_member_count <> ({_ACTIVE_COUNT})")
+        ).scalars().all()
+        if drifted:
+            conn.execute(
+                text(
+                    f"UPDATE `groups` SET active_member_count = ({_ACTIVE_COUNT}) WHERE id IN :ids"
+                ).bindparams(bindparam("ids", expanding=True)),
+                {"ids": list(drifted)},
+            )
+        for group_id in drifted:
+            uow.add_event(GroupUpdated(group_id=group_id))
+
+    return {"groups": total, "corrected": len(drifted)}
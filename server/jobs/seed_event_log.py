@@ -0,0 +1,42 @@
+"""
+Seed Event Log Job - give pre-existing groups a place in `event_log`
+Groups created before the event log existed have no events, so a replay
+would never project them. This appends one GroupUpdated event per open group
+(in id order, one transaction per chunk) to be run once after upgrading.
+"""
+import logging
+
+from sqlalchemy import text
+
+from db import engine
+from domain.event_log import append_events
+from domain.events import GroupUpdated
+
+logger = logging.getLogger(__name__)
+
+
+def seed_event_log(chunk_size: int = 1000) -> dict:
+    """Append GroupUpdated for every open group; returns events written"""
+    last_id = 0
+    written = 0
+    while True:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                text(
+                    """
+                    SELECT id FROM `groups`
+                    WHERE id > :last AND is_archived = 0
+                    ORDER BY id
+                    LIMIT :limit
+                    """
+                ),
+                {"last": last_id, "limit": chunk_size},
+            ).scalars().all()
+            if not ids:
+                break
+            append_events(conn, [GroupUpdated(group_id=gid) for gid in ids])
+        written += len(ids)
+        last_id = ids[-1]
+
+    logger.info("event_log seeded with %d GroupUpdated events", written)
+    return {"events": written}
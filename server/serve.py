@@ -0,0 +1,30 @@
+"""
+Production-style server for streaming endpoints
+Runs the app under gevent's WSGI server so each open SSE connection
+(group chat, notifications) is a greenlet rather than an OS thread; idle
+streams cost a few KB each and thousands fit in one process.
+
+    cd server && python serve.py            # HOST/PORT from the environment
+"""
+from gevent import monkey
+
+# Patch before anything imports socket/threading/queue (PyMySQL, the pub/sub hub)
+monkey.patch_all()
+
+import os  # noqa: E402
+
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+from app import create_app  # noqa: E402
+
+
+def main():
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "5000"))
+    server = WSGIServer((host, port), create_app())
+    print(f"Serving on http://{host}:{port} (gevent)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
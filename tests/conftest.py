@@ -1,10 +1,17 @@
 import os
+import sys
 import importlib
 import pkgutil
 import sqlalchemy
 from sqlalchemy import text, create_engine
 import pytest
 
+# make the server packages (`domain`, `jobs`, `db_pool`, ...) importable from
+# test modules at collection time
+SERVER_DIR = os.path.join(os.getcwd(), "server")
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
 
 def _create_sqlite_tables(engine):
     # create minimal schema compatible with SQLite for tests
@@ -52,6 +59,21 @@ def _create_sqlite_tables(engine):
         );
         """,
         """
+        CREATE TABLE availability_grid (
+            user_id INTEGER PRIMARY KEY,
+            week_bits BLOB NOT NULL,
+            unparsed_slots TEXT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE availability_buckets (
+            bucket INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (bucket, user_id)
+        );
+        """,
+        """
         CREATE TABLE `groups` (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             owner_user_id INTEGER NOT NULL,
@@ -63,6 +85,7 @@ def _create_sqlite_tables(engine):
             max_members INTEGER NULL,
             tags TEXT NULL,
             is_archived INTEGER NOT NULL DEFAULT 0,
+            active_member_count INTEGER NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """,
@@ -77,6 +100,15 @@ def _create_sqlite_tables(engine):
         );
         """,
         """
+        CREATE TABLE group_read_state (
+            user_id INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            last_read_message_id INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, group_id)
+        );
+        """,
+        """
         CREATE TABLE messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             group_id INTEGER NOT NULL,
@@ -93,9 +125,94 @@ def _create_sqlite_tables(engine):
             type TEXT NOT NULL,
             data TEXT NULL,
             is_read INTEGER NOT NULL DEFAULT 0,
+            ref_type TEXT NULL,
+            ref_id INTEGER NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """,
+        """
+        CREATE TABLE event_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            claimed_at TIMESTAMP NULL,
+            processed_at TIMESTAMP NULL,
+            last_error TEXT NULL
+        );
+        """,
+        """
+        CREATE TABLE event_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE projection_checkpoints (
+            name TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            last_event_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """,
+        """
+        CREATE TABLE user_group_list (
+            user_id INTEGER NOT NULL,
+            group_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            joined_at TIMESTAMP NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NULL,
+            meeting_time TEXT NULL,
+            location TEXT NULL,
+            max_members INTEGER NULL,
+            tags TEXT NULL,
+            course_code TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            owner_name TEXT NOT NULL,
+            member_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, group_id)
+        );
+        """,
+        """
+        CREATE TABLE course_group_list (
+            group_id INTEGER PRIMARY KEY,
+            course_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT NULL,
+            meeting_time TEXT NULL,
+            location TEXT NULL,
+            max_members INTEGER NULL,
+            created_at TIMESTAMP NOT NULL,
+            owner_name TEXT NOT NULL,
+            member_count INTEGER NOT NULL
+        );
+        """,
+        """
+        CREATE TABLE user_matches (
+            user_id INTEGER NOT NULL,
+            match_rank INTEGER NOT NULL,
+            match_user_id INTEGER NOT NULL,
+            shared_courses INTEGER NOT NULL,
+            shared_course_codes TEXT NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, match_rank)
+        );
+        """,
+        """
+        CREATE TABLE user_matches_staging (
+            user_id INTEGER NOT NULL,
+            match_rank INTEGER NOT NULL,
+            match_user_id INTEGER NOT NULL,
+            shared_courses INTEGER NOT NULL,
+            shared_course_codes TEXT NOT NULL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, match_rank)
+        );
+        """,
     ]
 
     with engine.begin() as conn:
@@ -112,27 +229,31 @@ def test_engine():
 
 @pytest.fixture(scope="session")
 def app(test_engine):
-    # ensure server folder is on sys.path so the app can import `api` package
-    import sys
     import types
 
-    server_dir = os.path.join(os.getcwd(), "server")
-    if server_dir not in sys.path:
-        sys.path.insert(0, server_dir)
-
     # create a lightweight `db` module in sys.modules and set test engine so
     # `from db import engine` in api modules resolves to our test engine
+    # Query blueprints read through `read_engine`; route it over the same
+    # SQLite engine standing in as both primary and replica
+    from db_routing import ReadRouter
+
+    read_engine = ReadRouter(test_engine, [test_engine])
     db_mod = types.ModuleType("db")
     db_mod.engine = test_engine
+    db_mod.read_engine = read_engine
     sys.modules["db"] = db_mod
 
-    # iterate server/api submodules and set engine attr when present
-    api_pkg_path = os.path.join(server_dir, "api")
-    if os.path.isdir(api_pkg_path):
-        for finder, name, ispkg in pkgutil.walk_packages(path=[api_pkg_path], prefix="api."):
-            mod = importlib.import_module(name)
-            if hasattr(mod, "engine"):
-                setattr(mod, "engine", test_engine)
+    # iterate server/api and server/domain submodules and set engine attr when
+    # present (domain modules may already have been imported by other tests)
+    for pkg in ("api", "domain", "jobs"):
+        pkg_path = os.path.join(SERVER_DIR, pkg)
+        if os.path.isdir(pkg_path):
+            for finder, name, ispkg in pkgutil.walk_packages(path=[pkg_path], prefix=f"{pkg}."):
+                mod = importlib.import_module(name)
+                if hasattr(mod, "engine"):
+                    setattr(mod, "engine", test_engine)
+                if hasattr(mod, "read_engine"):
+                    setattr(mod, "read_engine", read_engine)
 
     # import app factory and create testing app (imports will resolve now)
     from app import create_app
@@ -146,3 +267,18 @@ def app(test_engine):
 @pytest.fixture
 def client(app):
     return app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """Register a user through the API; returns a function giving the new user's id"""
+
+    def _register(email, name="User"):
+        resp = client.post(
+            "/api/commands/users/register",
+            json={"email": email, "password": "pw", "name": name},
+        )
+        assert resp.status_code == 201
+        return resp.get_json()["user_id"]
+
+    return _register
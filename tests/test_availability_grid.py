@@ -0,0 +1,107 @@
+import pytest
+
+from domain.availability import (
+    SlotParseError,
+    bit_positions,
+    bits_to_intervals,
+    intervals_to_bits,
+    overlap_minutes,
+    parse_slot,
+)
+
+
+@pytest.mark.parametrize(
+    "slot, expected",
+    [
+        ("Monday 10am-12pm", [(0, 600, 720)]),
+        ("Mon 10-11", [(0, 600, 660)]),
+        ("Fri 2-3", [(4, 840, 900)]),
+        ("TTh 11-1pm", [(1, 660, 780), (3, 660, 780)]),
+        ("Weekdays 9:30-11", [(d, 570, 660) for d in range(5)]),
+        ("Mondays & Wednesdays 4:00 PM - 6 PM", [(0, 960, 1080), (2, 960, 1080)]),
+        ("Sun 10pm-2am", [(6, 1320, 1440), (0, 0, 120)]),
+        ("Sat 12-2", [(5, 720, 840)]),
+        ("Mon 12-1", [(0, 720, 780)]),
+        ("Tue 12:30-1:30", [(1, 750, 810)]),
+    ],
+)
+def test_parse_slot(slot, expected):
+    assert parse_slot(slot) == expected
+
+
+@pytest.mark.parametrize("slot", ["whenever", "Monday", "Someday 10-11", "Mon 25-26"])
+def test_parse_slot_rejects_unparseable(slot):
+    with pytest.raises(SlotParseError):
+        parse_slot(slot)
+
+
+def test_bitmap_roundtrip_and_overlap():
+    a = intervals_to_bits(parse_slot("Mon 10am-12pm") + parse_slot("Mon 11am-1pm"))
+    assert bits_to_intervals(a) == [(0, 600, 780)]
+    b = intervals_to_bits(parse_slot("Monday 12pm-2pm"))
+    assert overlap_minutes(a, b) == 60
+
+
+def test_partially_free_cells_round_down_unless_asked():
+    # 10:05-10:50 covers no quarter hour before 10:15 or after 10:45
+    assert bits_to_intervals(intervals_to_bits(parse_slot("Mon 10:05-10:50"))) == [(0, 615, 645)]
+    assert intervals_to_bits(parse_slot("Mon 10:05-10:10")) == 0
+    window = intervals_to_bits(parse_slot("Mon 10:05-10:50"), partial_cells=True)
+    assert bits_to_intervals(window) == [(0, 600, 660)]
+    assert list(bit_positions(window)) == [40, 41, 42, 43]
+
+
+def test_commands_keep_grid_in_sync(client):
+    resp = client.post("/api/commands/users/register", json={"email": "grid@example.com", "password": "pw", "name": "G"})
+    uid = resp.get_json()["user_id"]
+    resp = client.post("/api/commands/users/register", json={"email": "grid2@example.com", "password": "pw", "name": "G2"})
+    other = resp.get_json()["user_id"]
+
+    resp = client.post(f"/api/commands/availability/{uid}", json={"slot": "Monday 10am-12pm"})
+    assert resp.status_code == 201 and resp.get_json()["unparsed_slots"] == []
+    sid = resp.get_json()["slot_id"]
+
+    resp = client.post(f"/api/commands/availability/{uid}", json={"slot": "after lunch"})
+    assert resp.get_json()["unparsed_slots"] == ["after lunch"]
+
+    grid = client.get(f"/api/queries/availability/{uid}/grid").get_json()
+    assert grid["intervals"] == [{"day": "Monday", "start": "10:00", "end": "12:00"}]
+    assert grid["unparsed_slots"] == ["after lunch"]
+
+    client.put(f"/api/commands/availability/{other}", json={"slots": ["Mon 11-1pm", "Tue 9-10"]})
+    overlap = client.get(f"/api/queries/availability/{uid}/overlap/{other}").get_json()
+    assert overlap["overlap_minutes"] == 60
+
+    client.delete(f"/api/commands/availability/{uid}/{sid}")
+    grid = client.get(f"/api/queries/availability/{uid}/grid").get_json()
+    assert grid["intervals"] == [] and grid["free_minutes"] == 0
+
+    assert client.get(f"/api/queries/availability/{uid}/overlap/99999").status_code == 404
+
+
+def test_course_free_students_uses_bucket_index(client, register):
+    early = register("fb_early@example.com", "Early")
+    late = register("fb_late@example.com", "Late")
+    other = register("fb_other@example.com", "Other")
+    client.post("/api/commands/courses", json={"id": "FB1", "code": "FB1", "name": "FB", "section": "1", "instructor": "P", "schedule": "MWF"})
+    client.post("/api/commands/courses/FB1/enroll", json={"user_id": early})
+    client.post("/api/commands/courses/FB1/enroll", json={"user_id": late})
+
+    client.put(f"/api/commands/availability/{early}", json={"slots": ["Monday 9am-12pm"]})
+    client.put(f"/api/commands/availability/{late}", json={"slots": ["Monday 10:30am-1pm"]})
+    client.put(f"/api/commands/availability/{other}", json={"slots": ["Monday 9am-5pm"]})  # not enrolled
+
+    resp = client.get("/api/queries/availability/course/FB1/free?at=Monday 11am-12pm")
+    assert resp.status_code == 200
+    assert [s["name"] for s in resp.get_json()["students"]] == ["Early", "Late"]
+
+    resp = client.get("/api/queries/availability/course/FB1/free?at=Mon 10-11")
+    assert [s["name"] for s in resp.get_json()["students"]] == ["Early"]
+
+    # removing availability drops the user from the index
+    client.put(f"/api/commands/availability/{early}", json={"slots": []})
+    resp = client.get("/api/queries/availability/course/FB1/free?at=Monday 11am-12pm")
+    assert [s["name"] for s in resp.get_json()["students"]] == ["Late"]
+
+    assert client.get("/api/queries/availability/course/FB1/free?at=soon").status_code == 400
+    assert client.get("/api/queries/availability/course/NOPE/free?at=Mon 10-11").status_code == 404
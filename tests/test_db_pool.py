@@ -0,0 +1,60 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from db_pool import engine_options, install_idle_ping, pool_stats
+
+
+def _engine(tmp_path, **options):
+    return create_engine(f"sqlite:///{tmp_path}/pool.db", **engine_options(**options))
+
+
+def test_pool_metrics_count_checkouts_overflow_and_waits(tmp_path):
+    engine = _engine(tmp_path, size=1, max_overflow=1, timeout=0.05, pre_ping="never")
+
+    with engine.connect() as first, engine.connect() as second:
+        assert first.execute(text("SELECT 1")).scalar() == second.execute(text("SELECT 1")).scalar()
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 2 and stats["overflow"] == 1
+        # pool and overflow exhausted: the third checkout waits and times out
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    stats = pool_stats(engine)
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["waits"] == 1 and stats["timeouts"] == 1
+    assert stats["max_overflow"] == 1
+    assert stats["checkout_ms"]["mean"] is not None and stats["checkout_ms"]["p99"] is not None
+
+
+def test_idle_ping_only_checks_connections_idle_past_the_threshold(tmp_path):
+    engine = _engine(tmp_path, size=1, max_overflow=0, pre_ping="idle")
+    install_idle_ping(engine, idle_seconds=0.05)
+
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert pool_stats(engine)["pings"] == 0
+
+    time.sleep(0.06)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    stats = pool_stats(engine)
+    assert stats["pings"] == 1 and stats["ping_failures"] == 0
+
+
+def test_engine_options_reject_unknown_ping_strategy():
+    with pytest.raises(ValueError):
+        engine_options(pre_ping="sometimes")
+    assert engine_options(pre_ping="always")["pool_pre_ping"] is True
+    assert engine_options(pre_ping="idle")["pool_pre_ping"] is False
+
+
+def test_db_pool_metrics_endpoint(client):
+    resp = client.get("/api/metrics/db-pool")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert "primary" in body and body["replicas"]
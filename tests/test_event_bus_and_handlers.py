@@ -2,6 +2,10 @@ import json
 import sys
 import os
 import importlib
+import time
+
+import pytest
+
 # ensure server package dir is importable for direct domain imports
 server_dir = os.path.join(os.getcwd(), "server")
 if server_dir not in sys.path:
@@ -115,3 +119,217 @@ def test_handle_group_message_posted_notifies_active_members(test_engine):
 
     assert notified_user == u2
     assert notif_type == "group_message_posted"
+
+
+def test_insert_notifications_chunks_batches(test_engine, monkeypatch):
+    from sqlalchemy import bindparam
+
+    with test_engine.begin() as conn:
+        for i in range(5):
+            conn.execute(text("INSERT OR IGNORE INTO users (email, password_hash, name) VALUES (:e, 'x', 'F')"), {"e": f"fan{i}@example.com"})
+        ids = conn.execute(text("SELECT id FROM users WHERE email LIKE 'fan%@example.com'")).scalars().all()
+
+    class SpyConnection:
+        def __init__(self, conn):
+            self.conn = conn
+            self.batches = []
+
+        def execute(self, statement, params=None):
+            self.batches.append(len(params))
+            return self.conn.execute(statement, params)
+
+    monkeypatch.setattr(handlers, "NOTIFICATION_FANOUT_BATCH_SIZE", 2)
+    payload = json.dumps({"group_id": 1, "message_id": 7})
+    with test_engine.begin() as conn:
+        spy = SpyConnection(conn)
+        handlers.insert_notifications(spy, ids, "group_message_posted", payload)
+    assert spy.batches == [2, 2, 1]
+
+    with test_engine.begin() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT user_id, data FROM notifications WHERE user_id IN :ids AND data = :data ORDER BY user_id"
+            ).bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids, "data": payload},
+        ).fetchall()
+    assert [r.user_id for r in rows] == sorted(ids)
+
+
+def test_async_event_bus_runs_handlers_off_the_publisher_and_drains():
+    import threading
+
+    bus = EventBus(mode="async", workers=2, queue_size=10)
+    seen = []
+
+    def handler(evt):
+        seen.append((evt.group_id, threading.current_thread().name))
+
+    bus.subscribe(GroupCreated, handler)
+    for i in range(5):
+        bus.publish(GroupCreated(group_id=i, owner_user_id=1))
+
+    assert bus.shutdown(timeout=5)
+    assert sorted(g for g, _ in seen) == [0, 1, 2, 3, 4]
+    assert all(name.startswith("event-bus-") for _, name in seen)
+    stats = bus.stats()
+    assert stats["published"] == 5 and stats["dispatched"] == 5 and stats["queue_depth"] == 0
+
+    # after shutdown publishes run inline
+    bus.publish(GroupCreated(group_id=9, owner_user_id=1))
+    assert seen[-1] == (9, threading.current_thread().name)
+
+
+def test_async_event_bus_full_queue_policies():
+    import threading
+
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow(evt):
+        started.set()
+        release.wait(5)
+
+    # drop: one event in the worker, one queued, the third is dropped
+    bus = EventBus(mode="async", workers=1, queue_size=1, full_policy="drop")
+    bus.subscribe(GroupCreated, slow)
+    bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+    assert started.wait(5)
+    bus.publish(GroupCreated(group_id=2, owner_user_id=1))
+    bus.publish(GroupCreated(group_id=3, owner_user_id=1))
+    assert bus.stats()["dropped"] == 1
+    release.set()
+    assert bus.shutdown(timeout=5)
+    assert bus.stats()["dispatched"] == 2
+
+    # spill: the overflowing event runs on the publishing thread
+    release.clear()
+    started.clear()
+    ran_on = []
+    bus = EventBus(mode="async", workers=1, queue_size=1, full_policy="spill")
+    bus.subscribe(GroupCreated, slow)
+    bus.subscribe(GroupJoined, lambda evt: ran_on.append(threading.current_thread().name))
+    bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+    assert started.wait(5)
+    bus.publish(GroupCreated(group_id=2, owner_user_id=1))
+    bus.publish(GroupJoined(group_id=3, user_id=2, owner_user_id=1))
+    assert ran_on == [threading.current_thread().name]
+    assert bus.stats()["spilled"] == 1
+    release.set()
+    assert bus.shutdown(timeout=5)
+
+
+def test_async_event_bus_counts_handler_errors():
+    bus = EventBus(mode="async", workers=1)
+    calls = []
+
+    def broken(evt):
+        raise RuntimeError("boom")
+
+    bus.subscribe(GroupCreated, broken)
+    bus.subscribe(GroupCreated, calls.append)
+    bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+    assert bus.shutdown(timeout=5)
+
+    # a failing handler does not stop the ones after it
+    assert len(calls) == 1
+    assert bus.stats()["errors"] == 1
+
+
+def test_transactional_handlers_share_the_command_commit(client, test_engine, monkeypatch):
+    from sqlalchemy import event as sa_event
+    from domain.event_bus import event_bus
+
+    owner = client.post(
+        "/api/commands/users/register", json={"email": "txn-owner@example.com", "password": "pw", "name": "T"}
+    ).get_json()["user_id"]
+
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    sa_event.listen(test_engine, "commit", listener)
+    try:
+        client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "TXN1", "name": "Txn a"})
+        separate = len(commits)
+        commits.clear()
+
+        monkeypatch.setattr(event_bus, "transactional", True)
+        resp = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "TXN1", "name": "Txn b"})
+        shared = len(commits)
+    finally:
+        sa_event.remove(test_engine, "commit", listener)
+
+    assert resp.status_code == 201
+    assert (separate, shared) == (2, 1)
+    with test_engine.begin() as conn:
+        count = conn.execute(
+            text("SELECT COUNT(*) FROM notifications WHERE user_id = :uid AND type = 'group_created'"), {"uid": owner}
+        ).scalar()
+    assert count == 2
+
+    # handlers already run in the transaction are skipped by later dispatch
+    calls = []
+    bus = EventBus(transactional=True)
+    bus.subscribe(GroupCreated, lambda evt, uow=None: calls.append(("txn", uow)), transactional=True)
+    bus.subscribe(GroupCreated, lambda evt: calls.append(("after", None)))
+    bus.run_in_transaction(GroupCreated(group_id=1, owner_user_id=1), "uow")
+    bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+    assert calls == [("txn", "uow"), ("after", None)]
+
+
+def test_failing_transactional_handler_rolls_back_the_command(client, test_engine, monkeypatch):
+    from domain import unit_of_work
+
+    owner = client.post(
+        "/api/commands/users/register", json={"email": "txn-fail@example.com", "password": "pw", "name": "F"}
+    ).get_json()["user_id"]
+
+    def broken(evt, uow=None):
+        raise RuntimeError("handler failed")
+
+    bus = EventBus(transactional=True)
+    bus.subscribe(GroupCreated, broken, transactional=True)
+    monkeypatch.setattr(unit_of_work, "event_bus", bus)
+
+    resp = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "TXN2", "name": "Txn rollback"})
+    assert resp.status_code == 500
+    with test_engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM `groups` WHERE name = 'Txn rollback'")).scalar() == 0
+
+
+def test_event_bus_metrics_record_handler_latency_and_errors(caplog, monkeypatch):
+    # Fake clock: only the slow handler moves time forward, by exactly 30 ms
+    now = [100.0]
+    monkeypatch.setattr(time, "perf_counter", lambda: now[0])
+
+    bus = EventBus(metrics=True, slow_handler_ms=20)
+
+    def slow(evt):
+        now[0] += 0.03
+
+    def broken(evt):
+        raise RuntimeError("boom")
+
+    bus.subscribe(GroupCreated, slow)
+    bus.subscribe(GroupJoined, broken)
+    with caplog.at_level("WARNING", logger="domain.event_bus"):
+        bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+    with pytest.raises(RuntimeError):
+        bus.publish(GroupJoined(group_id=1, user_id=2, owner_user_id=1))
+
+    stats = bus.stats()
+    assert stats["event_types"]["GroupCreated"] == {"published": 1, "handled": 1, "in_flight": 0, "errors": 0}
+    assert stats["event_types"]["GroupJoined"]["errors"] == 1
+    by_type = {h["event_type"]: h for h in stats["handlers"]}
+    assert by_type["GroupCreated"]["handler"].endswith("slow")
+    assert by_type["GroupCreated"]["histogram_ms"]["50"] == 1
+    assert by_type["GroupCreated"]["p50_ms"] == 50
+    assert by_type["GroupJoined"]["errors"] == 1
+    assert "Slow event handler" in caplog.text
+
+
+def test_event_bus_without_metrics_skips_instrumentation():
+    bus = EventBus(metrics=False)
+    bus.subscribe(GroupCreated, lambda evt: None)
+    bus.publish(GroupCreated(group_id=1, owner_user_id=1))
+
+    assert bus.metrics is None
+    assert "handlers" not in bus.stats()
@@ -0,0 +1,59 @@
+from domain.availability import common_free_windows, merge_windows, parse_slot
+
+
+def test_common_free_windows_sweep():
+    windows = common_free_windows(
+        {
+            "a": parse_slot("Mon 9am-12pm"),
+            "b": parse_slot("Mon 10am-1pm"),
+            "c": parse_slot("Mon 11am-2pm"),
+        }
+    )
+    assert (0, 660, 720, frozenset("abc")) in windows
+    assert (0, 600, 660, frozenset("ab")) in windows
+    assert (0, 540, 600, frozenset("a")) in windows
+
+
+def test_common_free_windows_cut_at_midnight():
+    windows = common_free_windows({"a": parse_slot("Sun 10pm-2am"), "b": parse_slot("Sun 11pm-1am")})
+    assert (6, 1380, 1440, frozenset("ab")) in windows
+    assert (0, 0, 60, frozenset("ab")) in windows
+
+
+def test_merge_windows_keeps_k_of_n_stretch_whole():
+    # a and b share 9-12; c drops in for 10-11 without splitting the pair's window
+    windows = common_free_windows(
+        {"a": parse_slot("Mon 9am-12pm"), "b": parse_slot("Mon 9am-12pm"), "c": parse_slot("Mon 10am-11am")}
+    )
+    assert merge_windows(windows, 2) == [(0, 540, 720, 2, frozenset("ab"))]
+    assert merge_windows(windows, 3) == [(0, 600, 660, 3, frozenset("abc"))]
+
+
+def test_group_free_time_endpoint(client, register):
+    owner, m1, m2 = register("ft_owner@example.com"), register("ft_m1@example.com"), register("ft_m2@example.com")
+    client.post("/api/commands/courses", json={"id": "FT1", "code": "FT1", "name": "FT", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "FT1", "name": "FreeTime"}).get_json()["group_id"]
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": m1})
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": m2})
+
+    client.put(f"/api/commands/availability/{owner}", json={"slots": ["Monday 9am-12pm", "Wed 1pm-3pm"]})
+    client.put(f"/api/commands/availability/{m1}", json={"slots": ["Monday 10am-1pm", "Wed 2pm-3pm"]})
+    client.put(f"/api/commands/availability/{m2}", json={"slots": ["Monday 11am-2pm"]})
+
+    resp = client.get(f"/api/queries/groups/{gid}/free-time")
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data["member_count"] == 3
+    assert data["windows"] == [
+        {"day": "Monday", "start": "11:00", "end": "12:00", "minutes": 60, "available_count": 3, "missing_user_ids": []}
+    ]
+    # 10-1 has at least two members free throughout, though which two changes
+    best_partial = data["partial_windows"][0]
+    assert best_partial["start"] == "10:00" and best_partial["end"] == "13:00"
+    assert best_partial["available_count"] == 2 and best_partial["minutes"] == 180
+    assert best_partial["missing_user_ids"] == [owner, m2]
+
+    resp = client.get(f"/api/queries/groups/{gid}/free-time?min_minutes=90")
+    assert resp.get_json()["windows"] == []
+
+    assert client.get("/api/queries/groups/99999/free-time").status_code == 404
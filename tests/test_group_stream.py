@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from domain.pubsub import PubSubHub, SubscriptionClosed
+
+
+def test_hub_evicts_slow_subscriber_without_blocking():
+    hub = PubSubHub(queue_size=2)
+    fast = hub.subscribe("t")
+    slow = hub.subscribe("t", maxsize=1)
+
+    hub.publish("t", 1)
+    assert fast.get(timeout=0) == 1
+    hub.publish("t", 2)
+
+    assert slow.evicted and not fast.evicted
+    assert hub.stats()["subscribers"] == 1
+    assert fast.get(timeout=0) == 2
+    with pytest.raises(SubscriptionClosed):
+        slow.get(timeout=0)
+
+    fast.close()
+    assert not hub.has_subscribers("t")
+
+
+def _setup_group(client, tag):
+    owner = client.post("/api/commands/users/register", json={"email": f"{tag}@example.com", "password": "pw", "name": tag}).get_json()["user_id"]
+    client.post("/api/commands/courses", json={"id": tag, "code": tag, "name": tag, "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": tag, "name": tag}).get_json()["group_id"]
+    return owner, gid
+
+
+def _post(client, gid, uid, content):
+    return client.post("/api/commands/messages", json={"group_id": gid, "user_id": uid, "content": content}).get_json()["message_id"]
+
+
+def test_stream_resumes_from_last_event_id_then_goes_live(client):
+    from domain.pubsub import hub
+
+    owner, gid = _setup_group(client, "SSE1")
+    first = _post(client, gid, owner, "before disconnect")
+    missed = _post(client, gid, owner, "while away")
+
+    resp = client.get(f"/api/queries/messages/group/{gid}/stream", headers={"Last-Event-ID": str(first)}, buffered=False)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    chunks = (c.decode() for c in resp.response)
+
+    assert next(chunks).startswith("retry:")
+    backfill = next(chunks)
+    assert f"id: {missed}\n" in backfill and "while away" in backfill
+
+    live = _post(client, gid, owner, "live one")
+    frame = next(chunks)
+    assert f"id: {live}\n" in frame and "event: message" in frame
+
+    # Streamed rows have the fields of the REST page, so clients can merge them
+    streamed = json.loads(next(line[len("data: "):] for line in frame.splitlines() if line.startswith("data: ")))
+    listed = client.get(f"/api/queries/messages/group/{gid}?limit=1").get_json()[0]
+    assert listed["id"] == live
+    assert set(streamed) - {"group_id"} == set(listed)
+
+    resp.close()
+    assert not hub.has_subscribers(("group", gid))
+
+
+def test_stream_unknown_group_is_404(client):
+    assert client.get("/api/queries/messages/group/999999/stream").status_code == 404
@@ -47,9 +47,11 @@ def test_join_with_inviter_creates_pending_and_notification(client, test_engine)
         assert row is not None
         assert row.status == "pending"
 
-        notif = conn.execute(text("SELECT type, is_read FROM notifications WHERE user_id = :uid"), {"uid": invitee}).first()
+        notif = conn.execute(text("SELECT type, is_read, data, ref_type, ref_id FROM notifications WHERE user_id = :uid"), {"uid": invitee}).first()
         assert notif is not None
         assert notif.type == "group_invitation"
+        assert (notif.ref_type, notif.ref_id) == ("group", gid)
+        assert json.loads(notif.data)["group_id"] == gid
 
 
 def test_accept_invitation_makes_active_and_publishes_join_notification(client, test_engine):
@@ -79,8 +81,11 @@ def test_accept_invitation_makes_active_and_publishes_join_notification(client,
         assert row.status == "active"
 
         # owner should receive a group_joined notification
-        notifs = conn.execute(text("SELECT type FROM notifications WHERE user_id = :uid"), {"uid": owner}).fetchall()
-        assert any(n.type == "group_joined" for n in notifs)
+        notifs = conn.execute(text("SELECT type, ref_type, ref_id FROM notifications WHERE user_id = :uid"), {"uid": owner}).fetchall()
+        assert any(n.type == "group_joined" and (n.ref_type, n.ref_id) == ("group", gid) for n in notifs)
+
+        invitation = conn.execute(text("SELECT is_read FROM notifications WHERE user_id = :uid AND type = 'group_invitation'"), {"uid": invitee}).first()
+        assert invitation.is_read == 1
 
 
 def test_decline_invitation_removes_pending_and_marks_notification_read(client, test_engine):
@@ -107,9 +112,9 @@ def test_decline_invitation_removes_pending_and_marks_notification_read(client,
         row = conn.execute(text("SELECT status FROM group_members WHERE group_id = :gid AND user_id = :uid"), {"gid": gid, "uid": invitee}).first()
         assert row is None
 
-        # invitation notification should be marked (is_read = 1) or removed depending on sqlite JSON support
         notif = conn.execute(text("SELECT is_read FROM notifications WHERE user_id = :uid AND type = 'group_invitation'"), {"uid": invitee}).first()
         assert notif is not None
+        assert notif.is_read == 1
 
 
 def test_owner_cannot_leave_group(client):
@@ -73,10 +73,11 @@ def test_join_and_message_notifications(client):
     )
     assert resp.status_code == 201
 
-    # owner should have a group_message_posted notification
-    notif_resp = client.get(f"/api/queries/notifications/{owner_id}")
-    notifs = notif_resp.get_json()
-    assert any(n["type"] == "group_message_posted" for n in notifs)
+    # owner sees the message as unread (counted from read cursors, not notification rows)
+    unread = client.get(f"/api/queries/users/{owner_id}/unread").get_json()
+    assert unread["total_unread"] == 1
+    notifs = client.get(f"/api/queries/notifications/{owner_id}").get_json()
+    assert not any(n["type"] == "group_message_posted" for n in notifs)
 
     # messages query should return the message
     msgs = client.get(f"/api/queries/messages/group/{gid}")
@@ -0,0 +1,64 @@
+def _create_course(client, cid, code):
+    resp = client.post(
+        "/api/commands/courses",
+        json={"id": cid, "code": code, "name": cid, "section": "001", "instructor": "Prof", "schedule": "MWF", "students": 0},
+    )
+    assert resp.status_code == 201
+
+
+def test_match_index_tracks_enrollments_and_ranks(client, register, test_engine):
+    from domain.match_index import MatchIndex, match_index
+
+    a = register("mi_a@example.com", "Alpha")
+    b = register("mi_b@example.com", "Bravo")
+    c = register("mi_c@example.com", "Charlie")
+    _create_course(client, "MI1", "MI 1")
+    _create_course(client, "MI2", "MI 2")
+
+    for uid, cid in [(a, "MI1"), (a, "MI2"), (b, "MI1"), (b, "MI2"), (c, "MI1")]:
+        assert client.post(f"/api/commands/courses/{cid}/enroll", json={"user_id": uid}).status_code == 201
+
+    assert match_index.is_warm
+    ranked = match_index.top_matches(a, 10)
+    assert [r[0] for r in ranked] == [b, c]
+    assert ranked[0][1] == 2 and sorted(ranked[0][2]) == ["MI 1", "MI 2"]
+
+    # endpoint served from the index keeps the SQL response shape
+    resp = client.get(f"/api/queries/users/{a}/matches")
+    assert resp.status_code == 200
+    matches = resp.get_json()["matches"]
+    assert matches[0]["id"] == b and matches[0]["shared_courses"] == 2
+    assert matches[1]["shared_course_codes"] == "MI 1"
+
+    client.delete("/api/commands/courses/MI2/enroll", json={"user_id": b})
+    assert dict((r[0], r[1]) for r in match_index.top_matches(a, 10)) == {b: 1, c: 1}
+
+    # a fresh index rebuilt from the database agrees with the live one
+    rebuilt = MatchIndex()
+    rebuilt.rebuild()
+    assert sorted(rebuilt.top_matches(a, 10)) == sorted(match_index.top_matches(a, 10))
+    stats = rebuilt.stats()
+    assert stats["warm"] and stats["memory_bytes"] > 0 and stats["rebuild_seconds"] is not None
+
+    resp = client.get("/api/metrics/match-index")
+    assert resp.status_code == 200
+    assert resp.get_json()["warm"] is True
+
+
+def test_matches_fall_back_to_sql_when_index_cold(client, register, monkeypatch):
+    from domain.match_index import MatchIndex
+    from api.queries import users_queries
+
+    a = register("mi_cold_a@example.com")
+    b = register("mi_cold_b@example.com")
+    _create_course(client, "MICOLD", "MI COLD")
+    client.post("/api/commands/courses/MICOLD/enroll", json={"user_id": a})
+    client.post("/api/commands/courses/MICOLD/enroll", json={"user_id": b})
+
+    cold = MatchIndex()
+    assert cold.top_matches(a, 10) is None
+    monkeypatch.setattr(users_queries, "match_index", cold)
+
+    resp = client.get(f"/api/queries/users/{a}/matches")
+    assert resp.status_code == 200
+    assert any(m["id"] == b and int(m["shared_courses"]) == 1 for m in resp.get_json()["matches"])
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from domain.availability import bits_to_bytes, intervals_to_bits, parse_slot
+from domain.match_scoring import DEFAULT_WEIGHTS, parse_weights, rank_candidates, score_candidates
+
+
+def _grid(slot):
+    return bits_to_bytes(intervals_to_bits(parse_slot(slot)))
+
+
+def test_score_candidates_combines_components():
+    me = json.dumps({"times": ["Morning"], "location": ["Library"], "style": "Group Discussion"})
+    alike = json.dumps({"times": ["Morning"], "location": ["Library"], "style": "Group Discussion"})
+    unlike = json.dumps({"times": ["Evening"], "location": ["Online"], "style": "One-on-One"})
+
+    scores, overlap = score_candidates(
+        me,
+        _grid("Mon 9am-11am"),
+        [1, 2, 1],
+        [alike, unlike, None],
+        [_grid("Mon 10am-12pm"), None, None],
+        DEFAULT_WEIGHTS,
+    )
+    assert overlap.tolist() == [60, 0, 0]
+    # shared availability and prefs outweigh one extra shared course
+    assert rank_candidates(scores, [1, 2, 1], 3) == [0, 1, 2]
+
+    courses_only = parse_weights("courses:1,availability:0,times:0,location:0,style:0")
+    scores, _ = score_candidates(me, None, [1, 2, 1], [alike, unlike, None], [None, None, None], courses_only)
+    assert rank_candidates(scores, [1, 2, 1], 1) == [1]
+
+
+def test_matches_endpoint_rank_by_score(client, register):
+    def register_with_prefs(email, prefs):
+        uid = register(email)
+        client.put(f"/api/commands/users/{uid}", json={"study_prefs": json.dumps(prefs)})
+        return uid
+
+    me = register_with_prefs("ms_me@example.com", {"times": ["Morning"], "style": "Quiet"})
+    far = register_with_prefs("ms_far@example.com", {"times": ["Evening"]})
+    near = register_with_prefs("ms_near@example.com", {"times": ["Morning"], "style": "Quiet"})
+    for cid in ("MS1", "MS2"):
+        client.post("/api/commands/courses", json={"id": cid, "code": cid, "name": cid, "section": "1", "instructor": "P", "schedule": "MWF"})
+    for uid, cid in [(me, "MS1"), (me, "MS2"), (far, "MS1"), (far, "MS2"), (near, "MS1")]:
+        client.post(f"/api/commands/courses/{cid}/enroll", json={"user_id": uid})
+    client.post(f"/api/commands/availability/{me}", json={"slot": "Tue 9am-11am"})
+    client.post(f"/api/commands/availability/{near}", json={"slot": "Tue 9am-11am"})
+
+    plain = client.get(f"/api/queries/users/{me}/matches").get_json()["matches"]
+    assert plain[0]["id"] == far
+
+    resp = client.get(f"/api/queries/users/{me}/matches?rank=score")
+    assert resp.status_code == 200
+    scored = resp.get_json()["matches"]
+    assert scored[0]["id"] == near
+    assert scored[0]["availability_overlap_minutes"] == 120
+    assert scored[0]["score"] > scored[1]["score"]
+
+    resp = client.get(f"/api/queries/users/{me}/matches?rank=score&w_courses=1&w_availability=0&w_times=0&w_style=0")
+    assert resp.get_json()["matches"][0]["id"] == far
+
+    assert client.get(f"/api/queries/users/{me}/matches?rank=score&w_courses=abc").status_code == 400
+    for bad in ("-1", "nan", "inf"):
+        assert client.get(f"/api/queries/users/{me}/matches?rank=score&w_availability={bad}").status_code == 400
+
+
+@pytest.mark.parametrize("raw", ["courses:-0.5", "availability:nan", "style:inf", "times:-inf"])
+def test_parse_weights_rejects_negative_and_non_finite(raw):
+    with pytest.raises(ValueError):
+        parse_weights(raw)
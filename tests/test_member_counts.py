@@ -0,0 +1,82 @@
+import json
+
+from sqlalchemy import text
+
+
+def _member_count(client, gid):
+    groups = client.get("/api/queries/groups").get_json()
+    return next(g["member_count"] for g in groups if g["id"] == gid)
+
+
+def test_active_member_count_follows_membership(client, register):
+    owner = register("mc_owner@example.com")
+    joiner = register("mc_joiner@example.com")
+    invitee = register("mc_invitee@example.com")
+    leaver = register("mc_leaver@example.com")
+    client.post("/api/commands/courses", json={"id": "MC1", "code": "MC1", "name": "MC", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "MC1", "name": "Counted", "max_members": 4}).get_json()["group_id"]
+    assert _member_count(client, gid) == 1
+
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": joiner})
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": leaver})
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": invitee, "inviter_id": owner})
+    assert _member_count(client, gid) == 3
+
+    client.post(f"/api/commands/groups/{gid}/accept-invitation", json={"user_id": invitee})
+    assert _member_count(client, gid) == 4
+
+    extra = register("mc_extra@example.com")
+    r = client.post(f"/api/commands/groups/{gid}/join", json={"user_id": extra})
+    assert r.status_code == 400
+
+    client.post(f"/api/commands/groups/{gid}/leave", json={"user_id": leaver})
+    assert _member_count(client, gid) == 3
+
+    client.delete(f"/api/commands/users/{joiner}")
+    assert _member_count(client, gid) == 2
+
+    groups = client.get(f"/api/queries/users/{owner}/groups").get_json()
+    assert groups[0]["member_count"] == 2
+
+
+def test_reconcile_member_counts_repairs_drift(client, register):
+    from db import engine
+    from jobs.reconcile_member_counts import reconcile_member_counts
+
+    owner = register("rc_owner@example.com")
+    client.post("/api/commands/courses", json={"id": "RC1", "code": "RC1", "name": "RC", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "RC1", "name": "Drifted"}).get_json()["group_id"]
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE `groups` SET active_member_count = 9 WHERE id = :gid"), {"gid": gid})
+
+    with engine.begin() as conn:
+        logged_before = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM event_log")).scalar()
+
+    stats = reconcile_member_counts()
+    assert stats["corrected"] >= 1
+    assert _member_count(client, gid) == 1
+    assert reconcile_member_counts()["corrected"] == 0
+
+    # Corrections are raised as events so the projected member counts follow
+    with engine.begin() as conn:
+        logged = conn.execute(
+            text("SELECT event_type, payload FROM event_log WHERE id > :after"), {"after": logged_before}
+        ).fetchall()
+    assert ("GroupUpdated", gid) in [(r.event_type, json.loads(r.payload)["group_id"]) for r in logged]
+
+
+def test_accept_invitation_respects_capacity(client, register):
+    owner = register("cap_owner@example.com")
+    invitee = register("cap_invitee@example.com")
+    joiner = register("cap_joiner@example.com")
+    client.post("/api/commands/courses", json={"id": "CAP1", "code": "CAP1", "name": "CAP", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "CAP1", "name": "Tiny", "max_members": 2}).get_json()["group_id"]
+
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": invitee, "inviter_id": owner})
+    assert client.post(f"/api/commands/groups/{gid}/join", json={"user_id": joiner}).status_code == 201
+
+    r = client.post(f"/api/commands/groups/{gid}/accept-invitation", json={"user_id": invitee})
+    assert r.status_code == 400
+    assert r.get_json()["error"] == "Group is full"
+    assert _member_count(client, gid) == 2
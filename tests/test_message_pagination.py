@@ -0,0 +1,55 @@
+from sqlalchemy import text
+
+
+def _seed_messages(client, tag, count):
+    from db import engine
+
+    owner = client.post("/api/commands/users/register", json={"email": f"{tag}_owner@example.com", "password": "pw", "name": "Pager"}).get_json()["user_id"]
+    client.post("/api/commands/courses", json={"id": tag, "code": tag, "name": "PG", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": tag, "name": "Pages"}).get_json()["group_id"]
+    with engine.begin() as conn:
+        # Two messages per second so pages must break ties on id
+        conn.execute(
+            text("INSERT INTO messages (group_id, user_id, content, created_at) VALUES (:gid, :uid, :content, :at)"),
+            [{"gid": gid, "uid": owner, "content": f"m{i}", "at": f"2025-01-01 10:00:{i // 2:02d}"} for i in range(count)],
+        )
+    return gid
+
+
+def test_keyset_pages_cover_history_once(client):
+    gid = _seed_messages(client, "PG1", 7)
+
+    seen = []
+    resp = client.get(f"/api/queries/messages/group/{gid}?limit=3")
+    first_after = resp.headers["X-Cursor-After"]
+    while True:
+        assert resp.status_code == 200
+        seen += [m["content"] for m in resp.get_json()]
+        cursor = resp.headers.get("X-Cursor-Before")
+        if not cursor:
+            break
+        resp = client.get(f"/api/queries/messages/group/{gid}?limit=3&before={cursor}")
+
+    assert seen == [f"m{i}" for i in range(6, -1, -1)]
+
+    newer = client.get(f"/api/queries/groups/{gid}/messages?limit=3&after={first_after}")
+    assert newer.get_json() == []
+    assert newer.headers["X-Cursor-After"] == first_after
+
+
+def test_after_cursor_returns_newer_messages_newest_first(client):
+    gid = _seed_messages(client, "PG2", 7)
+
+    oldest_page = client.get(f"/api/queries/groups/{gid}/messages?limit=2")
+    cursor = oldest_page.headers["X-Cursor-Before"]
+    older = client.get(f"/api/queries/groups/{gid}/messages?limit=2&before={cursor}")
+    assert [m["content"] for m in older.get_json()] == ["m4", "m3"]
+
+    newer = client.get(f"/api/queries/groups/{gid}/messages?limit=5&after={older.headers['X-Cursor-After']}")
+    assert [m["content"] for m in newer.get_json()] == ["m6", "m5"]
+
+
+def test_invalid_cursor_is_rejected(client):
+    gid = _seed_messages(client, "PG3", 1)
+    assert client.get(f"/api/queries/messages/group/{gid}?before=not-a-cursor").status_code == 400
+    assert client.get(f"/api/queries/messages/group/{gid}?before=a&after=b").status_code == 400
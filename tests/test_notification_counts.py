@@ -0,0 +1,103 @@
+from domain.notification_counts import UnreadCountCache
+
+
+def test_count_etag_and_invalidation(client, register):
+    uid = register("nc_user@example.com")
+    url = f"/api/queries/notifications/{uid}/count"
+
+    first = client.get(url)
+    assert first.get_json() == {"unread_count": 0}
+    etag = first.headers["ETag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    nid = client.post(f"/api/commands/notifications/{uid}", json={"type": "group_invitation", "data": {"group_id": 1}}).get_json()["notification_id"]
+    client.post(f"/api/commands/notifications/{uid}", json={"type": "other"})
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json() == {"unread_count": 2}
+    assert client.get(url + "?type=group_invitation").get_json() == {"unread_count": 1}
+
+    client.patch(f"/api/commands/notifications/{uid}/{nid}/read")
+    assert client.get(url + "?type=group_invitation").get_json() == {"unread_count": 0}
+
+    client.patch(f"/api/commands/notifications/{uid}/read-all")
+    assert client.get(url).get_json() == {"unread_count": 0}
+
+
+def test_count_for_unknown_user_is_404(client):
+    assert client.get("/api/queries/notifications/987654/count").status_code == 404
+
+
+def test_cache_drops_counts_read_before_an_invalidation():
+    cache = UnreadCountCache(ttl_seconds=60, max_users=2)
+    token = cache.token()
+    cache.invalidate(1)
+    cache.put(1, None, 5, token)
+    assert cache.get(1) is None
+
+    cache.put(1, None, 3, cache.token())
+    assert cache.get(1) == 3
+
+    cache.put(2, None, 1, cache.token())
+    cache.put(3, None, 1, cache.token())
+    assert cache.get(1) is None  # least recently used user evicted
+
+
+def test_notification_stream_pushes_new_rows_and_counts(client, register):
+    from domain.pubsub import hub, user_topic
+
+    uid = register("ns_user@example.com")
+    old = client.post(f"/api/commands/notifications/{uid}", json={"type": "group_invitation"}).get_json()["notification_id"]
+    missed = client.post(f"/api/commands/notifications/{uid}", json={"type": "group_invitation"}).get_json()["notification_id"]
+
+    resp = client.get(
+        f"/api/queries/notifications/{uid}/stream?type=group_invitation",
+        headers={"Last-Event-ID": str(old)},
+        buffered=False,
+    )
+    assert resp.mimetype == "text/event-stream"
+    chunks = (c.decode() for c in resp.response)
+    assert next(chunks).startswith("retry:")
+    replayed = next(chunks)
+    assert f"id: {missed}\n" in replayed and "event: notification" in replayed
+    assert '"unread_count": 2' in next(chunks)
+
+    # Other types are filtered out, but still refresh the count
+    client.post(f"/api/commands/notifications/{uid}", json={"type": "other"})
+    assert '"unread_count": 2' in next(chunks)
+
+    new = client.post(f"/api/commands/notifications/{uid}", json={"type": "group_invitation"}).get_json()["notification_id"]
+    assert f"id: {new}\n" in next(chunks)
+    assert '"unread_count": 3' in next(chunks)
+
+    client.patch(f"/api/commands/notifications/{uid}/read-all")
+    assert '"unread_count": 0' in next(chunks)
+
+    resp.close()
+    assert not hub.has_subscribers(user_topic(uid))
+
+
+def test_notification_stream_unknown_user_is_404(client):
+    assert client.get("/api/queries/notifications/987655/stream").status_code == 404
+
+
+def test_notification_listing_pages_with_type_filter(client, register):
+    uid = register("np_user@example.com")
+    ids = [
+        client.post(f"/api/commands/notifications/{uid}", json={"type": "group_invitation" if i % 2 else "other"}).get_json()["notification_id"]
+        for i in range(5)
+    ]
+
+    url = f"/api/queries/notifications/{uid}?limit=2"
+    first = client.get(url)
+    # Newest first; rows created in the same second are ordered by id
+    assert [n["id"] for n in first.get_json()] == [ids[4], ids[3]]
+    second = client.get(url + f"&before={first.headers['X-Cursor-Before']}")
+    assert [n["id"] for n in second.get_json()] == [ids[2], ids[1]]
+
+    invites = client.get(f"/api/queries/notifications/{uid}?type=group_invitation&unread_only=true").get_json()
+    assert [n["id"] for n in invites] == [ids[3], ids[1]]
+
+    assert client.get(f"/api/queries/notifications/{uid}?before=bogus").status_code == 400
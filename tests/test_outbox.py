@@ -0,0 +1,133 @@
+import pytest
+from sqlalchemy import text
+
+from domain.event_bus import EventBus
+from domain.events import GroupCreated, deserialize_event, serialize_event
+
+
+def test_event_round_trips_through_json():
+    evt = GroupCreated(group_id=3, owner_user_id=4)
+    assert deserialize_event("GroupCreated", serialize_event(evt)) == evt
+    with pytest.raises(ValueError):
+        deserialize_event("Nope", "{}")
+
+
+def test_outbox_defers_events_until_relayed(client, register, monkeypatch):
+    from db import engine
+    from domain import unit_of_work
+    from domain.outbox import outbox_relay
+
+    monkeypatch.setattr(unit_of_work, "OUTBOX_ENABLED", True)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM event_outbox"))
+
+    owner = register("outbox-owner@example.com")
+    resp = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "OBX1", "name": "Outbox"})
+    assert resp.status_code == 201
+    gid = resp.get_json()["group_id"]
+
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT event_type, processed_at FROM event_outbox")).fetchall()
+        notified = conn.execute(text("SELECT COUNT(*) FROM notifications WHERE user_id = :uid"), {"uid": owner}).scalar()
+    assert [(r.event_type, r.processed_at) for r in rows] == [("GroupCreated", None)]
+    assert notified == 0
+    assert outbox_relay.backlog()["pending"] == 1
+
+    assert outbox_relay.relay_batch() == 1
+
+    with engine.begin() as conn:
+        row = conn.execute(text("SELECT attempts, processed_at, last_error FROM event_outbox")).first()
+        notif = conn.execute(
+            text("SELECT ref_id FROM notifications WHERE user_id = :uid AND type = 'group_created'"), {"uid": owner}
+        ).first()
+    assert row.attempts == 1 and row.processed_at is not None and row.last_error is None
+    assert notif.ref_id == gid
+    assert outbox_relay.backlog() == {"pending": 0, "lag_seconds": 0.0}
+    assert outbox_relay.relay_batch() == 0
+
+
+def test_outbox_rows_roll_back_with_the_command(client, monkeypatch):
+    from db import engine
+    from domain import unit_of_work
+
+    monkeypatch.setattr(unit_of_work, "OUTBOX_ENABLED", True)
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM event_outbox"))
+
+    with pytest.raises(RuntimeError):
+        with unit_of_work.unit_of_work() as uow:
+            uow.add_event(GroupCreated(group_id=1, owner_user_id=1))
+            raise RuntimeError("command failed")
+
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM event_outbox")).scalar() == 0
+
+
+def test_outbox_retries_failures_then_parks_them(client):
+    from db import engine
+    from domain.outbox import OutboxRelay, record_events
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM event_outbox"))
+        record_events(conn, [GroupCreated(group_id=1, owner_user_id=1), GroupCreated(group_id=2, owner_user_id=1)])
+
+    seen = []
+
+    def flaky(evt):
+        seen.append(evt.group_id)
+        if evt.group_id == 2:
+            raise RuntimeError("handler down")
+
+    bus = EventBus()
+    bus.subscribe(GroupCreated, flaky)
+    relay = OutboxRelay(bus, batch_size=10, max_attempts=2)
+
+    assert relay.relay_batch() == 2
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT attempts, processed_at, claimed_at, last_error FROM event_outbox ORDER BY id")).fetchall()
+    assert rows[0].processed_at is not None
+    assert rows[1].processed_at is None and rows[1].claimed_at is None and "handler down" in rows[1].last_error
+
+    # second failure reaches max_attempts: parked with its error, no longer pending
+    assert relay.relay_batch() == 1
+    assert seen == [1, 2, 2]
+    with engine.begin() as conn:
+        parked = conn.execute(text("SELECT attempts, processed_at, last_error FROM event_outbox WHERE id = (SELECT MAX(id) FROM event_outbox)")).first()
+    assert parked.attempts == 2 and parked.processed_at is not None and parked.last_error
+    stats = relay.stats()
+    assert (stats["relayed"], stats["failed"], stats["dead"], stats["pending"]) == (1, 2, 1, 0)
+    assert relay.relay_batch() == 0
+
+
+def test_outbox_retry_that_succeeds_is_purged_but_parked_rows_are_kept(client):
+    from db import engine
+    from domain.outbox import OutboxRelay, record_events
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM event_outbox"))
+        record_events(conn, [GroupCreated(group_id=1, owner_user_id=1), GroupCreated(group_id=2, owner_user_id=1)])
+
+    failures = {1: 1, 2: 5}
+
+    def flaky(evt):
+        if failures[evt.group_id]:
+            failures[evt.group_id] -= 1
+            raise RuntimeError("handler down")
+
+    bus = EventBus()
+    bus.subscribe(GroupCreated, flaky)
+    # keep_hours < 0 puts the purge cutoff in the future
+    relay = OutboxRelay(bus, batch_size=10, max_attempts=2, keep_hours=-1)
+
+    relay.relay_batch()
+    relay.relay_batch()
+    with engine.begin() as conn:
+        rows = conn.execute(text("SELECT processed_at, last_error FROM event_outbox ORDER BY id")).fetchall()
+    # group 1 failed once then succeeded; group 2 was parked
+    assert rows[0].processed_at is not None and rows[0].last_error is None
+    assert rows[1].processed_at is not None and rows[1].last_error
+
+    assert relay.purge_relayed() == 1
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM event_outbox WHERE last_error IS NOT NULL")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM event_outbox")).scalar() == 1
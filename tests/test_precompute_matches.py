@@ -0,0 +1,90 @@
+from sqlalchemy import text
+
+
+def _create_course(client, cid):
+    resp = client.post(
+        "/api/commands/courses",
+        json={"id": cid, "code": cid, "name": cid, "section": "001", "instructor": "Prof", "schedule": "MWF", "students": 0},
+    )
+    assert resp.status_code == 201
+
+
+def _matches(test_engine, uid):
+    with test_engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT match_rank, match_user_id, shared_courses, shared_course_codes "
+                "FROM user_matches WHERE user_id = :uid ORDER BY match_rank"
+            ),
+            {"uid": uid},
+        ).fetchall()
+
+
+def test_precompute_matches_writes_top_k_per_user(client, register, test_engine, monkeypatch):
+    from jobs.precompute_matches import precompute_matches
+    from api.queries import users_queries
+
+    a = register("pc_a@example.com", "PA")
+    b = register("pc_b@example.com", "PB")
+    c = register("pc_c@example.com", "PC")
+    for cid in ("PC1", "PC2"):
+        _create_course(client, cid)
+    for uid, cid in [(a, "PC1"), (a, "PC2"), (b, "PC1"), (b, "PC2"), (c, "PC2")]:
+        client.post(f"/api/commands/courses/{cid}/enroll", json={"user_id": uid})
+
+    # small blocks must give the same result as one big block
+    stats = precompute_matches(top_k=5, block_size=1)
+    assert stats["blocks"] == stats["users"] and stats["rows_written"] > 0
+    chunked = _matches(test_engine, a)
+    precompute_matches(top_k=5, block_size=10000)
+    assert _matches(test_engine, a) == chunked
+
+    assert [(r.match_user_id, r.shared_courses) for r in chunked] == [(b, 2), (c, 1)]
+    assert chunked[0].shared_course_codes == "PC1, PC2"
+
+    precompute_matches(top_k=1, block_size=2)
+    assert [r.match_user_id for r in _matches(test_engine, a)] == [b]
+
+    monkeypatch.setattr(users_queries, "MATCHES_FROM_PRECOMPUTED", True)
+    resp = client.get(f"/api/queries/users/{a}/matches")
+    assert resp.status_code == 200
+    assert [m["id"] for m in resp.get_json()["matches"]] == [b]
+
+
+def test_precompute_matches_breaks_ties_by_name_and_swaps_in_whole(client, register, test_engine, monkeypatch):
+    from jobs import precompute_matches as job
+    from api.queries import users_queries
+
+    t = register("pc_t@example.com", "PT")
+    zed = register("pc_zed@example.com", "Zed")
+    amy = register("pc_amy@example.com", "Amy")
+    _create_course(client, "PC9")
+    for uid in (t, zed, amy):
+        client.post("/api/commands/courses/PC9/enroll", json={"user_id": uid})
+
+    job.precompute_matches(top_k=5, block_size=1)
+    # Same order as the live paths: shared courses, then name
+    assert [r.match_user_id for r in _matches(test_engine, t)] == [amy, zed]
+    live = client.get(f"/api/queries/users/{t}/matches").get_json()["matches"]
+    monkeypatch.setattr(users_queries, "MATCHES_FROM_PRECOMPUTED", True)
+    precomputed = client.get(f"/api/queries/users/{t}/matches").get_json()["matches"]
+    assert [m["id"] for m in precomputed] == [m["id"] for m in live] == [amy, zed]
+
+    with test_engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM user_matches")).scalar()
+
+    # Readers keep seeing the previous generation until the swap
+    seen = []
+    top_k_block = job.top_k_block
+
+    def spy(*args, **kwargs):
+        with test_engine.connect() as conn:
+            seen.append(conn.execute(text("SELECT COUNT(*) FROM user_matches")).scalar())
+        return top_k_block(*args, **kwargs)
+
+    monkeypatch.setattr(job, "top_k_block", spy)
+    job.precompute_matches(top_k=5, block_size=1)
+    assert len(seen) > 1 and set(seen) == {total}
+    with test_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM user_matches")).scalar() == total
+        assert conn.execute(text("SELECT COUNT(*) FROM user_matches_staging")).scalar() == 0
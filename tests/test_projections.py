@@ -0,0 +1,148 @@
+import pytest
+from sqlalchemy import text
+
+
+def _setup_group(client, register, tag):
+    client.post(
+        "/api/commands/courses",
+        json={"id": f"PRJ{tag}", "code": f"PRJ {tag}", "name": "Projections", "section": "001",
+              "instructor": "Prof", "schedule": "MWF", "students": 1},
+    )
+    owner = register(f"proj-owner-{tag}@example.com", "Owner")
+    member = register(f"proj-member-{tag}@example.com", "Member")
+    gid = client.post(
+        "/api/commands/groups", json={"owner_user_id": owner, "course_id": f"PRJ{tag}", "name": f"Proj {tag}"}
+    ).get_json()["group_id"]
+    assert client.post(f"/api/commands/groups/{gid}/join", json={"user_id": member}).status_code == 201
+    return owner, member, gid
+
+
+def _runner():
+    from domain.projections import ProjectionRunner
+    from domain.read_models import register_projections
+
+    runner = ProjectionRunner(status_ttl=0)
+    register_projections(runner)
+    return runner
+
+
+def test_commands_append_to_event_log(client, register):
+    from db import engine
+
+    with engine.begin() as conn:
+        before = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM event_log")).scalar()
+    owner, member, gid = _setup_group(client, register, "A")
+    client.post(f"/api/commands/groups/{gid}/leave", json={"user_id": member})
+    client.put(f"/api/commands/groups/{gid}", json={"name": "Renamed"})
+
+    with engine.begin() as conn:
+        types = conn.execute(
+            text("SELECT event_type FROM event_log WHERE id > :id ORDER BY id"), {"id": before}
+        ).scalars().all()
+    assert types == ["GroupCreated", "GroupJoined", "GroupLeft", "GroupUpdated"]
+
+
+def test_rebuild_replays_log_and_queries_serve_the_projection(client, register, monkeypatch):
+    from api.queries import courses_queries, users_queries
+
+    owner, member, gid = _setup_group(client, register, "B")
+    sql_groups = client.get(f"/api/queries/users/{member}/groups").get_json()
+    sql_course_groups = client.get("/api/queries/courses/PRJB/groups").get_json()
+
+    runner = _runner()
+    stats = runner.rebuild("user_group_list", batch_size=2)
+    assert stats["batches"] >= 2 and stats["last_event_id"] > 0
+    runner.rebuild("course_group_list")
+    assert runner.is_ready("user_group_list") and runner.is_ready("course_group_list")
+
+    monkeypatch.setattr(users_queries, "PROJECTIONS_ENABLED", True)
+    monkeypatch.setattr(users_queries, "projections", runner)
+    monkeypatch.setattr(courses_queries, "PROJECTIONS_ENABLED", True)
+    monkeypatch.setattr(courses_queries, "projections", runner)
+
+    assert client.get(f"/api/queries/users/{member}/groups").get_json() == sql_groups
+    assert client.get("/api/queries/courses/PRJB/groups").get_json() == sql_course_groups
+    assert sql_groups[0]["member_count"] == 2 and sql_groups[0]["owner_name"] == "Owner"
+
+
+def test_live_events_keep_projection_current(client, register):
+    from db import engine
+    from domain.events import GroupArchived, GroupLeft, UserUpdated
+
+    owner, member, gid = _setup_group(client, register, "C")
+    runner = _runner()
+    runner.rebuild("user_group_list")
+
+    client.post(f"/api/commands/groups/{gid}/leave", json={"user_id": member})
+    runner.handle(GroupLeft(group_id=gid, user_id=member))
+    client.put(f"/api/commands/users/{owner}", json={"name": "Renamed Owner"})
+    runner.handle(UserUpdated(user_id=owner))
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            text("SELECT user_id, owner_name, member_count FROM user_group_list WHERE group_id = :gid"), {"gid": gid}
+        ).fetchall()
+    assert [(r.user_id, r.owner_name, r.member_count) for r in rows] == [(owner, "Renamed Owner", 1)]
+
+    client.delete(f"/api/commands/groups/{gid}")
+    runner.handle(GroupArchived(group_id=gid))
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM user_group_list WHERE group_id = :gid"), {"gid": gid}).scalar() == 0
+
+
+def test_rebuild_prunes_rows_for_vanished_groups(client, register):
+    from db import engine
+
+    owner, member, gid = _setup_group(client, register, "D")
+    runner = _runner()
+    runner.rebuild("course_group_list")
+
+    # archived behind the projection's back, e.g. by a manual fix
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE `groups` SET is_archived = 1 WHERE id = :gid"), {"gid": gid})
+    runner.rebuild("course_group_list")
+
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM course_group_list WHERE group_id = :gid"), {"gid": gid}).scalar() == 0
+    stats = runner.stats()
+    assert stats["projections"]["course_group_list"]["status"] == "ready"
+    assert stats["projections"]["course_group_list"]["checkpoint"] == stats["last_event_id"]
+
+
+def test_in_transaction_handle_reads_statuses_on_the_command_connection(client, register, monkeypatch):
+    from db import engine
+    from domain import projections as projections_module
+    from domain.events import GroupUpdated
+    from domain.unit_of_work import UnitOfWork
+
+    owner, member, gid = _setup_group(client, register, "E")
+    runner = _runner()
+    runner.rebuild("course_group_list")
+
+    class NoCheckouts:
+        def connect(self):
+            raise AssertionError("opened a second connection inside the unit of work")
+
+        begin = connect
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE `groups` SET name = 'Proj E renamed' WHERE id = :gid"), {"gid": gid})
+        monkeypatch.setattr(projections_module, "engine", NoCheckouts())
+        runner.handle(GroupUpdated(group_id=gid), UnitOfWork(conn))
+        monkeypatch.undo()
+
+    with engine.begin() as conn:
+        assert conn.execute(text("SELECT name FROM course_group_list WHERE group_id = :gid"), {"gid": gid}).scalar() == "Proj E renamed"
+
+
+def test_projection_without_refresh_fails_at_instantiation():
+    from domain.projections import Projection
+
+    class Incomplete(Projection):
+        name = "incomplete"
+
+        def affected(self, conn, event):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import text
+
+from jobs.purge_notifications import parse_retention, ttl_for
+
+
+def test_parse_retention_and_specificity():
+    rules = parse_retention("group_invitation:unread=14, *:read=30,*:unread=180,legacy=1")
+    assert ttl_for(rules, "group_invitation", False) == (("group_invitation", "unread"), 14.0)
+    assert ttl_for(rules, "group_invitation", True) == (("*", "read"), 30.0)
+    assert ttl_for(rules, "legacy", False) == (("legacy", "*"), 1.0)
+    assert ttl_for(parse_retention("*:read=30"), "x", False) is None
+
+    with pytest.raises(ValueError):
+        parse_retention("x:sometimes=3")
+
+
+def test_purge_deletes_expired_rows_in_chunks(client):
+    from db import engine
+    from jobs.purge_notifications import purge_notifications
+
+    uid = client.post("/api/commands/users/register", json={"email": "purge@example.com", "password": "pw", "name": "P"}).get_json()["user_id"]
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM notifications"))
+        conn.execute(
+            text("INSERT INTO notifications (user_id, type, is_read, created_at) VALUES (:uid, :type, :read, :at)"),
+            [
+                {"uid": uid, "type": "group_joined", "read": 1, "at": "2000-01-01 00:00:00"},
+                {"uid": uid, "type": "group_joined", "read": 0, "at": "2000-01-01 00:00:00"},
+                {"uid": uid, "type": "group_invitation", "read": 0, "at": "2000-01-01 00:00:00"},
+                {"uid": uid, "type": "group_joined", "read": 1, "at": "2999-01-01 00:00:00"},
+            ],
+        )
+
+    rules = parse_retention("*:read=30,group_invitation:unread=14")
+    dry = purge_notifications(rules=rules, dry_run=True, chunk_size=2, sleep_ms=0)
+    assert dry["purged"] == 2 and dry["chunks"] == 2
+    assert dry["by_rule"] == {"*:read": 1, "group_invitation:unread": 1}
+
+    stats = purge_notifications(rules=rules, chunk_size=2, sleep_ms=0)
+    assert stats["purged"] == 2
+    with engine.begin() as conn:
+        left = conn.execute(text("SELECT type, is_read FROM notifications WHERE user_id = :uid ORDER BY id"), {"uid": uid}).fetchall()
+    assert [(r.type, r.is_read) for r in left] == [("group_joined", 0), ("group_joined", 1)]
+    assert client.get(f"/api/queries/notifications/{uid}/count").get_json()["unread_count"] == 1
+
+
+def test_purge_cli_dry_run_reports(app):
+    result = app.test_cli_runner().invoke(args=["purge-notifications", "--dry-run", "--retention", "*:*=36500", "--sleep-ms", "0"])
+    assert result.exit_code == 0, result.output
+    assert "would purge 0 of" in result.output
@@ -0,0 +1,38 @@
+from db_profiling import query_stats, redact_params
+
+
+def test_redact_params_keeps_names_and_types_only():
+    assert redact_params({"email": "a@example.com", "uid": 3}) == {"email": "str", "uid": "int"}
+    assert redact_params(("secret", 1.5)) == ["str", "float"]
+    assert redact_params([{"uid": 1}, {"uid": 2}]) == "[2 parameter sets] {'uid': 'int'}"
+
+
+def test_queries_are_attributed_to_the_endpoint(client):
+    r = client.post("/api/commands/users/register", json={"email": "qs1@example.com", "password": "pw", "name": "QS"})
+    uid = r.get_json()["user_id"]
+    assert client.get(f"/api/queries/notifications/{uid}").status_code == 200
+
+    summary = client.get("/api/metrics/queries?top=5").get_json()
+    endpoint = summary["endpoints"]["notifications_queries.get_user_notifications"]
+    assert endpoint["requests"] >= 1 and endpoint["queries"] >= 1
+    assert endpoint["db_ms"] > 0
+    assert 1 <= len(summary["top_statements"]) <= 5
+    assert summary["top_statements"][0]["count"] >= 1
+
+
+def test_slow_queries_and_possible_n_plus_one_are_logged(client, monkeypatch, caplog):
+    monkeypatch.setattr(query_stats, "slow_ms", 0.000001)
+    monkeypatch.setattr(query_stats, "n_plus_one_threshold", 1)
+
+    with caplog.at_level("WARNING", logger="db_profiling"):
+        r = client.post(
+            "/api/commands/users/register", json={"email": "qs2-secret@example.com", "password": "pw", "name": "QS2"}
+        )
+    assert r.status_code == 201
+
+    assert "Slow query" in caplog.text
+    assert "Possible N+1: users_commands.register_user" in caplog.text
+    # parameter values never reach the log
+    assert "qs2-secret" not in caplog.text
+    endpoint = query_stats.summary()["endpoints"]["users_commands.register_user"]
+    assert endpoint["n_plus_one_requests"] >= 1
@@ -0,0 +1,76 @@
+from sqlalchemy import create_engine, text
+
+from db_routing import PRIMARY_FOR_HEADER, PRIMARY_HEADER, ReadRouter
+
+
+def _engines(n):
+    return [create_engine("sqlite:///:memory:", future=True) for _ in range(n)]
+
+
+def test_read_router_picks_the_replica_with_fewest_connections():
+    primary, a, b = _engines(3)
+    router = ReadRouter(primary, [a, b])
+
+    with router.connect() as first:
+        assert first.engine is a
+        with router.connect() as second:
+            # a is busy, so b
+            assert second.engine is b
+            with router.connect() as third:
+                assert third.engine is a
+            assert router.stats()["replicas"][0]["in_use"] == 1
+        with router.connect() as fourth:
+            assert fourth.engine is b
+
+    stats = router.stats()
+    assert [r["in_use"] for r in stats["replicas"]] == [0, 0]
+    assert [r["reads"] for r in stats["replicas"]] == [2, 2]
+    assert stats["primary_reads"] == 0
+
+
+def test_read_router_without_replicas_or_unreachable_replica_uses_primary(tmp_path):
+    primary, = _engines(1)
+    with ReadRouter(primary).connect() as conn:
+        assert conn.engine is primary
+
+    broken = create_engine(f"sqlite:///{tmp_path}/missing/dir/replica.db", future=True)
+    router = ReadRouter(primary, [broken])
+    with router.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.engine is primary
+    assert router.stats()["fallbacks"] == 1
+    assert router.stats()["replicas"][0]["in_use"] == 0
+
+
+def test_commands_tell_the_client_to_read_from_the_primary(client):
+    import db
+
+    r = client.post("/api/commands/users/register", json={"email": "rrw1@example.com", "password": "pw", "name": "RW"})
+    assert r.status_code == 201
+    uid = r.get_json()["user_id"]
+    assert float(r.headers[PRIMARY_FOR_HEADER]) > 0
+    assert PRIMARY_FOR_HEADER in r.headers.get("Access-Control-Expose-Headers", "")
+    assert client.get(f"/api/queries/notifications/{uid}").headers.get(PRIMARY_FOR_HEADER) is None
+
+    # Without the flag the query reads from a replica; echoing it reads from the primary
+    before = db.read_engine.stats()["primary_reads"]
+    assert client.get(f"/api/queries/notifications/{uid}").status_code == 200
+    assert db.read_engine.stats()["primary_reads"] == before
+    assert client.get(f"/api/queries/notifications/{uid}", headers={PRIMARY_HEADER: "1"}).status_code == 200
+    assert db.read_engine.stats()["primary_reads"] == before + 1
+
+    assert client.get("/api/metrics/read-routing").get_json()["replicas"][0]["in_use"] == 0
+
+
+def test_unread_count_cache_is_filled_from_the_primary(client, test_engine, monkeypatch):
+    from api.queries import notifications_queries
+
+    # A replica without the tables would fail any read routed to it
+    monkeypatch.setattr(notifications_queries, "read_engine", ReadRouter(test_engine, _engines(1)))
+    r = client.post("/api/commands/users/register", json={"email": "rrw2@example.com", "password": "pw", "name": "RW"})
+    uid = r.get_json()["user_id"]
+    client.post(f"/api/commands/notifications/{uid}", json={"type": "info", "data": {}})
+
+    resp = client.get(f"/api/queries/notifications/{uid}/count")
+    assert resp.status_code == 200
+    assert resp.get_json()["unread_count"] == 1
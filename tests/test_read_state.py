@@ -0,0 +1,62 @@
+def _post(client, gid, uid, content):
+    return client.post("/api/commands/messages", json={"group_id": gid, "user_id": uid, "content": content}).get_json()["message_id"]
+
+
+def _unread(client, uid, gid):
+    body = client.get(f"/api/queries/users/{uid}/unread").get_json()
+    return next(g["unread_count"] for g in body["groups"] if g["group_id"] == gid)
+
+
+def test_unread_counts_follow_read_cursor(client, register):
+    owner = register("rs_owner@example.com")
+    member = register("rs_member@example.com")
+    client.post("/api/commands/courses", json={"id": "RS1", "code": "RS1", "name": "RS", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "RS1", "name": "Cursors"}).get_json()["group_id"]
+    client.post(f"/api/commands/groups/{gid}/join", json={"user_id": member})
+
+    first = _post(client, gid, owner, "one")
+    _post(client, gid, owner, "two")
+    _post(client, gid, owner, "three")
+
+    # Poster's own messages never count as unread
+    assert _unread(client, owner, gid) == 0
+    assert _unread(client, member, gid) == 3
+
+    r = client.post(f"/api/commands/groups/{gid}/read", json={"user_id": member, "message_id": first})
+    assert r.get_json()["last_read_message_id"] == first
+    assert _unread(client, member, gid) == 2
+
+    # Marking an older message read never moves the cursor back
+    client.post(f"/api/commands/groups/{gid}/read", json={"user_id": member})
+    client.post(f"/api/commands/groups/{gid}/read", json={"user_id": member, "message_id": first})
+    assert _unread(client, member, gid) == 0
+
+    _post(client, gid, member, "reply")
+    assert _unread(client, owner, gid) == 1
+
+
+def test_mark_read_requires_active_membership(client, register):
+    owner = register("rs2_owner@example.com")
+    outsider = register("rs2_out@example.com")
+    client.post("/api/commands/courses", json={"id": "RS2", "code": "RS2", "name": "RS", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "RS2", "name": "Closed"}).get_json()["group_id"]
+
+    assert client.post(f"/api/commands/groups/{gid}/read", json={"user_id": outsider}).status_code == 404
+    r = client.post(f"/api/commands/groups/{gid}/read", json={"user_id": owner})
+    assert r.status_code == 200
+    assert r.get_json()["last_read_message_id"] is None
+
+
+def test_mark_read_rejects_messages_from_other_groups(client, register):
+    owner = register("rs3_owner@example.com")
+    client.post("/api/commands/courses", json={"id": "RS3", "code": "RS3", "name": "RS", "section": "1", "instructor": "P", "schedule": "MWF"})
+    gid = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "RS3", "name": "Here"}).get_json()["group_id"]
+    other = client.post("/api/commands/groups", json={"owner_user_id": owner, "course_id": "RS3", "name": "There"}).get_json()["group_id"]
+    _post(client, gid, owner, "here")
+    elsewhere = _post(client, other, owner, "there")
+
+    for message_id in (elsewhere, elsewhere + 1000):
+        r = client.post(f"/api/commands/groups/{gid}/read", json={"user_id": owner, "message_id": message_id})
+        assert r.status_code == 400
+    r = client.post(f"/api/commands/groups/{gid}/read", json={"user_id": owner})
+    assert r.get_json()["last_read_message_id"] < elsewhere